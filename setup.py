@@ -27,9 +27,19 @@ _dev_deps = [
     "pytest"
 ]
 
+_async_deps = [
+    "eventlet",
+]
+
+_shard_deps = [
+    "redis",
+]
+
 def _setup_extras() -> Dict[str, List[str]]:
     return {
-        "dev": _dev_deps
+        "dev": _dev_deps,
+        "async": _async_deps,
+        "shard": _shard_deps,
     }
 
 
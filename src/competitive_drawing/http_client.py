@@ -0,0 +1,67 @@
+from typing import Any, Callable
+
+import requests
+from functools import cache
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from competitive_drawing import SETTINGS
+
+
+@cache
+def get_session() -> requests.Session:
+    """
+    Get the process-wide http session. Connections are kept alive and pooled
+    between requests. Requests which fail to connect are retried with backoff,
+    requests which have already been sent are not
+
+    :return: shared http session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=SETTINGS.http_pool_size,
+        pool_maxsize=SETTINGS.http_pool_size,
+        max_retries=Retry(
+            total=SETTINGS.http_max_retries,
+            read=0,
+            status=0,
+            backoff_factor=SETTINGS.http_retry_backoff,
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """
+    Post using the shared session and default timeouts
+
+    :param url: url to post to
+    :param kwargs: keyword arguments passed to `requests.Session.post`
+    :return: http response
+    """
+    kwargs.setdefault("timeout", (SETTINGS.http_connect_timeout, SETTINGS.http_read_timeout))
+    return get_session().post(url, **kwargs)
+
+
+@cache
+def _get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=SETTINGS.http_async_workers,
+        thread_name_prefix="http_client"
+    )
+
+
+def run_async(function: Callable[..., Any], *args, **kwargs) -> Future:
+    """
+    Run a blocking http call on the shared http worker threads
+
+    :param function: function to run
+    :param args: positional arguments passed to `function`
+    :param kwargs: keyword arguments passed to `function`
+    :return: future which resolves to the return value of `function`
+    """
+    return _get_executor().submit(function, *args, **kwargs)
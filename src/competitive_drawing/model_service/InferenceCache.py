@@ -0,0 +1,105 @@
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import torch
+
+from competitive_drawing import SETTINGS
+
+
+class InferenceCache:
+    """
+    Least-recently-used cache of classifier outputs keyed by label pair, model
+    version, and a hash of the preprocessed model input. Identical canvases,
+    such as the final canvas classified again when a game ends, are answered
+    without waiting for the model. Entries expire after `ttl` seconds
+
+    :param max_entries: maximum number of cached outputs
+    :param ttl: number of seconds an output stays cached
+    """
+    def __init__(
+        self,
+        max_entries: int = SETTINGS.inference_cache_max_entries,
+        ttl: float = SETTINGS.inference_cache_ttl,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[Hashable, Tuple[float, List[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key: Hashable) -> Optional[List[float]]:
+        """
+        :param key: cache key, see `get_key`
+        :return: cached model outputs, or None if there is no unexpired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+
+    def put(self, key: Hashable, model_outputs: List[float]):
+        """
+        :param key: cache key, see `get_key`
+        :param model_outputs: model outputs for the key's input
+        """
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, model_outputs)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
+    @staticmethod
+    def get_key(label_pair_str: str, model_version: str, input_bytes: bytes) -> Tuple[str, str, bytes]:
+        """
+        :param label_pair_str: label pair of the classifier
+        :param model_version: version of the classifier's weights, see
+            `get_model_version`
+        :param input_bytes: raw bytes of the preprocessed model input
+        :return: cache key
+        """
+        return (label_pair_str, model_version, hashlib.blake2b(input_bytes, digest_size=16).digest())
+
+
+def get_model_version(model: torch.nn.Module) -> str:
+    """
+    Hash a model's weights so that cached outputs of reloaded or replaced
+    models are never reused
+
+    :param model: classifier model
+    :return: hex digest of the model's parameters and buffers
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for name, tensor in model.state_dict().items():
+        digest.update(name.encode("utf-8"))
+        digest.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+
+    return digest.hexdigest()
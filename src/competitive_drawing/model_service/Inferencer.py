@@ -1,14 +1,23 @@
+from typing import List, Optional, Tuple, Union
+
+import time
+import numpy
 import threading
+from functools import lru_cache
 from PIL import Image
 
 import torch
 
+from competitive_drawing import SETTINGS
 from competitive_drawing.model_service.opponent import (
     grid_search_stroke,
+    get_seed_keypoints,
     SearchParameters,
-    BezierCurve,
-    get_uniform_ts
+    BatchBezierCurve,
 )
+from competitive_drawing.model_service.MicroBatcher import MicroBatcher
+from competitive_drawing.model_service.InputPreprocessor import InputPreprocessor
+from competitive_drawing.model_service.InferenceCache import InferenceCache, get_model_version
 from competitive_drawing.model_service.utils.helpers import pil_to_input
 
 
@@ -22,60 +31,172 @@ def async_inference(method):
     return wrapper
 
 
+def search_stroke(
+    model: torch.nn.Module,
+    image: Image,
+    target_index: int,
+    line_width: float,
+    max_length: float,
+    previous_keypoints: Optional[torch.Tensor] = None,
+    time_limit: Optional[float] = SETTINGS.stroke_search_time_limit,
+    warm_start: bool = SETTINGS.stroke_search_warm_start,
+) -> Tuple[List[List[float]], torch.Tensor, float, int]:
+    """
+    Search for the AI opponent's next stroke on the given canvas. If
+    `warm_start`, the search is seeded with strokes which continue the previous
+    turn's stroke and follow the classifier's saliency on the current canvas.
+    Searches which reach `time_limit` stop and return their current best stroke
+
+    :param model: classifier model used as the objective function
+    :param image: image of the current canvas
+    :param target_index: index of the classifier output being optimized
+    :param line_width: width of the stroke in image pixels
+    :param max_length: maximum length of the stroke in image pixels
+    :param previous_keypoints: best keypoints of the previous search in the
+        same room, if any
+    :param time_limit: number of seconds the search may run, including
+        seeding. None disables the limit
+    :param warm_start: seed the search rather than starting from a random grid
+    :return: points sampled along the optimized stroke, its keypoints, its
+        score, and the number of optimization steps run
+    """
+    start_time = time.monotonic()
+    base_canvas = pil_to_input(image)[0][0]
+    search_parameters = SearchParameters(
+        max_width=line_width * 4,
+        min_width=line_width,
+        patience=SETTINGS.stroke_search_patience,
+        score_threshold=SETTINGS.stroke_search_score_threshold,
+        prune_step=SETTINGS.stroke_search_prune_step,
+        warm_start_prune_step=SETTINGS.stroke_search_warm_start_prune_step,
+    )
+
+    seed_keypoints = (
+        get_seed_keypoints(base_canvas, model, target_index, search_parameters, max_length, previous_keypoints)
+        if warm_start
+        else None
+    )
+    if time_limit is not None:
+        search_parameters.time_limit = max(time_limit - (time.monotonic() - start_time), 0.0)
+
+    score, keypoints, num_steps = grid_search_stroke(
+        base_canvas,
+        model,
+        target_index,
+        torch.optim.Adamax,
+        { "lr": 0.03 },
+        search_parameters,
+        seed_keypoints=seed_keypoints,
+        max_length=max_length,
+    )
+
+    curve = BatchBezierCurve(keypoints[None], num_approximations=20)
+    stroke_samples = curve.sample_uniform(20)[0].cpu().detach().tolist()
+
+    return stroke_samples, keypoints.cpu().detach(), float(score), num_steps
+
+
+@lru_cache(maxsize=None)
+def is_stroke_rasterizer_available() -> bool:
+    """
+    :return: True if strokes can be rasterized, which requires cairo
+    """
+    try:
+        from competitive_drawing.model_service import StrokeRasterizer  # noqa: F401
+    except (ImportError, OSError) as exception:  # cairocffi raises OSError if libcairo is missing
+        print(f"WARNING: Cannot rasterize strokes ({exception}), classifying preview images instead")
+        return False
+
+    return True
+
+
 class Inferencer:
     """
     Wraps classifier model to handle classifier inference and opponent stroke
-    inference. Uses a mutex to handle access to model resource
+    inference. Uses a mutex to handle access to model resource. Concurrent image
+    inferences are collected by a micro batcher and run as one batched forward pass.
+    Outputs are cached by input content, so repeated classifications of the same
+    canvas return without waiting for the mutex
 
     Models are deployed in TensorRT rather than alternatives such as ORT because
     model gradients are necessary in order to optimize strokes for the AI opponent
 
     :param classifier_model: instance of classifier model
+    :param label_pair_str: label pair classified by the model
+    :param max_batch_size: maximum number of image inferences batched together
+    :param max_batch_wait: maximum number of seconds to wait for a batch to fill
+    :param inference_cache: cache of model outputs, may be shared between
+        inferencers. Defaults to a new cache
     """
-    def __init__(self, classifier_model: torch.nn.Module):
+    def __init__(
+        self,
+        classifier_model: torch.nn.Module,
+        label_pair_str: str = "",
+        max_batch_size: int = SETTINGS.inference_max_batch_size,
+        max_batch_wait: float = SETTINGS.inference_max_batch_wait,
+        inference_cache: Optional[InferenceCache] = None,
+    ):
         self._model = classifier_model
+        self.label_pair_str = label_pair_str
+        self.model_version = get_model_version(classifier_model)
+        self.inference_cache = inference_cache if inference_cache is not None else InferenceCache()
         self.mutex = threading.Semaphore(1)
+        self._preprocessor = InputPreprocessor(max_batch_size=max_batch_size)
+        self._image_batcher = MicroBatcher(
+            self._infer_image_batch,
+            max_batch_size=max_batch_size,
+            max_wait=max_batch_wait,
+            result_timeout=SETTINGS.inference_result_timeout,
+        )
 
 
-    @async_inference
     def infer_image(self, image: Image):
-        input = pil_to_input(image)
-        with torch.no_grad():
-            logits, _confidences = self._model(input)
+        # preprocess in the request thread so the input can be hashed
+        input = self._preprocessor.invert_image(image)
+        return self._infer_cached(input, input.tobytes())
+
+
+    def infer_strokes(self, strokes: List[List[Tuple[float, float]]]):
+        """
+        Classify strokes without rendering an image. Strokes are rasterized
+        by a rasterizer shared between request threads
+
+        :param strokes: polylines of (x, y) canvas pixel positions
+        :return: model outputs
+        """
+        # cairocffi is an optional dependency only needed for stroke inputs
+        from competitive_drawing.model_service.StrokeRasterizer import get_stroke_rasterizer
+
+        input = get_stroke_rasterizer()(strokes)
+        return self._infer_cached(input, input.numpy().tobytes())
+
+
+    def _infer_cached(self, input: Union[numpy.ndarray, torch.Tensor], input_bytes: bytes) -> List[float]:
+        """
+        :param input: preprocessed input submitted to the batcher on a cache miss
+        :param input_bytes: raw bytes of the preprocessed input
+        :return: model outputs
+        """
+        key = InferenceCache.get_key(self.label_pair_str, self.model_version, input_bytes)
+        model_outputs = self.inference_cache.get(key)
+        if model_outputs is None:
+            model_outputs = self._image_batcher.submit(input)
+            self.inference_cache.put(key, model_outputs)
+
+        return model_outputs
 
-        return logits[0].tolist()
-    
 
     @async_inference
-    def infer_stroke(
-        self,
-        image: Image,
-        target_index: int,
-        line_width: float,
-        max_length: float,
-    ):
-        base_canvas = pil_to_input(image)[0][0]
-
-        _loss, keypoints = grid_search_stroke(
-            base_canvas,
-            self._model,
-            target_index,
-            torch.optim.Adamax,
-            { "lr": 0.03 },
-            SearchParameters(
-                max_width=line_width * 4,
-                min_width=line_width
-            ),
-            max_length=max_length,
-        )
+    def _infer_image_batch(self, inputs: List[Union[Image.Image, numpy.ndarray, torch.Tensor]]) -> List[List[float]]:
+        batch = self._preprocessor(inputs)
+        with torch.no_grad():
+            logits, _confidences = self._model(batch)
 
-        curve = BezierCurve(keypoints, num_approximations=20)
-        stroke_samples = [
-            curve.sample(t).cpu().detach().tolist()
-            for t in get_uniform_ts(20)
-        ]
+        return logits.tolist()
+    
 
-        return stroke_samples
+    def close(self):
+        self._image_batcher.close()
 
 
     @property
@@ -0,0 +1,153 @@
+from typing import Any, Callable, List, Optional, Tuple
+
+import time
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests into batches which are processed together by a
+    single worker thread. A batch is processed once it reaches `max_batch_size`
+    requests or `max_wait` seconds have passed since its first request arrived
+
+    Closing stops new submissions while requests which were already submitted
+    are still processed. Any request which cannot be processed fails with a
+    `RuntimeError` rather than blocking its caller
+
+    :param process_batch: function which maps a list of request items to a list
+        of results of the same length
+    :param max_batch_size: maximum number of requests processed in one batch
+    :param max_wait: maximum number of seconds to wait for a batch to fill
+    :param result_timeout: maximum number of seconds `submit` waits for a
+        result, None waits indefinitely
+    """
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int,
+        max_wait: float,
+        result_timeout: Optional[float] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.result_timeout = result_timeout
+
+        self._queue: queue.Queue[Tuple[Any, Future]] = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()  # orders submissions before the closing sentinel
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+
+    def submit(self, item: Any) -> Any:
+        """
+        Submit an item to be processed with the next batch and block until its
+        result is available
+
+        :param item: request item
+        :return: result corresponding to `item`
+        :raises RuntimeError: if the batcher is closed
+        :raises TimeoutError: if no result is available within `result_timeout`
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot submit to a closed batcher")
+            self._queue.put((item, future))
+
+        try:
+            return future.result(timeout=self.result_timeout)
+        except FutureTimeoutError:
+            future.cancel()  # skipped if it has not started processing
+            raise TimeoutError(f"No batch result within {self.result_timeout} seconds")
+
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Stop accepting requests and stop the worker thread once all previously
+        submitted requests have been processed. Requests which are still
+        pending after `timeout` seconds fail
+
+        :param timeout: maximum number of seconds to wait for the worker
+            thread, defaults to `result_timeout`
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout if timeout is not None else self.result_timeout)
+            self._fail_pending()
+
+
+    def _run(self):
+        try:
+            while True:
+                request = self._queue.get()
+                if request is None:
+                    return
+
+                batch = [request]
+                deadline = time.monotonic() + self.max_wait
+                is_closing = False
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+
+                    try:
+                        request = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+
+                    if request is None:
+                        is_closing = True
+                        break
+
+                    batch.append(request)
+
+                self._process(batch)
+                if is_closing:
+                    return
+
+        finally:
+            self._fail_pending()
+
+
+    def _process(self, batch: List[Tuple[Any, Future]]):
+        # requests whose callers timed out are skipped
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if len(batch) <= 0:
+            return
+
+        items = [item for item, _future in batch]
+        try:
+            results = self.process_batch(items)
+        except Exception as exception:
+            for _item, future in batch:
+                future.set_exception(exception)
+            return
+
+        for (_item, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+    def _fail_pending(self):
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+            if request is not None:
+                _item, future = request
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(RuntimeError("Batcher was closed before the request was processed"))
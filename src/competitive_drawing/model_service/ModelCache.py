@@ -0,0 +1,86 @@
+from typing import Callable, Optional
+
+import threading
+from collections import OrderedDict
+
+import torch
+
+from competitive_drawing import SETTINGS
+from .utils import load_model
+
+
+class ModelCache:
+    """
+    In-memory least-recently-used cache of loaded classifier models. Models are
+    only evicted once the cache exceeds its count or memory budget, so label
+    pairs which become active again do not need to be reloaded
+
+    :param load_function: function which loads the model for a label pair string
+    :param max_models: maximum number of models kept in memory
+    :param max_bytes: maximum total size of parameters and buffers kept in
+        memory, defaults to no limit
+    """
+    def __init__(
+        self,
+        load_function: Callable[[str], torch.nn.Module] = load_model,
+        max_models: int = SETTINGS.ms_model_cache_max_models,
+        max_bytes: Optional[int] = SETTINGS.ms_model_cache_max_bytes,
+    ):
+        self.load_function = load_function
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+
+        self._models: OrderedDict[str, torch.nn.Module] = OrderedDict()
+        self._model_bytes: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, label_pair_str: str) -> torch.nn.Module:
+        """
+        Get the model for a label pair, loading it if it is not cached
+
+        :param label_pair_str: label pair string
+        :return: loaded model
+        """
+        with self._lock:
+            if label_pair_str in self._models:
+                self._models.move_to_end(label_pair_str)
+                return self._models[label_pair_str]
+
+        # load outside of lock so other label pairs are not blocked
+        model = self.load_function(label_pair_str)
+
+        with self._lock:
+            if label_pair_str in self._models:  # loaded concurrently
+                self._models.move_to_end(label_pair_str)
+                return self._models[label_pair_str]
+
+            self._models[label_pair_str] = model
+            self._model_bytes[label_pair_str] = _get_model_bytes(model)
+            self._evict()
+
+        return model
+
+
+    def __contains__(self, label_pair_str: str) -> bool:
+        return label_pair_str in self._models
+
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+
+    def _evict(self):
+        while len(self._models) > 1 and (
+            len(self._models) > self.max_models or
+            (self.max_bytes is not None and sum(self._model_bytes.values()) > self.max_bytes)
+        ):
+            label_pair_str, _model = self._models.popitem(last=False)
+            del self._model_bytes[label_pair_str]
+
+
+def _get_model_bytes(model: torch.nn.Module) -> int:
+    return sum(
+        tensor.numel() * tensor.element_size()
+        for tensor in list(model.parameters()) + list(model.buffers())
+    )
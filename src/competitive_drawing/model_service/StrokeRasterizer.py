@@ -0,0 +1,214 @@
+from typing import List, Optional, Tuple
+
+import numpy
+import threading
+import cairocffi as cairo
+
+import torch
+
+from competitive_drawing import SETTINGS
+
+
+Stroke = List[Tuple[float, float]]  # polyline of (x, y) canvas pixel positions
+
+
+class StrokeRasterizer:
+    """
+    Rasterizes stroke vectors directly into model inputs, avoiding the png
+    encode and decode of client rendered previews. Strokes are drawn on a
+    reusable cairo surface with the same rendering settings as
+    `train_v2/dataset/VecToRaster.py` and written into a preallocated tensor.
+    Rasterizers are not thread safe, use `get_stroke_rasterizer` to share a
+    pool of rasterizers between threads
+
+    :param image_size: side length of model inputs in pixels
+    :param canvas_size: side length of the clients' canvas in pixels
+    :param canvas_line_width: width of strokes on the clients' canvas in pixels
+    :param image_padding: padding around the canvas in model input pixels
+    :param static_crop: False if inputs should be cropped to the strokes' bounds
+    """
+    def __init__(
+        self,
+        image_size: int = SETTINGS.image_size,
+        canvas_size: int = SETTINGS.canvas_size,
+        canvas_line_width: float = SETTINGS.canvas_line_width,
+        image_padding: int = SETTINGS.image_padding,
+        static_crop: bool = SETTINGS.static_crop,
+    ):
+        self.image_size = image_size
+        self.canvas_size = canvas_size
+        self.canvas_line_width = canvas_line_width
+        self.image_padding = image_padding
+        self.static_crop = static_crop
+
+        self.surface = cairo.ImageSurface(cairo.FORMAT_A8, image_size, image_size)
+        self.ctx = cairo.Context(self.surface)
+        self.ctx.set_antialias(cairo.ANTIALIAS_BEST)
+        self.ctx.set_line_cap(cairo.LINE_CAP_ROUND)
+        self.ctx.set_line_join(cairo.LINE_JOIN_ROUND)
+
+        # rows of a8 surfaces are padded to the surface stride
+        self._surface_array = numpy.frombuffer(self.surface.get_data(), dtype=numpy.uint8)
+        self._surface_array = self._surface_array.reshape(
+            (image_size, self.surface.get_stride())
+        )[:, :image_size]
+
+        self.input = torch.zeros((1, 1, image_size, image_size), dtype=torch.float)
+
+
+    def __call__(self, strokes: List[Stroke], out: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """
+        Rasterize strokes into a model input. Ink is 1.0 and background is 0.0,
+        matching `pil_to_input`
+
+        :param strokes: polylines of (x, y) canvas pixel positions
+        :param out: tensor with shape (1, 1, image_size, image_size) which
+            receives the input, defaults to this rasterizer's reused input
+            tensor, which is overwritten by the next call
+        :return: model input
+        """
+        out = out if out is not None else self.input
+        offset, scale = self._get_transform(strokes)
+
+        # clear background
+        self.ctx.identity_matrix()
+        self.ctx.set_source_rgba(0, 0, 0, 0)
+        self.ctx.set_operator(cairo.OPERATOR_SOURCE)
+        self.ctx.paint()
+        self.ctx.set_operator(cairo.OPERATOR_OVER)
+
+        # draw strokes in canvas coordinates
+        self.ctx.translate(offset[0], offset[1])
+        self.ctx.scale(scale, scale)
+        self.ctx.set_line_width(self.canvas_line_width)
+        self.ctx.set_source_rgba(0, 0, 0, 1)
+        for stroke in strokes:
+            if len(stroke) < 2:
+                continue  # clients do not draw strokes without movement
+
+            self.ctx.move_to(*stroke[0])
+            for x, y in stroke[1:]:
+                self.ctx.line_to(x, y)
+            self.ctx.stroke()
+
+        self.surface.flush()
+        out[0, 0].copy_(torch.from_numpy(self._surface_array))
+        out.div_(255)
+
+        return out
+
+
+    def _get_transform(self, strokes: List[Stroke]) -> Tuple[Tuple[float, float], float]:
+        """
+        Map canvas coordinates to input coordinates in the same way clients
+        resize the canvas onto the preview
+
+        :param strokes: polylines of (x, y) canvas pixel positions
+        :return: input offset and scale of canvas coordinates
+        """
+        inner_size = self.image_size - self.image_padding
+        points = [point for stroke in strokes if len(stroke) > 1 for point in stroke]
+
+        if self.static_crop or len(points) <= 0:
+            offset = (self.image_padding, self.image_padding)
+            return offset, inner_size / self.canvas_size
+
+        # crop to a square around the strokes' bounds
+        xs, ys = zip(*points)
+        radius = self.canvas_line_width / 2
+        min_x, max_x = min(xs) - radius, max(xs) + radius
+        min_y, max_y = min(ys) - radius, max(ys) + radius
+        crop_diameter = max(max_x - min_x, max_y - min_y, 1.0)
+        crop_x = (max_x + min_x - crop_diameter) / 2
+        crop_y = (max_y + min_y - crop_diameter) / 2
+
+        scale = inner_size / crop_diameter
+        offset = (self.image_padding - crop_x * scale, self.image_padding - crop_y * scale)
+        return offset, scale
+
+
+class StrokeRasterizerPool:
+    """
+    Lock guarded pool of stroke rasterizers shared between threads. Request
+    threads are short lived, so rasterizers cannot be owned by a thread.
+    A rasterizer is only held while drawing and inputs are written into new
+    tensors, so returned inputs remain valid after the rasterizer is reused.
+    The pool grows to the number of concurrent callers
+
+    :param rasterizer_kwargs: arguments used to create rasterizers
+    """
+    def __init__(self, **rasterizer_kwargs):
+        self.rasterizer_kwargs = rasterizer_kwargs
+        self._rasterizers: List[StrokeRasterizer] = []
+        self._lock = threading.Lock()
+
+
+    def __call__(self, strokes: List[Stroke]) -> torch.Tensor:
+        """
+        :param strokes: polylines of (x, y) canvas pixel positions
+        :return: model input with shape (1, 1, image_size, image_size)
+        """
+        with self._lock:
+            rasterizer = self._rasterizers.pop() if len(self._rasterizers) > 0 else None
+
+        # create outside of lock so other callers are not blocked
+        if rasterizer is None:
+            rasterizer = StrokeRasterizer(**self.rasterizer_kwargs)
+
+        try:
+            out = torch.empty((1, 1, rasterizer.image_size, rasterizer.image_size), dtype=torch.float)
+            return rasterizer(strokes, out=out)
+
+        finally:
+            with self._lock:
+                self._rasterizers.append(rasterizer)
+
+
+    def __len__(self) -> int:
+        return len(self._rasterizers)
+
+
+_stroke_rasterizer_pool: Optional[StrokeRasterizerPool] = None
+_stroke_rasterizer_pool_lock = threading.Lock()
+
+
+def get_stroke_rasterizer() -> StrokeRasterizerPool:
+    """
+    Get the process's shared stroke rasterizer pool
+
+    :return: pool which rasterizes strokes into new model inputs
+    """
+    global _stroke_rasterizer_pool
+    with _stroke_rasterizer_pool_lock:
+        if _stroke_rasterizer_pool is None:
+            _stroke_rasterizer_pool = StrokeRasterizerPool()
+
+    return _stroke_rasterizer_pool
+
+
+if __name__ == "__main__":
+    # compare with the pil rendered preview path
+    import time
+    from PIL import Image, ImageDraw
+    from competitive_drawing.model_service.utils import pil_to_input
+
+    strokes = [[(10.0, 10.0), (50.0, 50.0), (60.0, 20.0)], [(80.0, 80.0), (20.0, 90.0)]]
+
+    canvas = Image.new("RGB", (SETTINGS.canvas_size, SETTINGS.canvas_size), "white")
+    draw = ImageDraw.Draw(canvas)
+    for stroke in strokes:
+        draw.line(stroke, fill="black", width=round(SETTINGS.canvas_line_width), joint="curve")
+    preview = canvas.resize((SETTINGS.image_size, SETTINGS.image_size))
+
+    rasterizer = StrokeRasterizer()
+    start = time.perf_counter()
+    for _ in range(1000):
+        input = rasterizer(strokes)
+    print(f"rasterizer: {(time.perf_counter() - start):.3f}ms per input")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        preview_input = pil_to_input(preview)
+    print(f"pil_to_input (without png decode): {(time.perf_counter() - start):.3f}ms per input")
+
+    print(f"mean absolute difference: {(input - preview_input).abs().mean():.4f}")
@@ -0,0 +1,200 @@
+from typing import Optional
+
+import json
+import time
+import threading
+import multiprocessing
+from collections import OrderedDict
+from PIL import Image
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import torch
+
+from competitive_drawing import SETTINGS
+from competitive_drawing.http_client import post, run_async
+from .Inferencer import search_stroke
+from .ModelCache import ModelCache
+
+
+class StrokeSearchQueueFull(Exception):
+    """
+    Raised when the stroke search pool cannot accept any more requests
+    """
+    pass
+
+
+class StrokeSearchPool:
+    """
+    Runs AI stroke searches in a pool of worker processes so that long searches
+    do not hold the inferencer mutex used by image classification or compete
+    for the web worker's GIL. Each worker loads its own copy of the models it
+    needs in a model cache and sends finished strokes directly to the web app.
+    Failed searches are reported to the web app so that the AI's turn is skipped.
+    The best keypoints of each room's latest search are kept to warm start the
+    room's next search, whichever worker runs it
+
+    :param num_workers: number of worker processes
+    :param max_queue_depth: maximum number of searches which may be running or
+        waiting at once. Further requests are rejected with
+        `StrokeSearchQueueFull`
+    :param worker_num_threads: number of torch threads used by each worker
+    :param max_warm_start_rooms: maximum number of rooms whose keypoints are
+        kept, least recently searched rooms are forgotten first
+    """
+    def __init__(
+        self,
+        num_workers: int = SETTINGS.stroke_search_num_workers,
+        max_queue_depth: int = SETTINGS.stroke_search_max_queue_depth,
+        worker_num_threads: int = SETTINGS.stroke_search_worker_num_threads,
+        max_warm_start_rooms: int = SETTINGS.stroke_search_max_warm_start_rooms,
+    ):
+        self.max_queue_depth = max_queue_depth
+        self.max_warm_start_rooms = max_warm_start_rooms
+        self._slots = threading.BoundedSemaphore(max_queue_depth)
+        self._room_keypoints: OrderedDict[str, torch.Tensor] = OrderedDict()
+        self._room_keypoints_lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_worker,
+            initargs=(worker_num_threads, ),
+        )
+
+
+    def submit(
+        self,
+        label_pair_str: str,
+        room_id: str,
+        image: Image,
+        target_index: int,
+        line_width: float,
+        max_length: float,
+    ) -> Future:
+        """
+        Queue a stroke search. The resulting stroke is sent to the web app by the
+        worker once the search finishes
+
+        :param label_pair_str: label pair of the model used for search
+        :param room_id: room which receives the stroke
+        :param image: image of the current canvas
+        :param target_index: index of the classifier output being optimized
+        :param line_width: width of the stroke in image pixels
+        :param max_length: maximum length of the stroke in image pixels
+        :return: future which resolves once the stroke has been sent
+        """
+        if not self._slots.acquire(blocking=False):
+            raise StrokeSearchQueueFull(
+                f"Stroke search queue is full ({self.max_queue_depth} searches pending)"
+            )
+
+        with self._room_keypoints_lock:
+            previous_keypoints = self._room_keypoints.get(room_id)
+
+        try:
+            future = self._executor.submit(
+                _search_and_send_stroke,
+                label_pair_str, room_id, image, target_index, line_width, max_length,
+                previous_keypoints,
+            )
+        except Exception:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda future: self._on_done(room_id, future))
+
+        return future
+
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+    def _on_done(self, room_id: str, future: Future):
+        self._slots.release()
+
+        if future.cancelled():
+            return
+
+        if future.exception() is not None:
+            print(f"WARNING: Stroke search for room {room_id} failed: {future.exception()}")
+            # posting blocks, so it runs on the http client threads rather than the executor's
+            run_async(_report_failure, room_id, str(future.exception()))
+            return
+
+        with self._room_keypoints_lock:
+            self._room_keypoints[room_id] = future.result()
+            self._room_keypoints.move_to_end(room_id)
+            while len(self._room_keypoints) > self.max_warm_start_rooms:
+                self._room_keypoints.popitem(last=False)
+
+
+def _report_failure(room_id: str, error: str):
+    """
+    Notify the web app that no stroke will be sent to the room so that the AI's
+    turn is skipped
+
+    :param room_id: room whose stroke search failed
+    :param error: description of the failure
+    """
+    try:
+        post(
+            f"{SETTINGS.ws_base}/ai_stroke_failed",
+            headers={"Content-type": "application/json"},
+            data=json.dumps({
+                "roomId": room_id,
+                "error": error,
+            })
+        )
+    except Exception as exception:
+        print(f"WARNING: Could not report failed stroke search for room {room_id}: {exception}")
+
+
+""" Worker process """
+
+
+_worker_model_cache: Optional[ModelCache] = None
+
+
+def _initialize_worker(num_threads: int):
+    global _worker_model_cache
+
+    torch.set_num_threads(num_threads)
+    _worker_model_cache = ModelCache()
+
+
+def _search_and_send_stroke(
+    label_pair_str: str,
+    room_id: str,
+    image: Image,
+    target_index: int,
+    line_width: float,
+    max_length: float,
+    previous_keypoints: Optional[torch.Tensor],
+) -> torch.Tensor:
+    model = _worker_model_cache.get(label_pair_str)
+    start_time = time.monotonic()
+    stroke_samples, keypoints, score, num_steps = search_stroke(
+        model, image, target_index, line_width, max_length, previous_keypoints
+    )
+    duration = time.monotonic() - start_time
+
+    time_limit = SETTINGS.stroke_search_time_limit
+    if time_limit is not None and duration >= time_limit:
+        print(
+            f"WARNING: Stroke search for room {room_id} reached its time limit "
+            f"after {num_steps} steps with score {score:.3f}"
+        )
+
+    post(
+        f"{SETTINGS.ws_base}/ai_stroke",
+        headers={"Content-type": "application/json"},
+        data=json.dumps({
+            "strokeSamples": stroke_samples,
+            "roomId": room_id,
+            "score": score,
+            "numSteps": num_steps,
+            "duration": duration,
+        })
+    )
+
+    return keypoints
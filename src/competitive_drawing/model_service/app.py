@@ -9,6 +9,7 @@ from flask_cors import CORS
 # implementations
 from .routes import make_routes_blueprint
 from .manager import ModelManager
+from .StrokeSearchPool import StrokeSearchPool
 from competitive_drawing import SETTINGS
 
 
@@ -27,8 +28,11 @@ def create_app() -> Flask:
     # model manager
     model_manager = ModelManager()
 
+    # stroke search workers
+    stroke_search_pool = StrokeSearchPool()
+
     # routes
-    routes_blueprint = make_routes_blueprint(model_manager)
+    routes_blueprint = make_routes_blueprint(model_manager, stroke_search_pool)
     app.register_blueprint(routes_blueprint)
 
     return app
@@ -1,28 +1,51 @@
 from typing import Dict, Tuple
 
-import copy
+import uuid
 import torch
+import threading
 
 from competitive_drawing import SETTINGS
 from .Inferencer import Inferencer
-from .utils import load_model, label_pair_to_str
+from .ModelCache import ModelCache
+from .InferenceCache import InferenceCache
+from .utils import label_pair_to_str
 
 
 class ModelManager():
     def __init__(self):
         self.inferencers: Dict[str, torch.module.nn] = {}  # maps label pairs to inferencers
+        self.model_cache = ModelCache()  # loaded models outlive their inferencers
+        self.inference_cache = InferenceCache()  # shared by all inferencers
+        self.label_pair_games: Dict[str, int] = {}  # maps label pairs to number of games
+        self.client_label_pair_games: Dict[str, Dict[str, int]] = {}  # games of each web app shard
 
+        # lets clients detect a restart and resend their full game counts
+        self.instance_id = uuid.uuid4().hex
 
-    def scale(self, label_pair_games: Dict[str, int]):
+
+    def scale(self, label_pair_games: Dict[str, int], client_id: str = "0"):
         """
         Determines how to scale inferences with regards to the number of active
         games for each label pair. The current policy is to have exactly one
         inferencer for each active label pair, no matter how many games. Future
         policies may scale linearly with the number of games or mutex delay time.
 
+        Stopping an inferencer does not unload its model. Models stay in the
+        model cache until they are evicted by more recently used models
+
         :param label_pair_games: Dictionary mapping label pair strings to number
             of active games
+        :param client_id: web app shard which sent the counts. Counts of all
+            shards are summed
         """
+        self.client_label_pair_games[client_id] = dict(label_pair_games)
+
+        label_pair_games = {}
+        for client_games in self.client_label_pair_games.values():
+            for label_pair_str, num_games in client_games.items():
+                label_pair_games[label_pair_str] = label_pair_games.get(label_pair_str, 0) + num_games
+        self.label_pair_games = label_pair_games
+
         # scale up
         for label_pair_str, num_games in label_pair_games.items():
             if num_games > 0 and label_pair_str not in self.inferencers:
@@ -35,12 +58,54 @@ class ModelManager():
                 self.stop_inferencer(label_pair_str)
 
 
+    def update_games(self, label_pair_deltas: Dict[str, int], client_id: str = "0"):
+        """
+        Apply changes in the number of active games and scale only the label
+        pairs which changed. See `scale` for the scaling policy
+
+        :param label_pair_deltas: Dictionary mapping label pair strings to the
+            change in number of active games
+        :param client_id: web app shard which sent the changes
+        """
+        client_games = self.client_label_pair_games.setdefault(client_id, {})
+        for label_pair_str, delta in label_pair_deltas.items():
+            client_games[label_pair_str] = client_games.get(label_pair_str, 0) + delta
+
+            num_games = self.label_pair_games.get(label_pair_str, 0) + delta
+            self.label_pair_games[label_pair_str] = num_games
+
+            if num_games > 0 and label_pair_str not in self.inferencers:
+                self.start_inferencer(label_pair_str)
+
+            if num_games <= 0 and label_pair_str in self.inferencers:
+                self.stop_inferencer(label_pair_str)
+
+
     def start_inferencer(self, label_pair_str: str):
-        self.inferencers[label_pair_str] = Inferencer(load_model(label_pair_str))
+        self.inferencers[label_pair_str] = Inferencer(
+            self.model_cache.get(label_pair_str),
+            label_pair_str,
+            inference_cache=self.inference_cache,
+        )
+
 
+    def stop_inferencer(self, label_pair_str: str, grace_period: float = SETTINGS.inferencer_close_grace_period):
+        """
+        Remove an inferencer so that new requests no longer find it. Requests
+        which already hold the inferencer may still submit during the grace
+        period, after which it is closed and its queued requests are drained
 
-    def stop_inferencer(self, label_pair_str: str):
-        del self.inferencers[label_pair_str]
+        :param label_pair_str: label pair of the inferencer
+        :param grace_period: number of seconds before the inferencer is closed
+        """
+        inferencer = self.inferencers.pop(label_pair_str)
+        if grace_period <= 0:
+            inferencer.close()
+            return
+
+        close_timer = threading.Timer(grace_period, inferencer.close)
+        close_timer.daemon = True
+        close_timer.start()
 
 
     def get_inferencer(self, label_pair: Tuple[str, str]):
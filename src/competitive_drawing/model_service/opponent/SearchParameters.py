@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Tuple, Optional
 from pydantic import BaseModel, Field
 
 
@@ -13,6 +13,56 @@ class SearchParameters(BaseModel):
     max_aa: float = Field(default=0.35)
     min_aa: float = Field(default=0.9)
     max_steps: int = Field(default=125)
+    patience: Optional[int] = Field(
+        default=None,
+        description=(
+            "number of steps a candidate's score may go without improving by "
+            "more than `min_score_delta` before it is considered converged. "
+            "None disables convergence detection"
+        )
+    )
+    min_score_delta: float = Field(default=0.001)
+    score_threshold: Optional[float] = Field(
+        default=None,
+        description=(
+            "candidates whose score reaches this value are considered converged. "
+            "None disables the threshold"
+        )
+    )
+    prune_step: Optional[int] = Field(
+        default=None,
+        description="step at which the lowest scoring candidates are pruned. None disables pruning"
+    )
+    prune_keep_fraction: float = Field(
+        default=0.34,
+        description="fraction of candidates which are kept when pruning"
+    )
+    num_saliency_seeds: int = Field(
+        default=3,
+        description="number of seeds placed at peaks of the classifier's saliency"
+    )
+    warm_start_grid_shape: Tuple[int, int] = Field(
+        default=(2, 2),
+        description="grid of random candidates searched alongside seed keypoints"
+    )
+    warm_start_prune_step: Optional[int] = Field(
+        default=None,
+        description=(
+            "step at which candidates are pruned when searching from seed "
+            "keypoints. None disables pruning"
+        )
+    )
+    time_limit: Optional[float] = Field(
+        default=None,
+        description=(
+            "number of seconds the search may run. Once it elapses, the search "
+            "stops and returns as if it had finished. None disables the limit"
+        )
+    )
     return_best: bool = Field(default=False)
     draw_output: bool = Field(default=False)
     device: str = Field(default="cpu")
+    seed: Optional[int] = Field(
+        default=None,
+        description="seed used for grid initialization and curve truncation"
+    )
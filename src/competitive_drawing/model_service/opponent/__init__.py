@@ -1,4 +1,5 @@
 from .search import grid_search_stroke
-from .models.BezierCurve import BezierCurve
+from .seeds import get_seed_keypoints
+from .models.BatchBezierCurve import BatchBezierCurve
 from .models.helpers import get_uniform_ts
 from .SearchParameters import SearchParameters
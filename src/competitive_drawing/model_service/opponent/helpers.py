@@ -28,6 +28,38 @@ def make_hooked_optimizer(
     return HookedOptimizer(*optimizer_args, **optimizer_kwargs)
 
 
+def prune_optimizer_state(
+    optimizer: torch.optim.Optimizer,
+    old_parameter: torch.nn.Parameter,
+    new_parameter: torch.nn.Parameter,
+    keep_indices: torch.Tensor
+):
+    """
+    Replace `old_parameter` with `new_parameter` in `optimizer`, indexing the
+    optimizer state of the old parameter along its first dimension
+
+    :param optimizer: optimizer whose parameter is replaced
+    :param old_parameter: parameter currently being optimized
+    :param new_parameter: pruned parameter which replaces `old_parameter`
+    :param keep_indices: indices along the first dimension which are kept
+    """
+    old_state = optimizer.state.pop(old_parameter, {})
+    optimizer.state[new_parameter] = {
+        key: (
+            value[keep_indices]
+            if isinstance(value, torch.Tensor) and value.shape[:1] == old_parameter.shape[:1]
+            else value
+        )
+        for key, value in old_state.items()
+    }
+
+    for param_group in optimizer.param_groups:
+        param_group["params"] = [
+            new_parameter if param is old_parameter else param
+            for param in param_group["params"]
+        ]
+
+
 def draw_output_and_target(
     output_canvas: torch.Tensor,
     target_canvas: torch.Tensor
@@ -0,0 +1,149 @@
+from typing import Optional
+
+import torch
+
+from .helpers import get_uniform_ts, get_bernstein_basis
+
+
+class BatchBezierCurve():
+    def __init__(
+        self,
+        key_points: torch.Tensor,
+        num_approximations: int = 20
+    ):
+        """
+        Models a batch of bezier curves parameterized by key points. All curves
+        are evaluated at once using a precomputed bernstein basis matrix.
+        Sampling points along the curves is differentiable with respect to key
+        points
+
+        :param key_points: tensor of key points with shape
+            (batch, num_key_points, 2)
+        :param num_approximations: number of approximation points used for
+            arc_length and truncation calculations, defaults to 20
+        """
+        self.key_points = key_points
+        self.num_approximations = num_approximations
+        self._device = key_points.device
+
+        self._approx_ts = torch.tensor(
+            get_uniform_ts(num_approximations), dtype=key_points.dtype, device=self._device
+        )
+        self._approx_points = self.sample_uniform(num_approximations)
+        self._approx_lengths = self._get_cumulative_distances()
+
+
+    def sample_uniform(self, num_samples: int) -> torch.Tensor:
+        """
+        Sample points at uniformly spaced ts along every curve
+
+        :param num_samples: number of ts which evenly divide the interval [0, 1]
+        :return: sampled points with shape (batch, num_samples, 2)
+        """
+        basis = get_bernstein_basis(self.key_points.shape[1], num_samples, str(self._device))
+        return torch.matmul(basis.to(self.key_points.dtype), self.key_points)
+
+
+    @property
+    def arc_lengths(self) -> torch.Tensor:
+        return self._approx_lengths[:, -1]
+
+
+    def truncate(
+        self,
+        normed_lengths: torch.Tensor,
+        keep_start: torch.Tensor,
+        curve_mask: Optional[torch.Tensor] = None,
+    ):
+        """
+        Subdivision algorithm. Splits each curve at the parameter whose arc length
+        fraction matches `normed_lengths` and keeps either the start or end
+        portion of the curve. Curves outside of `curve_mask` are left unchanged
+
+        :param normed_lengths: fraction of each curve's arc length to keep
+        :param keep_start: True for curves whose start portion is kept, False for
+            curves whose end portion is kept
+        :param curve_mask: True for curves which should be truncated, defaults to
+            all curves
+        """
+        with torch.no_grad():
+            # find parameter t whose cumulative arc length matches the target
+            target_lengths = torch.where(
+                keep_start,
+                normed_lengths * self.arc_lengths,
+                (1.0 - normed_lengths) * self.arc_lengths
+            )
+            real_ts = self._length_to_t(target_lengths)
+
+            # de casteljau's algorithm
+            degree_key_points = [self.key_points]
+            for _ in range(self.key_points.shape[1] - 1):
+                prev_key_points = degree_key_points[-1]
+                degree_key_points.append(torch.lerp(
+                    prev_key_points[:, :-1],
+                    prev_key_points[:, 1:],
+                    real_ts[:, None, None]
+                ))
+
+            start_key_points = torch.stack([
+                key_points[:, 0]
+                for key_points in degree_key_points
+            ], dim=1)
+            end_key_points = torch.stack([
+                key_points[:, -1]
+                for key_points in reversed(degree_key_points)
+            ], dim=1)
+
+            new_key_points = torch.where(
+                keep_start[:, None, None], start_key_points, end_key_points
+            )
+
+        if curve_mask is not None:
+            new_key_points = torch.where(curve_mask[:, None, None], new_key_points, self.key_points)
+
+        self.__init__(
+            new_key_points,
+            num_approximations=self.num_approximations
+        )
+
+
+    def _length_to_t(self, target_lengths: torch.Tensor) -> torch.Tensor:
+        """
+        Linearly interpolate between approximation points to find the parameter t
+        at which each curve reaches its target cumulative arc length
+
+        :param target_lengths: target arc length for each curve
+        :return: parameter t for each curve
+        """
+        right_indices = torch.searchsorted(self._approx_lengths, target_lengths[:, None])
+        right_indices = torch.clamp(right_indices, 1, self.num_approximations - 1)
+        left_indices = right_indices - 1
+
+        left_lengths = torch.gather(self._approx_lengths, 1, left_indices)[:, 0]
+        right_lengths = torch.gather(self._approx_lengths, 1, right_indices)[:, 0]
+        segment_lengths = right_lengths - left_lengths
+        lerp_ts = torch.where(
+            segment_lengths > 0.0,
+            (target_lengths - left_lengths) / torch.clamp(segment_lengths, min=1e-12),
+            torch.zeros_like(segment_lengths)
+        )
+        lerp_ts = torch.clamp(lerp_ts, 0.0, 1.0)
+
+        return torch.lerp(
+            self._approx_ts[left_indices[:, 0]],
+            self._approx_ts[right_indices[:, 0]],
+            lerp_ts
+        )
+
+
+    def _get_cumulative_distances(self) -> torch.Tensor:
+        """
+        Cumulative arc length at each approximation point, starting at zero
+
+        :return: cumulative distances with shape (batch, num_approximations)
+        """
+        segment_lengths = torch.norm(
+            self._approx_points[:, 1:] - self._approx_points[:, :-1],
+            dim=2
+        )
+        return torch.nn.functional.pad(torch.cumsum(segment_lengths, dim=1), (1, 0))
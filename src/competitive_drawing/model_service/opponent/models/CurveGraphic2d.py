@@ -3,8 +3,8 @@ from typing import List, Union, Optional
 import torch
 import numpy
 
-from .BezierCurve import BezierCurve
-from .helpers import get_uniform_ts
+from .BatchBezierCurve import BatchBezierCurve
+from .helpers import get_uniform_ts, get_pixel_positions
 
 EPSILON = 0.000001  # autograd has a hard time with 0.0^x
 
@@ -16,17 +16,26 @@ class CurveGraphic2d(torch.nn.Module):
     :param canvas_shape: shape of output canvas
     :param num_samples: number of samples used to sample bezier curve(s)
     :param max_length: maximum arc length of bezier curve(s)
+    :param vectorized: True if distances should be computed against a cached pixel
+        grid without materializing per-sample copies, False to use the original
+        dense implementation. Both produce the same canvases and gradients
+    :param generator: random generator used to choose which side of over-length
+        curves is truncated, defaults to the global generator
     """
     def __init__(
         self,
         canvas_shape: List[int],
         num_samples: int = 15,
         max_length: float = 80,
+        vectorized: bool = True,
+        generator: Optional[torch.Generator] = None,
     ):
         super().__init__()
         self.canvas_shape = canvas_shape
         self.num_samples = num_samples
         self.max_length = max_length
+        self.vectorized = vectorized
+        self.generator = generator
 
         self.max_distance = torch.norm(
             torch.tensor(canvas_shape) - torch.tensor([0.0, 0.0])
@@ -59,12 +68,73 @@ class CurveGraphic2d(torch.nn.Module):
         # get sample points
         sample_points = self.get_sample_points(key_points)
 
+        # compute the minimum distance between each pixel position and the curve
+        if self.vectorized:
+            minimum_distances = self._get_minimum_distances(sample_points)
+        else:
+            minimum_distances = self._get_minimum_distances_dense(sample_points)
+
+        # transform distances into pixel values
+        widths = torch.tensor(widths, device=inputs.device).reshape((-1, 1))
+        aa_factors = torch.tensor(aa_factors, device=inputs.device).reshape((-1, 1))
+
+        canvas = minimum_distances / widths
+        canvas = canvas + EPSILON
+        canvas = canvas ** aa_factors
+        canvas = 1 - canvas
+        canvas = torch.clamp(canvas, 0.0, 1.0)
+        canvas = canvas.reshape((sample_points.shape[0], *self.canvas_shape))
+
+        return canvas
+
+
+    def _get_minimum_distances(self, sample_points: torch.Tensor) -> torch.Tensor:
+        """
+        Compute the distance from each pixel to its nearest sample point. The
+        nearest sample is found without gradients by keeping a running minimum
+        over samples, then the distance to that sample is recomputed with
+        gradients. This matches the gradients of taking the minimum over all
+        distances while keeping peak memory at (curves x H*W)
+
+        :param sample_points: points sampled along each curve with shape
+            (curves, samples, 2)
+        :return: minimum distances with shape (curves, H*W)
+        """
+        positions = get_pixel_positions(tuple(self.canvas_shape), str(sample_points.device))
+
+        with torch.no_grad():
+            nearest_distances = torch.norm(positions[None, :, :] - sample_points[:, 0:1, :], dim=2)
+            nearest_indices = torch.zeros(
+                nearest_distances.shape, dtype=torch.long, device=sample_points.device
+            )
+            for sample_i in range(1, sample_points.shape[1]):
+                distances = torch.norm(positions[None, :, :] - sample_points[:, sample_i:sample_i + 1, :], dim=2)
+                is_nearer = distances < nearest_distances  # ties keep the first sample, like torch.min
+                nearest_distances = torch.where(is_nearer, distances, nearest_distances)
+                nearest_indices.masked_fill_(is_nearer, sample_i)
+
+        nearest_points = torch.gather(
+            sample_points, 1, nearest_indices[:, :, None].expand(-1, -1, 2)
+        )
+
+        return torch.norm(positions[None, :, :] - nearest_points, dim=2)
+
+
+    def _get_minimum_distances_dense(self, sample_points: torch.Tensor) -> torch.Tensor:
+        """
+        Reference implementation which computes the distance between every pixel
+        and every sample point before taking the minimum
+
+        :param sample_points: points sampled along each curve with shape
+            (curves, samples, 2)
+        :return: minimum distances with shape (curves, H*W)
+        """
         # allocate position array
         positions = torch.from_numpy(numpy.array([[
             [y, x]
             for y in range(self.canvas_shape[0])
             for x in range(self.canvas_shape[1])
-        ]]))
+        ]])).to(sample_points.device)
 
         # prepare tensors
         positions_repeated = positions.repeat(sample_points.shape[0], sample_points.shape[1], 1)
@@ -75,45 +145,31 @@ class CurveGraphic2d(torch.nn.Module):
         distances = distances.reshape((sample_points.shape[0], sample_points.shape[1], -1))
 
         # take the minimum distance for each position
-        minimum_distances = torch.min(distances, dim=1).values
-
-        # transform distances into pixel values
-        widths = torch.tensor(widths).reshape((-1, 1)).repeat(1, minimum_distances.shape[1])
-        aa_factors = torch.tensor(aa_factors).reshape((-1, 1)).repeat(1, minimum_distances.shape[1])
-
-        canvas = torch.zeros(self.canvas_shape, device=inputs.device, dtype=inputs.dtype)
-        canvas = minimum_distances / widths
-        canvas = canvas + EPSILON
-        canvas = canvas ** aa_factors
-        canvas = 1 - canvas
-        canvas = torch.clamp(canvas, 0.0, 1.0)
-        canvas = canvas.reshape((sample_points.shape[0], *self.canvas_shape))
-
-        return canvas
+        return torch.min(distances, dim=1).values
 
 
     def get_sample_points(self, key_points: torch.tensor) -> torch.Tensor:
-        curves = [
-            BezierCurve(key_point_set, num_approximations=self.num_samples)
-            for key_point_set in key_points
-        ]
-
-        for curve in curves:
-            if curve.arc_length > self.max_length:
-                curve.truncate(self.max_length / curve.arc_length)
-
-        sample_ts = get_uniform_ts(self.num_samples)
-
-        # TODO: rework
-        sample_points = torch.cat([
-            torch.cat([
-                curve.sample(sample_t)
-                for sample_t in sample_ts
-            ])
-            for curve in curves
-        ]).reshape((len(curves), -1, 2))
-
-        return sample_points
+        """
+        Sample points uniformly along each curve. Curves longer than
+        `max_length` are truncated from a randomly chosen side
+
+        :param key_points: tensor of key points with shape (curves, keypoints, 2)
+        :return: sample points with shape (curves, num_samples, 2)
+        """
+        curves = BatchBezierCurve(key_points, num_approximations=self.num_samples)
+
+        is_too_long = curves.arc_lengths > self.max_length
+        if torch.any(is_too_long):
+            keep_start = torch.randint(
+                0, 2, (len(key_points), ), generator=self.generator
+            ).to(device=key_points.device, dtype=torch.bool)
+            curves.truncate(
+                self.max_length / curves.arc_lengths,
+                keep_start,
+                curve_mask=is_too_long
+            )
+
+        return curves.sample_uniform(self.num_samples)
 
 
     @property
@@ -1,9 +1,9 @@
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
 import torch
 
 from .CurveGraphic2d import CurveGraphic2d
-from .BezierCurve import BezierCurve
+from .BatchBezierCurve import BatchBezierCurve
 from .helpers import lerp
 
 
@@ -21,6 +21,8 @@ class StrokeScoreModel(torch.nn.Module):
 
     :param base_canvas: canvas upon which curves are drawn
     :param initial_inputs: 
+    :param seed: seed used to choose which side of over-length curves is
+        truncated, defaults to a random seed
     """
     def __init__(
         self,
@@ -31,6 +33,7 @@ class StrokeScoreModel(torch.nn.Module):
         max_length: float,
         widths: List[float],
         aa_factors: List[float],
+        seed: Optional[int] = None,
         **curve_kwargs
     ):
         super().__init__()
@@ -45,9 +48,14 @@ class StrokeScoreModel(torch.nn.Module):
         self.max_length = max_length
         self.widths = widths
         self.aa_factors = aa_factors
-        self._device = "cpu"
 
-        self.graphic = CurveGraphic2d(base_canvas.shape, **curve_kwargs)
+        self.generator = torch.Generator()
+        if seed is not None:
+            self.generator.manual_seed(seed)
+        else:
+            self.generator.seed()
+
+        self.graphic = CurveGraphic2d(base_canvas.shape, generator=self.generator, **curve_kwargs)
 
         # freeze score model
         for param in self.score_model.parameters():
@@ -78,30 +86,49 @@ class StrokeScoreModel(torch.nn.Module):
             self.aa_factors[stroke_index] = lerp(max_aa, min_aa, score)
     
 
+    def prune(self, keep_indices: torch.Tensor):
+        """
+        Remove candidate curves which are not in `keep_indices`. Note that
+        `inputs` is replaced with a new parameter, so optimizers must be updated
+
+        :param keep_indices: indices of candidate curves which are kept
+        """
+        keep_indices_list = keep_indices.tolist()
+        self.inputs = torch.nn.Parameter(self.inputs.detach()[keep_indices], requires_grad=True)
+        self.widths = [self.widths[index] for index in keep_indices_list]
+        self.aa_factors = [self.aa_factors[index] for index in keep_indices_list]
+
+
     def constrain_keypoints(self):
         """
+        Truncate curves which exceed the maximum arc length and clamp endpoints
+        to the canvas. All curves are subdivided at once and written back with a
+        single in-place update. The side from which each over-length curve is
+        truncated is drawn from the seeded generator
         """
         with torch.no_grad():
             # enforce maximum length
-            canvas_shape_tensor = torch.tensor(self.graphic.canvas_shape, device=self._device)
-            key_points = [input * canvas_shape_tensor for input in self.inputs]
-            curves = [
-                BezierCurve(
-                    key_point_set,
-                    num_approximations=self.graphic.num_samples  # technically could be anything
-                )
-                for key_point_set in key_points
-            ]
-
-            for curve_i, curve in enumerate(curves):
-                if curve.arc_length > self.max_length:
-                    curve.truncate(self.max_length / curve.arc_length)
-
-                    new_key_points = curve.key_points
-                    new_inputs = [key_point / canvas_shape_tensor for key_point in new_key_points]
-                    for input_i, new_input in enumerate(new_inputs):
-                        self.inputs.data[curve_i][input_i] = new_input.data
-
+            canvas_shape_tensor = torch.tensor(
+                self.graphic.canvas_shape, dtype=self.inputs.dtype, device=self.inputs.device
+            )
+            curves = BatchBezierCurve(
+                self.inputs * canvas_shape_tensor,
+                num_approximations=self.graphic.num_samples  # technically could be anything
+            )
+
+            is_too_long = curves.arc_lengths > self.max_length
+            keep_start = torch.randint(
+                0, 2, (len(self.inputs), ), generator=self.generator
+            ).to(device=self.inputs.device, dtype=torch.bool)
+
+            # ratios are only computed for over-length curves, whose arc lengths are
+            # positive, so zero-length curves cannot produce inf or nan
+            safe_arc_lengths = torch.where(is_too_long, curves.arc_lengths, torch.ones_like(curves.arc_lengths))
+            normed_lengths = torch.where(is_too_long, self.max_length / safe_arc_lengths, 1.0)
+            curves.truncate(normed_lengths, keep_start, curve_mask=is_too_long)
+
+            new_inputs = curves.key_points / canvas_shape_tensor
+            self.inputs.copy_(torch.where(is_too_long[:, None, None], new_inputs, self.inputs))
 
             # clamp endpoints
             self.inputs[:, 0].clamp_(0.0, 1.0)
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Tuple
 
 import math
 import torch
@@ -49,15 +49,44 @@ def get_uniform_ts(num_ts: int) -> List[float]:
     return [t / (num_ts - 1) for t in range(num_ts)]
 
 
-def torch_fuzzy_search(array: torch.Tensor, value: float) -> int:
+@cache
+def get_bernstein_basis(num_key_points: int, num_ts: int, device: str) -> torch.Tensor:
+    """
+    Get the matrix of bernstein polynomial coefficients for uniformly spaced ts.
+    Multiplying this matrix by a set of key points samples the bezier curve at
+    each t. Results are cached so each basis is only built once
+
+    :param num_key_points: number of key points which define the curve
+    :param num_ts: number of uniformly spaced ts
+    :param device: device on which basis is allocated
+    :return: basis matrix with shape (num_ts, num_key_points)
     """
-    Finds the index in array closest to value
+    return torch.tensor([
+        [
+            bernstein_polynomial(num_key_points - 1, key_point_i, t)
+            for key_point_i in range(num_key_points)
+        ]
+        for t in get_uniform_ts(num_ts)
+    ], dtype=torch.float32, device=device)
 
-    :param array: array to search
-    :param value: target value to search for
-    :return: index of array whose value is closest to value
+
+@cache
+def get_pixel_positions(canvas_shape: Tuple[int, int], device: str) -> torch.Tensor:
     """
-    return torch.argmin(torch.abs(array - value))
+    Get the (y, x) position of every pixel on a canvas in row-major order. Results
+    are cached so the grid is only built once per canvas shape and device
+
+    :param canvas_shape: shape of canvas
+    :param device: device on which positions are allocated
+    :return: tensor of pixel positions with shape (H * W, 2)
+    """
+    ys, xs = torch.meshgrid(
+        torch.arange(canvas_shape[0], dtype=torch.float32, device=device),
+        torch.arange(canvas_shape[1], dtype=torch.float32, device=device),
+        indexing="ij"
+    )
+
+    return torch.stack([ys.flatten(), xs.flatten()], dim=1)
 
 
 def lerp(start: float, end: float, weight: float) -> float:
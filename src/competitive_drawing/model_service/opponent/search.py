@@ -1,11 +1,11 @@
 from typing import Optional, List, Dict, Any, Tuple
 
-import cv2
+import time
 import torch
 import numpy
 
 from .models.StrokeScoreModel import StrokeScoreModel
-from .helpers import make_hooked_optimizer
+from .helpers import make_hooked_optimizer, prune_optimizer_state
 from .SearchParameters import SearchParameters
 
 
@@ -16,13 +16,25 @@ def grid_search_stroke(
     optimizer_class: torch.optim.Optimizer,
     optimizer_kwargs: Dict[str, Any],
     search_parameters: SearchParameters,
+    seed_keypoints: Optional[torch.Tensor] = None,
     **model_kwargs,
-) -> Tuple[float, torch.Tensor]:
+) -> Tuple[float, torch.Tensor, int]:
     """
     Search for an optimal stroke by randomly initializing strokes within a grid
     pattern. Score is optimized with respect to the `target_index` of the score
     model
 
+    The search stops early once every remaining candidate has either reached
+    `score_threshold` or has not improved by more than `min_score_delta` for
+    `patience` steps. At `prune_step`, only the highest scoring fraction of
+    candidates continues to be optimized. The clock is checked between steps,
+    and once `time_limit` elapses the search stops. Either way, the keypoints
+    chosen by `return_best` are returned
+
+    When `seed_keypoints` are given, such as those from `get_seed_keypoints`,
+    seeds are searched alongside a smaller grid of random candidates and
+    pruning happens earlier, since seeds usually start near a good stroke
+
     :param base_canvas: canvas upon which strokes are drawn
     :param grid_shape: number of rows and columns of grid
     :param score_model: model whose output is used as an objective function
@@ -30,10 +42,25 @@ def grid_search_stroke(
     :param optimizer_class: class used to optimize stroke
     :param optimizer_kwargs: arguments used to initialize optimizer
     :param search_parameters: parameters used to search for curves
-    :return: best score and curve keypoints
+    :param seed_keypoints: normalized keypoints with shape
+        (num_seeds, num_keypoints, 2) which warm start the search
+    :return: best score, curve keypoints, and number of steps run
     """
-    # randomly initialize keypoints on grid
-    initial_inputs = _initialize_grid(search_parameters)
+    deadline = (
+        time.monotonic() + search_parameters.time_limit
+        if search_parameters.time_limit is not None
+        else None
+    )
+
+    # randomly initialize keypoints on grid, after any seeds
+    prune_step = search_parameters.prune_step
+    if seed_keypoints is not None and len(seed_keypoints) > 0:
+        grid_inputs = _initialize_grid(search_parameters.warm_start_grid_shape, search_parameters)
+        initial_inputs = torch.cat([seed_keypoints.detach().cpu().to(grid_inputs.dtype), grid_inputs])
+        prune_step = search_parameters.warm_start_prune_step
+    else:
+        initial_inputs = _initialize_grid(search_parameters.grid_shape, search_parameters)
+    num_candidates = initial_inputs.shape[0]
 
     # create model with initial keypoints
     model = StrokeScoreModel(
@@ -41,8 +68,9 @@ def grid_search_stroke(
         initial_inputs,
         score_model,
         target_index=target_index,
-        widths=[search_parameters.max_width for _ in range(initial_inputs.shape[0])],
-        aa_factors=[search_parameters.min_aa for _ in range(initial_inputs.shape[0])],
+        widths=[search_parameters.max_width for _ in range(num_candidates)],
+        aa_factors=[search_parameters.min_aa for _ in range(num_candidates)],
+        seed=search_parameters.seed,
         **model_kwargs
     )
     model = model.to(search_parameters.device)
@@ -57,9 +85,24 @@ def grid_search_stroke(
 
     # optimize
     return_score = 0.0
-    return_keypoints = list(model.parameters()).copy()[0]
-    scores = torch.zeros([initial_inputs.shape[0]], dtype=torch.float32, device=search_parameters.device)
-    for _step_num in range(search_parameters.max_steps):
+    return_keypoints = model.inputs.detach().clone()[0]
+    scores = torch.zeros([num_candidates], dtype=torch.float32, device=search_parameters.device)
+    best_candidate_scores = torch.full_like(scores, float("-inf"))
+    steps_since_improvement = torch.zeros([num_candidates], dtype=torch.long, device=search_parameters.device)
+    num_steps = 0
+    for step_num in range(search_parameters.max_steps):
+        # prune hopeless candidates
+        if step_num == prune_step:
+            num_keep = max(1, round(num_candidates * search_parameters.prune_keep_fraction))
+            keep_indices = torch.argsort(best_candidate_scores, descending=True)[:num_keep]
+            old_inputs = model.inputs
+            model.prune(keep_indices)
+            prune_optimizer_state(optimizer, old_inputs, model.inputs, keep_indices)
+            scores = scores[keep_indices]
+            best_candidate_scores = best_candidate_scores[keep_indices]
+            steps_since_improvement = steps_since_improvement[keep_indices]
+            num_candidates = num_keep
+
         # zero the parameter gradients, set graphics parameters
         optimizer.zero_grad()
         model.update_width_and_anti_aliasing(
@@ -74,14 +117,15 @@ def grid_search_stroke(
         _canvas_with_graphic, scores = model()
 
         # backwards, optimize, and constrain (via hook)
-        target_score = torch.full([initial_inputs.shape[0]], 1.0, dtype=torch.float32, device=search_parameters.device)
+        target_score = torch.full([num_candidates], 1.0, dtype=torch.float32, device=search_parameters.device)
         loss = criterion(scores, target_score)
         loss.backward()
         optimizer.step()
+        num_steps += 1
 
         best_index = torch.argmax(scores)
         best_score = scores[best_index]
-        best_keypoints = list(model.parameters()).copy()[0][best_index]
+        best_keypoints = model.inputs.detach().clone()[best_index]
         if (
             (search_parameters.return_best and best_score > return_score) or
             not search_parameters.return_best
@@ -89,23 +133,60 @@ def grid_search_stroke(
             return_score = best_score
             return_keypoints = best_keypoints
 
-    return return_score, return_keypoints
+        # track convergence of each candidate
+        with torch.no_grad():
+            improved = scores > best_candidate_scores + search_parameters.min_score_delta
+            best_candidate_scores = torch.maximum(best_candidate_scores, scores)
+            steps_since_improvement = torch.where(improved, 0, steps_since_improvement + 1)
+
+        if _all_converged(scores, steps_since_improvement, search_parameters):
+            break
 
+        if deadline is not None and time.monotonic() >= deadline:
+            break
 
+    return return_score, return_keypoints, num_steps
 
-def _initialize_grid(search_parameters: SearchParameters) -> torch.Tensor:
+
+def _all_converged(
+    scores: torch.Tensor,
+    steps_since_improvement: torch.Tensor,
+    search_parameters: SearchParameters
+) -> bool:
+    """
+    Determine if every candidate has either reached the score threshold or
+    stopped improving
+
+    :param scores: most recent score of each candidate
+    :param steps_since_improvement: number of steps since each candidate last
+        improved by more than `min_score_delta`
+    :param search_parameters: parameters which define search
+    :return: True if the search can stop early
+    """
+    converged = torch.zeros_like(scores, dtype=torch.bool)
+    if search_parameters.score_threshold is not None:
+        converged |= scores >= search_parameters.score_threshold
+    if search_parameters.patience is not None:
+        converged |= steps_since_improvement >= search_parameters.patience
+
+    return bool(torch.all(converged))
+
+
+def _initialize_grid(grid_shape: Tuple[int, int], search_parameters: SearchParameters) -> torch.Tensor:
     """
     Initilize keypoints on grid. Each set of keypoints is confined to one block
     within the grid
 
+    :param grid_shape: number of rows and columns of grid
     :param search_parameters: parameters which define search
     :return: keypoints randomly initialized in grid
     """
-    grid_shape = numpy.array(search_parameters.grid_shape)
+    grid_shape = numpy.array(grid_shape)
+    rng = numpy.random.default_rng(search_parameters.seed)
 
     return torch.from_numpy(numpy.array([
         [
-            (numpy.random.random(2) + numpy.array([grid_y, grid_x])) / grid_shape
+            (rng.random(2) + numpy.array([grid_y, grid_x])) / grid_shape
             for _ in range(search_parameters.num_keypoints)
         ]
         for grid_y in range(grid_shape[1])
@@ -0,0 +1,127 @@
+from typing import Optional
+
+import torch
+import numpy
+
+from .SearchParameters import SearchParameters
+
+
+def get_seed_keypoints(
+    base_canvas: torch.Tensor,
+    score_model: torch.nn.Module,
+    target_index: int,
+    search_parameters: SearchParameters,
+    max_length: float,
+    previous_keypoints: Optional[torch.Tensor] = None,
+) -> torch.Tensor:
+    """
+    Get keypoints which warm start a stroke search. Seeds continue the previous
+    turn's stroke and are placed where the classifier gradient suggests ink
+    would most increase the target score
+
+    :param base_canvas: canvas upon which strokes are drawn
+    :param score_model: model whose output is used as an objective function
+    :param target_index: index of `score_model` output to use as objective function
+    :param search_parameters: parameters which define search
+    :param max_length: maximum length of the stroke in canvas pixels
+    :param previous_keypoints: best keypoints found by the room's previous
+        search with shape (num_keypoints, 2), if any
+    :return: seed keypoints with shape (num_seeds, num_keypoints, 2)
+    """
+    normed_length = max_length / max(base_canvas.shape)
+
+    seeds = [
+        get_saliency_keypoints(
+            base_canvas,
+            score_model,
+            target_index,
+            search_parameters.num_saliency_seeds,
+            search_parameters.num_keypoints,
+            normed_length,
+            search_parameters.seed,
+        )
+    ]
+    if previous_keypoints is not None:
+        previous_keypoints = previous_keypoints.to(dtype=torch.float32, device=base_canvas.device)
+        if previous_keypoints.shape == (search_parameters.num_keypoints, 2):
+            seeds.insert(0, get_continuation_keypoints(previous_keypoints, normed_length))
+
+    return torch.cat(seeds)
+
+
+def get_continuation_keypoints(previous_keypoints: torch.Tensor, normed_length: float) -> torch.Tensor:
+    """
+    Seeds derived from the previous turn's best keypoints: the keypoints
+    themselves, the same curve translated to start at the previous endpoint,
+    and a straight line which continues from the previous endpoint along its
+    final direction
+
+    :param previous_keypoints: normalized keypoints with shape (num_keypoints, 2)
+    :param normed_length: maximum stroke length as a fraction of the canvas
+    :return: seed keypoints with shape (3, num_keypoints, 2)
+    """
+    start, end = previous_keypoints[0], previous_keypoints[-1]
+    translated = previous_keypoints - start + end
+
+    direction = end - previous_keypoints[-2]
+    direction = direction / torch.clamp(torch.norm(direction), min=1e-6)
+    ts = torch.linspace(0.0, 1.0, len(previous_keypoints), device=previous_keypoints.device)
+    straight = end + ts[:, None] * direction * normed_length
+
+    return torch.clamp(torch.stack([previous_keypoints, translated, straight]), 0.0, 1.0)
+
+
+def get_saliency_keypoints(
+    base_canvas: torch.Tensor,
+    score_model: torch.nn.Module,
+    target_index: int,
+    num_seeds: int,
+    num_keypoints: int,
+    normed_length: float,
+    seed: Optional[int] = None,
+) -> torch.Tensor:
+    """
+    Place straight strokes at the peaks of the classifier's saliency, the
+    gradient of the target score with respect to ink on the base canvas.
+    Peaks are smoothed and separated by non-maximum suppression so that seeds
+    cover distinct regions. Stroke directions are random
+
+    :param base_canvas: canvas upon which strokes are drawn
+    :param score_model: model whose output is used as an objective function
+    :param target_index: index of `score_model` output to use as objective function
+    :param num_seeds: maximum number of seeds
+    :param num_keypoints: number of keypoints per seed
+    :param normed_length: length of seeds as a fraction of the canvas
+    :param seed: seed used to choose stroke directions
+    :return: seed keypoints with shape (<= num_seeds, num_keypoints, 2)
+    """
+    canvas_shape = base_canvas.shape
+    if num_seeds <= 0:
+        return torch.zeros((0, num_keypoints, 2), dtype=torch.float32, device=base_canvas.device)
+
+    # gradient of target score with respect to ink
+    canvas = base_canvas.detach().to(torch.float32).clone().requires_grad_(True)
+    _logits, scores = score_model(canvas[None, None])
+    (saliency, ) = torch.autograd.grad(scores[0, target_index], canvas)
+
+    with torch.no_grad():
+        # only adding ink is possible, smooth to favor regions over single pixels
+        saliency = torch.clamp(saliency, min=0.0)[None, None]
+        saliency = torch.nn.functional.avg_pool2d(saliency, 5, stride=1, padding=2)
+        is_peak = saliency == torch.nn.functional.max_pool2d(saliency, 9, stride=1, padding=4)
+        is_peak &= saliency > 0.0
+
+        peak_positions = torch.nonzero(is_peak[0, 0])
+        peak_values = saliency[0, 0][is_peak[0, 0]]
+        peak_positions = peak_positions[torch.argsort(peak_values, descending=True)[:num_seeds]]
+
+    # straight strokes centered on peaks, in normalized (y, x) coordinates
+    rng = numpy.random.default_rng(seed)
+    canvas_shape_tensor = torch.tensor(canvas_shape, dtype=torch.float32, device=base_canvas.device)
+    centers = (peak_positions.to(torch.float32) + 0.5) / canvas_shape_tensor
+    angles = torch.tensor(rng.random(len(centers)) * numpy.pi, dtype=torch.float32, device=base_canvas.device)
+    directions = torch.stack([torch.sin(angles), torch.cos(angles)], dim=1)
+    ts = torch.linspace(-0.5, 0.5, num_keypoints, device=base_canvas.device)
+
+    keypoints = centers[:, None, :] + ts[None, :, None] * directions[:, None, :] * normed_length
+    return torch.clamp(keypoints, 0.0, 1.0)
@@ -1,60 +1,99 @@
-from flask import Blueprint, request, copy_current_request_context
+from typing import List, Tuple
+
+from flask import Blueprint, request
 
 import json
-import requests
-from threading import Thread
 
 from .manager import ModelManager
-from .utils import imageDataUrlToImage
-
-from competitive_drawing import SETTINGS
+from .StrokeSearchPool import StrokeSearchPool, StrokeSearchQueueFull
+from .Inferencer import Inferencer, is_stroke_rasterizer_available
+from .utils import imageDataUrlToImage, label_pair_to_str
 
 
-def make_routes_blueprint(model_manager: ModelManager):
+def make_routes_blueprint(model_manager: ModelManager, stroke_search_pool: StrokeSearchPool):
     routes = Blueprint("routes", __name__)
 
     @routes.route("/games", methods=["POST"])
     def games():
-        label_pair_games = request.json["label_pair_games"]  # maps label pairs to number of games
+        """
+        Receives either a full snapshot of the number of games for each label
+        pair or the changes since the previous update. Responds with the model
+        manager's instance id so clients can detect restarts
+        """
+        client_id = request.json.get("client_id", "0")  # web app shard
+        if "label_pair_deltas" in request.json:
+            model_manager.update_games(request.json["label_pair_deltas"], client_id)
+        else:
+            label_pair_games = request.json["label_pair_games"]  # maps label pairs to number of games
+            model_manager.scale(label_pair_games, client_id)
 
-        model_manager.scale(label_pair_games)
-        print(label_pair_games)
+        print(model_manager.label_pair_games)
         print(model_manager.inferencers.keys())
 
-        return "", 200
-
+        return json.dumps({"instanceId": model_manager.instance_id}), 200
 
-    @routes.route("/infer", methods=["POST"])
-    def infer():
-        image = imageDataUrlToImage(request.json["imageDataUrl"])
 
+    def get_or_start_inferencer(label_pair: Tuple[str, str]) -> Inferencer:
         try:
-            inferencer = model_manager.get_inferencer(request.json["label_pair"])
+            return model_manager.get_inferencer(label_pair)
         except Exception as exception:
             print(exception)
-            
+
             # assume there was a disconnection
-            model_manager.start_inferencer(request.json["label_pair"])
-            inferencer = model_manager.get_inferencer(request.json["label_pair"])
+            model_manager.start_inferencer(label_pair_to_str(label_pair))
+            return model_manager.get_inferencer(label_pair)
+
 
+    def infer_with(inferencer: Inferencer) -> List[float]:
         # TODO: Cheat detection
 
-        else:
-            model_outputs = inferencer.infer_image(image)
+        if "strokes" in request.json and (
+            is_stroke_rasterizer_available() or "imageDataUrl" not in request.json
+        ):
+            return inferencer.infer_strokes(request.json["strokes"])
+
+        image = imageDataUrlToImage(request.json["imageDataUrl"])
+        return inferencer.infer_image(image)
 
-            response_data = {
-                "modelOutputs": model_outputs,
-                "isCheater": False,
-            }
+
+    @routes.route("/infer", methods=["POST"])
+    def infer():
+        """
+        Classify either a client rendered image or the strokes drawn on the
+        canvas. Strokes are rasterized directly into a model input, unless
+        cairo is not installed, in which case the image sent with them is
+        classified. Requests whose inferencer is closed by a scale down are
+        retried once with the current inferencer
+        """
+        try:
+            model_outputs = infer_with(get_or_start_inferencer(request.json["label_pair"]))
+        except RuntimeError as exception:
+            # the inferencer was closed by a scale down while this request held it
+            print(f"WARNING: {exception}, retrying with a current inferencer")
+            model_outputs = infer_with(get_or_start_inferencer(request.json["label_pair"]))
+
+        response_data = {
+            "modelOutputs": model_outputs,
+            "isCheater": False,
+        }
 
         return json.dumps(response_data), 200
 
 
+    @routes.route("/inference_cache", methods=["GET"])
+    def inference_cache():
+        """
+        Responds with the inference cache's hit and miss counters and size
+        """
+        return json.dumps(model_manager.inference_cache.get_stats()), 200
+
+
     @routes.route("/infer_stroke", methods=["POST"])
     def infer_stroke():
         """
-        Asyncronously begin thread to infer AI stroke. Stroke information is sent
-        by a subsequent http request to the web app
+        Asyncronously queue a search for the AI stroke in the stroke search
+        worker pool. Stroke information is sent by a subsequent http request to
+        the web app. Responds with 503 if the worker pool queue is full
         """
         image = imageDataUrlToImage(request.json["imageDataUrl"])
         target_index = request.json["targetIndex"]
@@ -73,25 +112,18 @@ def make_routes_blueprint(model_manager: ModelManager):
         # TODO: Detect if images are too dissilimar. If so, the client may have
         # manipulated the image
 
-        @copy_current_request_context
-        def _send_stroke(model_manager: ModelManager, room_id, *args):
-            inferencer = model_manager.get_inferencer(request.json["label_pair"])
-            stroke_samples = inferencer.infer_stroke(*args)
-
-            requests.post(
-                f"{SETTINGS.ws_base}/ai_stroke",
-                headers={"Content-type": "application/json"},
-                data=json.dumps({
-                    "strokeSamples": stroke_samples,
-                    "roomId": room_id,
-                })
+        try:
+            stroke_search_pool.submit(
+                label_pair_to_str(request.json["label_pair"]),
+                room_id,
+                image,
+                target_index,
+                line_width,
+                max_length
             )
-
-        thread = Thread(
-            target=_send_stroke,
-            args=(model_manager, room_id, image, target_index, line_width, max_length)
-        )
-        thread.start()
+        except StrokeSearchQueueFull as exception:
+            print(f"WARNING: {exception}")
+            return json.dumps({"error": str(exception)}), 503, {"Retry-After": "1"}
 
         return "", 201
     
@@ -1,2 +1,2 @@
 from .helpers import *
-from .s3 import *
+from .models import *
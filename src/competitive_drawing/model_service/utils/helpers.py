@@ -1,6 +1,5 @@
 from typing import Tuple
 
-import re
 import torch
 import base64
 from io import BytesIO
@@ -27,7 +26,7 @@ def imageDataUrlToImage(image_data_url: str) -> Image:
     :param image_data_url: base64 image url
     :return: image url as a PIL Image
     """
-    image_data_str = re.sub("^data:image/.+;base64,", "", image_data_url)
+    _header, _separator, image_data_str = image_data_url.partition(",")
     image_data = base64.b64decode(image_data_str)
     image_data_io = BytesIO(image_data)
     image = Image.open(image_data_io)
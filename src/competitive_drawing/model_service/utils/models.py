@@ -0,0 +1,18 @@
+import torch
+
+from competitive_drawing import SETTINGS
+from competitive_drawing.model_store import get_model_store
+from .helpers import get_classifier_model
+
+
+def load_model(label_pair_str: str) -> torch.nn.Module:
+    # get state dict from model store
+    state_dict_file = get_model_store().get_state_dict_file(label_pair_str)
+    state_dict = torch.load(state_dict_file, map_location=SETTINGS.device)
+
+    # instantiate model
+    model = get_classifier_model()
+    model.load_state_dict(state_dict)
+    model = model.eval()
+
+    return model
@@ -0,0 +1,71 @@
+from typing import List, Optional
+
+import copy
+import threading
+
+from .base import ModelStore
+
+
+class LabelPairIndex:
+    """
+    Cached index of the label pairs available in a model store. The index is
+    refreshed in a background thread so that lookups never wait on the store,
+    except for the very first lookup if the initial refresh has not finished.
+    Failed refreshes keep the most recently indexed label pairs
+
+    :param model_store: store whose label pairs are indexed
+    :param refresh_period: number of seconds between refreshes
+    """
+    def __init__(self, model_store: ModelStore, refresh_period: float):
+        self.model_store = model_store
+        self.refresh_period = refresh_period
+
+        self._label_pairs: List[List[str]] = []
+        self._last_exception: Optional[Exception] = None
+        self._loaded = threading.Event()  # set once a refresh has succeeded
+        self._attempted = threading.Event()  # set once a refresh has finished
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+
+    def get(self, timeout: Optional[float] = None) -> List[List[str]]:
+        """
+        :param timeout: maximum number of seconds to wait for the initial refresh
+        :return: copy of the most recently indexed label pairs
+        :raises RuntimeError: if label pairs have never been indexed successfully,
+            after retrying the refresh once
+        """
+        if not self._loaded.is_set():
+            self._attempted.wait(timeout)
+
+        if not self._loaded.is_set():
+            self.refresh()  # retry rather than waiting for the next period
+
+        if not self._loaded.is_set():
+            raise RuntimeError(
+                f"Could not index label pairs of model store: {self._last_exception}"
+            )
+
+        return copy.deepcopy(self._label_pairs)
+
+
+    def refresh(self):
+        try:
+            self._label_pairs = self.model_store.list_label_pairs()
+            self._loaded.set()
+        except Exception as exception:
+            self._last_exception = exception
+            print(f"WARNING: Failed to refresh label pairs: {exception}")
+        finally:
+            self._attempted.set()
+
+
+    def stop(self):
+        self._stopped.set()
+
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.refresh()
+            self._stopped.wait(self.refresh_period)
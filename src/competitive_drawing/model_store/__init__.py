@@ -0,0 +1,5 @@
+from .base import ModelStore, label_pair_from_str
+from .local import LocalModelStore
+from .s3 import S3ModelStore
+from .LabelPairIndex import LabelPairIndex
+from .factory import create_model_store, get_model_store, get_label_pair_index
@@ -0,0 +1,72 @@
+from typing import BinaryIO, List, Optional, Union
+from abc import ABC, abstractmethod
+
+
+class ModelStore(ABC):
+    """
+    Interface for retrieving trained model artifacts. Artifacts for each label
+    pair live under `{root_folder}/{label_pair_str}/`, where `label_pair_str` is
+    the alphabetically sorted labels joined by a dash. Each label pair directory
+    contains a `model.pth` state dict used by the model service and a
+    `model.onnx` export used by clients
+
+    :param root_folder: folder within the store which contains label pair
+        directories
+    """
+    def __init__(self, root_folder: str):
+        self.root_folder = root_folder
+
+
+    @abstractmethod
+    def list_label_pairs(self) -> List[List[str]]:
+        """
+        :return: all label pairs which have an onnx model in the store
+        """
+        raise NotImplementedError()
+
+
+    @abstractmethod
+    def get_state_dict_file(self, label_pair_str: str) -> Union[str, BinaryIO]:
+        """
+        :param label_pair_str: label pair string
+        :return: path or file object which can be passed to `torch.load`
+        """
+        raise NotImplementedError()
+
+
+    @abstractmethod
+    def get_onnx_url(self, label_pair_str: str) -> str:
+        """
+        :param label_pair_str: label pair string
+        :return: url from which clients can download the onnx model
+        """
+        raise NotImplementedError()
+
+
+    @abstractmethod
+    def read_onnx(self, label_pair_str: str) -> bytes:
+        """
+        :param label_pair_str: label pair string
+        :return: contents of the onnx model
+        """
+        raise NotImplementedError()
+
+
+def label_pair_from_str(label_pair_str: str) -> Optional[List[str]]:
+    """
+    Parse a label pair directory name
+
+    :param label_pair_str: label pair string such as "cat-dog"
+    :return: label pair, or None if the directory name is not a valid label pair
+    """
+    labels = label_pair_str.split("-")
+    if len(labels) != 2:
+        return None
+
+    label_one, label_two = labels
+    if not label_one < label_two:
+        print(f"WARNING: Invalid uploaded model {label_one}-{label_two}")
+        return None
+
+    return [label_one, label_two]
+
@@ -0,0 +1,47 @@
+import os
+from functools import cache
+
+from competitive_drawing import SETTINGS
+from .base import ModelStore
+from .local import LocalModelStore
+from .s3 import S3ModelStore
+from .LabelPairIndex import LabelPairIndex
+
+
+def create_model_store(backend: str) -> ModelStore:
+    match backend:
+        case "local":
+            return LocalModelStore(
+                os.path.expanduser(SETTINGS.models_local_dir),
+                SETTINGS.s3_models_root_folder,
+            )
+
+        case "s3":
+            return S3ModelStore(
+                SETTINGS.s3_models_bucket,
+                SETTINGS.s3_models_root_folder,
+                SETTINGS.s3_model_duration,
+                cache_dir=(
+                    os.path.expanduser(SETTINGS.ms_model_cache_dir)
+                    if SETTINGS.ms_model_cache_dir is not None
+                    else None
+                ),
+            )
+
+    raise ValueError(f"Unknown model store backend {backend}")
+
+
+@cache
+def get_model_store() -> ModelStore:
+    """
+    :return: process-wide model store for the configured backend
+    """
+    return create_model_store(SETTINGS.models_backend)
+
+
+@cache
+def get_label_pair_index() -> LabelPairIndex:
+    """
+    :return: process-wide label pair index, which begins refreshing on first use
+    """
+    return LabelPairIndex(get_model_store(), SETTINGS.label_pairs_refresh_period)
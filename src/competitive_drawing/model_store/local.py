@@ -0,0 +1,57 @@
+from typing import List
+
+import os
+
+from .base import ModelStore, label_pair_from_str
+
+
+class LocalModelStore(ModelStore):
+    """
+    Model store backed by a local directory with the same layout as the S3
+    bucket, for example one created with `aws s3 sync`. Onnx models are served
+    to clients by the web app
+
+    :param models_dir: local directory which contains `root_folder`
+    :param root_folder: folder within `models_dir` which contains label pair
+        directories
+    """
+    def __init__(self, models_dir: str, root_folder: str):
+        super().__init__(root_folder)
+        self.models_dir = models_dir
+
+
+    def list_label_pairs(self) -> List[List[str]]:
+        root_dir = os.path.join(self.models_dir, self.root_folder)
+        if not os.path.isdir(root_dir):
+            return []
+
+        available_label_pairs = []
+        for label_pair_str in sorted(os.listdir(root_dir)):
+            if not os.path.exists(os.path.join(root_dir, label_pair_str, "model.onnx")):
+                continue
+
+            label_pair = label_pair_from_str(label_pair_str)
+            if label_pair is not None:
+                available_label_pairs.append(label_pair)
+
+        return available_label_pairs
+
+
+    def get_state_dict_file(self, label_pair_str: str) -> str:
+        return self._get_path(label_pair_str, "model.pth")
+
+
+    def get_onnx_url(self, label_pair_str: str) -> str:
+        return f"/models/{label_pair_str}/model.onnx"
+
+
+    def read_onnx(self, label_pair_str: str) -> bytes:
+        with open(self._get_path(label_pair_str, "model.onnx"), "rb") as onnx_file:
+            return onnx_file.read()
+
+
+    def _get_path(self, label_pair_str: str, file_name: str) -> str:
+        if label_pair_from_str(label_pair_str) is None or os.sep in label_pair_str:
+            raise ValueError(f"Invalid label pair {label_pair_str}")
+
+        return os.path.join(self.models_dir, self.root_folder, label_pair_str, file_name)
@@ -0,0 +1,133 @@
+from typing import BinaryIO, List, Optional, Union
+
+import os
+import glob
+import boto3
+from io import BytesIO
+
+from .base import ModelStore, label_pair_from_str
+
+
+class S3ModelStore(ModelStore):
+    """
+    Model store backed by an S3 bucket. State dicts may optionally be cached on
+    disk, keyed by label pair and the object's ETag so that a changed object is
+    downloaded again
+
+    :param bucket: S3 bucket name
+    :param root_folder: folder within the bucket which contains label pair
+        directories
+    :param url_duration: lifetime of presigned onnx urls in seconds
+    :param cache_dir: directory in which state dicts are cached, defaults to no
+        caching
+    """
+    def __init__(
+        self,
+        bucket: str,
+        root_folder: str,
+        url_duration: int,
+        cache_dir: Optional[str] = None,
+    ):
+        super().__init__(root_folder)
+        self.bucket = bucket
+        self.url_duration = url_duration
+        self.cache_dir = cache_dir
+        self._client = boto3.client("s3")
+
+
+    def list_label_pairs(self) -> List[List[str]]:
+        available_label_pairs = []
+        paginator = self._client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{self.root_folder}/"):
+            for object in page.get("Contents", []):
+                path_components = object["Key"].split("/")
+                if path_components[0] == self.root_folder and path_components[-1] == "model.onnx":
+                    label_pair = label_pair_from_str(path_components[-2])
+                    if label_pair is not None:
+                        available_label_pairs.append(label_pair)
+
+        return available_label_pairs
+
+
+    def get_state_dict_file(self, label_pair_str: str) -> Union[str, BinaryIO]:
+        key = self._get_key(label_pair_str, "model.pth")
+        if self.cache_dir is None:
+            return BytesIO(self._read_object(key))
+
+        return self._get_cached_object_file_path(
+            key, os.path.join(self.cache_dir, label_pair_str)
+        )
+
+
+    def get_onnx_url(self, label_pair_str: str) -> str:
+        return self._client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self._get_key(label_pair_str, "model.onnx"),
+            },
+            ExpiresIn=self.url_duration
+        )
+
+
+    def read_onnx(self, label_pair_str: str) -> bytes:
+        return self._read_object(self._get_key(label_pair_str, "model.onnx"))
+
+
+    def _get_key(self, label_pair_str: str, file_name: str) -> str:
+        return "/".join([self.root_folder, label_pair_str, file_name])
+
+
+    def _read_object(self, key: str) -> bytes:
+        return self._client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+
+    def _get_cached_object_file_path(self, key: str, cache_dir: str) -> str:
+        """
+        Get the path to a local copy of an S3 object. If S3 cannot be reached,
+        the most recently cached copy is used
+
+        :param key: S3 object key
+        :param cache_dir: directory in which copies of this object are cached
+        :return: path to local copy of object
+        """
+        try:
+            head = self._client.head_object(Bucket=self.bucket, Key=key)  # does not download
+            content_hash = head["ETag"].strip('"')
+        except Exception as exception:
+            cached_paths = glob.glob(os.path.join(cache_dir, "*.pth"))
+            if len(cached_paths) <= 0:
+                raise exception
+
+            print(f"WARNING: Could not reach S3 ({exception}), using cached {key}")
+            return max(cached_paths, key=os.path.getmtime)
+
+        file_path = os.path.join(cache_dir, f"{content_hash}.pth")
+        if not os.path.exists(file_path):
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{file_path}.{os.getpid()}.tmp"
+            self._client.download_file(self.bucket, key, tmp_path)
+            os.replace(tmp_path, file_path)  # atomic, concurrent workers may race
+            self._remove_stale_cached_files(cache_dir, file_path)
+
+        return file_path
+
+
+    def _remove_stale_cached_files(self, cache_dir: str, file_path: str):
+        """
+        Remove cached copies of previous versions of an object so that the
+        cache does not grow with every upload
+
+        :param cache_dir: directory in which copies of this object are cached
+        :param file_path: path of the current copy, which is kept
+        """
+        for stale_path in glob.glob(os.path.join(cache_dir, "*.pth")):
+            if stale_path == file_path:
+                continue
+
+            try:
+                os.remove(stale_path)
+            except FileNotFoundError:  # removed by a concurrent worker
+                pass
+            except OSError as exception:
+                print(f"WARNING: Could not remove stale cached file {stale_path} ({exception})")
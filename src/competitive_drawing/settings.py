@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from threading import Lock
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -12,16 +14,157 @@ class Settings(BaseSettings):
     web_app_host: str = Field(default="localhost")
     web_app_port: int = Field(default=5001)
     web_app_secret_key: str = Field(default="somesecrets")
+    web_app_async_mode: str = Field(
+        default="threading",
+        description=(
+            "socket server async mode, one of threading, eventlet or gevent. "
+            "Green thread modes serve many more concurrent rooms per process"
+        )
+    )
     ms_base: str = Field(default="http://localhost:5002")
 
+    # web app sharding settings
+    web_app_shard_id: str = Field(default="0", description="id of this web app shard")
+    web_app_shard_ids: List[str] = Field(
+        default=["0"],
+        description=(
+            "ids of all web app shards. Socket connections carry their room id in "
+            "the `roomId` query parameter and must be routed to the shard given by "
+            "`ShardRouter.get_shard`. Shards refuse connections for other shards' rooms"
+        )
+    )
+    game_state_backend: str = Field(
+        default="memory",
+        description=(
+            "where game state shared between shards is stored. Either 'memory' "
+            "for a single shard, 'redis', or 'fake_redis' for local testing"
+        )
+    )
+    redis_url: str = Field(default="redis://localhost:6379/0")
+    socketio_message_queue: Optional[str] = Field(
+        default=None,
+        description=(
+            "url of the message queue used to emit to clients connected to other "
+            "shards, for example the redis url. Required with multiple shards"
+        )
+    )
+
     # model service
     ms_host: str = Field(default="localhost")
     ms_port: int = Field(default=5002)
     ms_secret_key: str = Field(default="somesecrets")
     ws_base: str = Field(default="http://localhost:5001")
     device: str = Field(default="cpu")
+    inference_max_batch_size: int = Field(
+        default=16,
+        description="maximum number of concurrent image inferences batched together"
+    )
+    inference_max_batch_wait: float = Field(
+        default=0.005,
+        description="maximum number of seconds to wait for an inference batch to fill"
+    )
+    inference_result_timeout: float = Field(
+        default=30.0,
+        description="maximum number of seconds an image inference waits for its batch result"
+    )
+    inferencer_close_grace_period: float = Field(
+        default=5.0,
+        description="number of seconds a scaled down inferencer keeps serving requests which already hold it"
+    )
+    inference_cache_max_entries: int = Field(
+        default=4096,
+        description="maximum number of cached classifier outputs. 0 disables the cache"
+    )
+    inference_cache_ttl: float = Field(
+        default=300.0,
+        description="number of seconds a classifier output stays cached"
+    )
+    stroke_search_num_workers: int = Field(
+        default=2,
+        description="number of worker processes used to search for AI strokes"
+    )
+    stroke_search_max_queue_depth: int = Field(
+        default=8,
+        description=(
+            "maximum number of AI stroke searches running or waiting at once. "
+            "Further requests are rejected until a search finishes"
+        )
+    )
+    stroke_search_worker_num_threads: int = Field(
+        default=1,
+        description="number of torch threads used by each stroke search worker"
+    )
+    stroke_search_time_limit: Optional[float] = Field(
+        default=2.0,
+        description=(
+            "number of seconds an AI stroke search may run before it stops and "
+            "its current best stroke is used. None disables the limit"
+        )
+    )
+    stroke_search_patience: Optional[int] = Field(
+        default=20,
+        description=(
+            "number of steps an AI stroke candidate may go without improving "
+            "before it is considered converged. None disables early stopping"
+        )
+    )
+    stroke_search_score_threshold: Optional[float] = Field(
+        default=0.99,
+        description=(
+            "score at which an AI stroke candidate is considered converged. "
+            "None disables the threshold"
+        )
+    )
+    stroke_search_prune_step: Optional[int] = Field(
+        default=30,
+        description=(
+            "step at which the lowest scoring AI stroke candidates are pruned. "
+            "None disables pruning"
+        )
+    )
+    stroke_search_warm_start: bool = Field(
+        default=True,
+        description=(
+            "warm start AI stroke searches from seeds which continue the room's "
+            "previous stroke and follow the classifier's saliency"
+        )
+    )
+    stroke_search_warm_start_prune_step: Optional[int] = Field(
+        default=10,
+        description=(
+            "step at which candidates are pruned when an AI stroke search is "
+            "warm started from seeds. Seeds start near good strokes, so only the "
+            "best third of candidates is optimized after this step. Seeds cut the "
+            "number of steps only if early stopping is enabled. None disables pruning"
+        )
+    )
+    stroke_search_max_warm_start_rooms: int = Field(
+        default=1024,
+        description=(
+            "maximum number of rooms whose previous AI stroke is kept to warm "
+            "start their next stroke search"
+        )
+    )
+
+    # http client settings
+    http_pool_size: int = Field(default=16, description="maximum number of kept-alive connections per host")
+    http_max_retries: int = Field(default=3, description="number of retries for requests which fail to connect")
+    http_retry_backoff: float = Field(default=0.1)
+    http_connect_timeout: float = Field(default=3.0)
+    http_read_timeout: float = Field(default=10.0)
+    http_async_workers: int = Field(
+        default=8,
+        description="number of threads used to make asynchronous http requests"
+    )
 
     # game settings
+    ai_stroke_max_retries: int = Field(
+        default=5,
+        description=(
+            "number of times an AI stroke request rejected by a busy model service "
+            "is retried after its Retry-After delay before the AI's turn is skipped"
+        )
+    )
     softmax_factor: float = Field(default=2.0)
     distance_per_turn: int = Field(
         default=40,
@@ -55,6 +198,38 @@ class Settings(BaseSettings):
     s3_models_root_folder: str = Field(default="static_crop_50x50")
     s3_model_duration: int = Field(default=108000, description="lifetime of s3 model urls in seconds")  # 30 minutes
 
+    # model store settings
+    models_backend: str = Field(
+        default="s3",
+        description=(
+            "where model artifacts are stored. Either 's3' or 'local'. The local "
+            "backend reads from `models_local_dir`, which has the same layout as "
+            "the S3 bucket"
+        )
+    )
+    models_local_dir: str = Field(default="models")
+    label_pairs_refresh_period: float = Field(
+        default=300.0,
+        description="number of seconds between refreshes of available label pairs"
+    )
+
+    # model cache settings
+    ms_model_cache_dir: Optional[str] = Field(
+        default="~/.cache/competitive_drawing/models",
+        description=(
+            "directory in which downloaded model artifacts are cached, keyed by "
+            "label pair and content hash. None disables the on-disk cache"
+        )
+    )
+    ms_model_cache_max_models: int = Field(
+        default=16,
+        description="maximum number of loaded models kept in memory"
+    )
+    ms_model_cache_max_bytes: Optional[int] = Field(
+        default=None,
+        description="maximum total size of loaded models kept in memory"
+    )
+
     # websocket settings
     client_disconnect_grace_period: float = Field(
         default=2.0,
@@ -64,6 +239,19 @@ class Settings(BaseSettings):
         )
     )
 
+    # scaling update settings
+    scaling_update_period: float = Field(
+        default=0.5,
+        description=(
+            "minimum number of seconds between game count updates sent to the "
+            "model service. Changes within a period are coalesced"
+        )
+    )
+    scaling_update_retry_period: float = Field(
+        default=5.0,
+        description="number of seconds to wait before retrying a failed update"
+    )
+
     # make model immutable
     class Config:
         frozen = True
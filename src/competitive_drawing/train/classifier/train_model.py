@@ -11,7 +11,7 @@ import torch
 from timm.data import Mixup
 
 from competitive_drawing.train.classifier import Classifier, upload_model
-from competitive_drawing.train.utils import load_data, QuickDrawDataset, RandomResizePad
+from competitive_drawing.train.utils import load_data, QuickDrawDataset, BatchAugmentation
 
 DEVICE = (
     "mps" if torch.backends.mps.is_available() else
@@ -89,8 +89,11 @@ def train_model(
         label_smoothing=wandb.config["label_smoothing"],
         num_classes=wandb.config["num_classes"],
     )
-    random_resize_pad = RandomResizePad(
-        wandb.config["image_shape"],
+    random_resize_pad = BatchAugmentation(
+        degrees=0.0,
+        flip_probability=0.0,
+        affine_degrees=0.0,
+        shear=0.0,
         scale=wandb.config["resize_scale"],
         value=0,
     )
@@ -99,7 +102,8 @@ def train_model(
     all_images, all_labels, label_names = load_data(
         wandb.config["data_dir"],
         wandb.config["image_shape"],
-        class_names=class_names
+        class_names=class_names,
+        one_hot=True,
     )
 
     # create datasets
@@ -138,13 +142,14 @@ def train_model(
 
         running_loss = 0.0
         for i, (images, raw_labels) in enumerate(train_loader):
-            # mixup/ cutmix
-            images, cutmix_labels = train_mixup(images, raw_labels)
-            images = random_resize_pad(images)
-
             # to device
             images = images.to(DEVICE)
-            cutmix_labels = cutmix_labels.to(DEVICE)
+            raw_labels = raw_labels.to(DEVICE)
+
+            # augmentations, mixup/ cutmix
+            images = train_dataset.augment_batch(images)
+            images, cutmix_labels = train_mixup(images, raw_labels)
+            images = random_resize_pad(images)
 
             # zero the parameter gradients
             optimizer.zero_grad()
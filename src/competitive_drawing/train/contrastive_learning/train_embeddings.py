@@ -90,6 +90,7 @@ def train_models(config: ModelsConfig, args: Dict[str, Any]):
             # to device
             labels = labels.to(dtype=torch.float32, device=config.device)
             images = images.to(dtype=torch.float32, device=config.device)
+            images = train_dataset.augment_batch(images)
 
             # zero the parameter gradients
             class_optimizer.zero_grad()
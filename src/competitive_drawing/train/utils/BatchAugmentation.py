@@ -0,0 +1,138 @@
+from typing import Optional, Tuple
+
+import torch
+
+
+class BatchAugmentation(object):
+    """
+    Batched replacement for per-sample `RandomRotation`, `RandomHorizontalFlip`,
+    `RandomAffine` with shear, and `RandomResizePad`. A random affine matrix
+    is built for each sample and every sample is resampled with a single
+    `grid_sample` call, so augmentation runs on whichever device holds the
+    batch. Images are assumed to be square
+
+    :param degrees: maximum rotation in degrees
+    :param flip_probability: probability that a sample is flipped horizontally
+    :param affine_degrees: maximum additional rotation in degrees applied with shear
+    :param shear: maximum shear parallel to the x axis in degrees
+    :param scale: range of scales the image is resized to before being padded
+        at a random position, None disables resizing
+    :param value: value of pixels outside of the transformed image
+    """
+    def __init__(
+        self,
+        degrees: float = 15.0,
+        flip_probability: float = 0.5,
+        affine_degrees: float = 5.0,
+        shear: float = 5.0,
+        scale: Optional[Tuple[float, float]] = None,
+        value: float = 0.0,
+    ):
+        self.degrees = degrees
+        self.flip_probability = flip_probability
+        self.affine_degrees = affine_degrees
+        self.shear = shear
+        self.scale = scale
+        self.value = value
+
+
+    def __call__(self, images: torch.Tensor) -> torch.Tensor:
+        """
+        :param images: batch of images with shape (N, C, H, W)
+        :return: augmented batch with the same shape, dtype, and device
+        """
+        matrices = self.get_matrices(len(images), images.device)
+        theta = torch.linalg.inv(matrices)[:, :2, :]  # grids map outputs to inputs
+
+        grid = torch.nn.functional.affine_grid(theta, images.shape, align_corners=False)
+        output = torch.nn.functional.grid_sample(
+            images.float() - self.value, grid,
+            mode="bilinear",
+            padding_mode="zeros",
+            align_corners=False,
+        )
+
+        return (output + self.value).to(images.dtype)
+
+
+    def get_matrices(self, num_samples: int, device: torch.device) -> torch.Tensor:
+        """
+        Sample the affine matrix of each sample in normalized image coordinates
+
+        :param num_samples: number of samples in the batch
+        :param device: device on which matrices are sampled
+        :return: matrices with shape (num_samples, 3, 3) which map input
+            coordinates to output coordinates
+        """
+        def uniform(low: float, high: float) -> torch.Tensor:
+            return torch.rand(num_samples, device=device) * (high - low) + low
+
+        def identity() -> torch.Tensor:
+            return torch.eye(3, device=device).repeat(num_samples, 1, 1)
+
+        def rotation(degrees: torch.Tensor) -> torch.Tensor:
+            radians = torch.deg2rad(degrees)
+            matrices = identity()
+            matrices[:, 0, 0] = torch.cos(radians)
+            matrices[:, 0, 1] = -torch.sin(radians)
+            matrices[:, 1, 0] = torch.sin(radians)
+            matrices[:, 1, 1] = torch.cos(radians)
+            return matrices
+
+        # RandomRotation
+        matrices = rotation(uniform(-self.degrees, self.degrees))
+
+        # RandomHorizontalFlip
+        flip = identity()
+        flip[:, 0, 0] = torch.where(torch.rand(num_samples, device=device) < self.flip_probability, -1.0, 1.0)
+        matrices = flip @ matrices
+
+        # RandomAffine
+        shear = identity()
+        shear[:, 0, 1] = torch.tan(torch.deg2rad(uniform(-self.shear, self.shear)))
+        matrices = shear @ rotation(uniform(-self.affine_degrees, self.affine_degrees)) @ matrices
+
+        # RandomResizePad
+        if self.scale is not None:
+            scales = uniform(*self.scale)
+            resize_pad = identity()
+            resize_pad[:, 0, 0] = scales
+            resize_pad[:, 1, 1] = scales
+            resize_pad[:, 0, 2] = uniform(-1.0, 1.0) * (1.0 - scales)
+            resize_pad[:, 1, 2] = uniform(-1.0, 1.0) * (1.0 - scales)
+            matrices = resize_pad @ matrices
+
+        return matrices
+
+
+if __name__ == "__main__":
+    # compare with per-sample torchvision transforms
+    import time
+    from torchvision import transforms
+    from competitive_drawing.train.utils.RandomResizePad import RandomResizePad
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    images = (torch.rand((256, 1, 28, 28)) > 0.8).float()
+
+    per_sample = transforms.Compose([
+        transforms.RandomRotation(15),
+        transforms.RandomHorizontalFlip(),
+        transforms.RandomAffine(5, shear=5),
+        RandomResizePad(scale=(0.3, 1.0), value=0)
+    ])
+    start = time.perf_counter()
+    for _ in range(10):
+        torch.stack([per_sample(image) for image in images])
+    per_sample_time = (time.perf_counter() - start) / 10
+
+    batch_augmentation = BatchAugmentation(scale=(0.3, 1.0))
+    images = images.to(device)
+    start = time.perf_counter()
+    for _ in range(10):
+        batch_augmentation(images)
+    if device == "cuda":
+        torch.cuda.synchronize()
+    batch_time = (time.perf_counter() - start) / 10
+
+    print(f"per-sample transforms: {len(images) / per_sample_time:.0f} images/s")
+    print(f"batch augmentation ({device}): {len(images) / batch_time:.0f} images/s")
@@ -0,0 +1,122 @@
+from typing import List, Optional, Tuple, Union
+
+import numpy
+from PIL import Image
+
+
+class MappedImages:
+    """
+    Sequence of images read lazily from memory mapped `.npy` files of flattened
+    uint8 bitmaps. Rows of every file are addressed through an offset table, so
+    no image is read until it is indexed and opening is near instant
+
+    Indexing with an integer returns a PIL image, while indexing with a slice or
+    an array of indices returns a `MappedImages` subset which shares the same
+    maps. Subsets are also what `sklearn.model_selection.train_test_split`
+    returns, since it indexes objects with a `shape` like arrays
+
+    :param file_paths: paths of `.npy` files with shape (num_images, H * W)
+    :param image_shape: shape (H, W) of each image
+    :param indices: indices of the images in this subset, defaults to all images
+    """
+    def __init__(
+        self,
+        file_paths: List[str],
+        image_shape: Tuple[int, int],
+        indices: Optional[numpy.ndarray] = None,
+    ):
+        self.file_paths = file_paths
+        self.image_shape = tuple(image_shape)
+        self._open()
+
+        self.indices = indices
+
+
+    def _open(self):
+        self.arrays = [numpy.load(file_path, mmap_mode="r") for file_path in self.file_paths]
+        for file_path, array in zip(self.file_paths, self.arrays):
+            if array.dtype != numpy.uint8 or array.shape[1:] != (numpy.prod(self.image_shape), ):
+                raise ValueError(
+                    f"Expected uint8 images of shape {self.image_shape} in {file_path}, "
+                    f"got {array.dtype} array of shape {array.shape}"
+                )
+
+        # offsets[file_index] is the index of the file's first image
+        self.offsets = numpy.cumsum([0] + [len(array) for array in self.arrays])
+
+
+    @property
+    def num_images_per_file(self) -> numpy.ndarray:
+        return numpy.diff(self.offsets)
+
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return (len(self), *self.image_shape)
+
+
+    def __len__(self) -> int:
+        return len(self.indices) if self.indices is not None else int(self.offsets[-1])
+
+
+    def __getitem__(self, key: Union[int, slice, numpy.ndarray, list, tuple]):
+        if isinstance(key, tuple):  # array style indexing, such as images[indices, ...]
+            key = key[0]
+
+        if isinstance(key, (int, numpy.integer)):
+            return Image.fromarray(self.get_array(key))
+
+        indices = self.indices if self.indices is not None else numpy.arange(len(self))
+        return MappedImages.from_maps(self, indices[key])
+
+
+    def get_array(self, index: int) -> numpy.ndarray:
+        """
+        :param index: index of image in this sequence
+        :return: read only uint8 array of shape `image_shape` backed by the map
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Image index {index} out of range for {len(self)} images")
+
+        global_index = self.indices[index] if self.indices is not None else index
+        file_index = numpy.searchsorted(self.offsets, global_index, side="right") - 1
+        row = self.arrays[file_index][global_index - self.offsets[file_index]]
+
+        return row.reshape(self.image_shape)
+
+
+    @classmethod
+    def from_maps(cls, images: "MappedImages", indices: numpy.ndarray) -> "MappedImages":
+        """
+        Create a subset which shares the maps of `images`
+
+        :param images: images whose maps are shared
+        :param indices: indices of the subset's images within all mapped images
+        :return: subset of images
+        """
+        subset = cls.__new__(cls)
+        subset.file_paths = images.file_paths
+        subset.image_shape = images.image_shape
+        subset.arrays = images.arrays
+        subset.offsets = images.offsets
+        subset.indices = numpy.asarray(indices, dtype=numpy.int64)
+
+        return subset
+
+
+    def __getstate__(self):
+        # maps are reopened rather than copied into other processes
+        return {
+            "file_paths": self.file_paths,
+            "image_shape": self.image_shape,
+            "indices": self.indices,
+        }
+
+
+    def __setstate__(self, state):
+        self.file_paths = state["file_paths"]
+        self.image_shape = state["image_shape"]
+        self.indices = state["indices"]
+        self._open()
@@ -0,0 +1,37 @@
+from typing import Tuple, Union
+
+import numpy
+
+
+class OneHotLabels:
+    """
+    Read only view of integer class labels as one-hot float32 rows. Rows are
+    created when indexed, so only the compact labels are held in memory
+
+    :param labels: integer class labels
+    :param num_classes: number of classes
+    """
+    def __init__(self, labels: numpy.ndarray, num_classes: int):
+        self.labels = labels
+        self.num_classes = num_classes
+
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (len(self.labels), self.num_classes)
+
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+    def __getitem__(self, key: Union[int, slice, numpy.ndarray, list, tuple]):
+        if isinstance(key, tuple):  # array style indexing, such as labels[indices, ...]
+            key = key[0]
+
+        if isinstance(key, (int, numpy.integer)):
+            one_hot = numpy.zeros(self.num_classes, dtype=numpy.float32)
+            one_hot[self.labels[key]] = 1.0
+            return one_hot
+
+        return OneHotLabels(self.labels[key], self.num_classes)
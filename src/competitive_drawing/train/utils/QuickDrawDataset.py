@@ -1,25 +1,22 @@
 import torch
 from torchvision import transforms
 
-from competitive_drawing.train.utils.RandomResizePad import RandomResizePad
+from competitive_drawing.train.utils.BatchAugmentation import BatchAugmentation
 
 
 class QuickDrawDataset(torch.utils.data.Dataset):
+    """
+    Samples are only converted to tensors. Training augmentations run on
+    collated batches with `augment_batch`, preferably on the training device
+    """
     def __init__(self, X, y, is_test: bool = False):
         self.X = X
         self.y = y
+        self.transform = transforms.ToTensor()
         if not is_test:
-            self.transform = transforms.Compose([
-                transforms.RandomRotation(15),
-                transforms.RandomHorizontalFlip(),
-                transforms.RandomAffine(5, shear=5),
-                transforms.ToTensor(),
-                RandomResizePad(scale=(0.3, 1.0), value=0)
-            ])
+            self.batch_augmentation = BatchAugmentation(scale=(0.3, 1.0), value=0)
         else:
-            self.transform = transforms.Compose([
-                transforms.ToTensor(),
-            ])
+            self.batch_augmentation = None
 
         assert len(self.X) == len(self.y)
 
@@ -30,7 +27,10 @@ class QuickDrawDataset(torch.utils.data.Dataset):
         image = self.X[idx]
         label = self.y[idx]
 
-        if not self.transform:
-            return image, label
-        else:
-            return self.transform(image), label
+        return self.transform(image), label
+
+    def augment_batch(self, images: torch.Tensor) -> torch.Tensor:
+        if self.batch_augmentation is None:
+            return images
+
+        return self.batch_augmentation(images)
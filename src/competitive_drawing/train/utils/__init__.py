@@ -1,3 +1,6 @@
 from .QuickDrawDataset import *
+from .BatchAugmentation import *
+from .MappedImages import *
+from .OneHotLabels import *
 from .helpers import *
 from .RandomResizePad import *
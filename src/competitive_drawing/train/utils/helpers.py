@@ -1,10 +1,10 @@
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Union
 
 import os
-import PIL
-import tqdm
 import numpy
-from concurrent.futures import ThreadPoolExecutor
+
+from .MappedImages import MappedImages
+from .OneHotLabels import OneHotLabels
 
 
 def get_all_local_labels(data_dir: str) -> List[str]:
@@ -24,45 +24,40 @@ def load_data(
     image_shape: Tuple[int, int],
     class_names: Optional[List[str]] = None,
     one_hot: bool = False
-):
+) -> Tuple[MappedImages, Union[numpy.ndarray, OneHotLabels], List[str]]:
+    """
+    Memory map the `.npy` bitmap file of each class. Images are read lazily from
+    the maps and labels are kept as a compact integer array, so loading takes
+    near constant time and memory regardless of dataset size
+
+    :param root_dir: directory containing one `.npy` file per class
+    :param image_shape: shape (H, W) of each image
+    :param class_names: names of classes to load, defaults to every file in
+        `root_dir`
+    :param one_hot: True if labels should be indexed as one-hot float32 rows
+    :return: images, labels, and class names
+    """
     print("loading data...")
     class_names = class_names if class_names is not None else sorted(os.listdir(root_dir))
     num_classes = len(class_names)
-    class_images = [None for _ in range(num_classes)]
-    class_labels = [None for _ in range(num_classes)]
-
-    def load_class(class_index, class_name, progress):
-        class_name = f"{class_name}.npy" if "npy" not in class_name else class_name
-        file_path = os.path.join(root_dir, class_name)
-
-        images_raw = numpy.load(file_path)
-        images = []
-        for raw_image in images_raw:
-            raw_image = raw_image.reshape(*image_shape)
-            image = PIL.Image.fromarray(raw_image)
-            images.append(image)
-            del raw_image
-
-        labels = [to_one_hot(class_index, num_classes)] * len(images)
-
-        class_images[class_index] = images
-        class_labels[class_index] = labels
-        progress.update(1)
 
-    with tqdm.tqdm(total=num_classes) as progress:
-        with ThreadPoolExecutor(max_workers=None) as executor:
-            futures = [
-                executor.submit(load_class, class_index, class_name, progress)
-                for class_index, class_name in enumerate(class_names)
-            ]
-            [future.result() for future in futures]
+    file_paths = [
+        os.path.join(root_dir, f"{class_name}.npy" if "npy" not in class_name else class_name)
+        for class_name in class_names
+    ]
+    images = MappedImages(file_paths, image_shape)
 
-    all_images = sum(class_images, [])
-    all_labels = sum(class_labels, [])
+    label_dtype = numpy.min_scalar_type(max(num_classes - 1, 0))
+    labels = numpy.repeat(
+        numpy.arange(num_classes, dtype=label_dtype),
+        images.num_images_per_file,
+    )
+    if one_hot:
+        labels = OneHotLabels(labels, num_classes)
 
-    print(f"loaded {len(all_images)} images and {len(all_labels)} labels")
+    print(f"loaded {len(images)} images and {len(labels)} labels")
 
-    return all_images, all_labels, class_names
+    return images, labels, class_names
 
 
 def to_one_hot(array, num_classes):
@@ -0,0 +1,407 @@
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+import json
+import numpy
+from itertools import chain, islice
+
+
+# (points, stroke_offsets) of one drawing, see `StrokeArrays.__getitem__`
+Drawing = Tuple[numpy.ndarray, numpy.ndarray]
+
+
+class StrokeArrays:
+    """
+    Drawings stored as flat arrays rather than nested lists. The (x, y) points
+    of every stroke are concatenated into one int16 array, `stroke_offsets`
+    holds the index of each stroke's first point, and `drawing_offsets` holds
+    the index of each drawing's first stroke. Both offset arrays end with the
+    total count, so stroke `i` spans `stroke_offsets[i]:stroke_offsets[i + 1]`
+
+    Indexing with an integer returns a drawing as a (points, stroke_offsets)
+    pair of views, while indexing with a slice or an array of indices returns
+    a `StrokeArrays` subset which shares the same arrays, like `MappedImages`
+
+    :param points: int16 array of shape (num_points, 2)
+    :param stroke_offsets: int64 array of shape (num_strokes + 1, )
+    :param drawing_offsets: int64 array of shape (num_drawings + 1, )
+    :param indices: indices of the drawings in this subset, defaults to all
+    :param file_path: file the arrays are memory mapped from, if any
+    """
+    MAGIC = b"QDSTROKE"
+    HEADER_SIZE = len(MAGIC) + 3 * 8
+
+    def __init__(
+        self,
+        points: numpy.ndarray,
+        stroke_offsets: numpy.ndarray,
+        drawing_offsets: numpy.ndarray,
+        indices: Optional[numpy.ndarray] = None,
+        file_path: Optional[str] = None,
+    ):
+        self.points = points
+        self.stroke_offsets = stroke_offsets
+        self.drawing_offsets = drawing_offsets
+        self.indices = indices
+        self.file_path = file_path
+
+
+    @property
+    def shape(self) -> Tuple[int]:
+        return (len(self), )
+
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            array.nbytes
+            for array in (self.points, self.stroke_offsets, self.drawing_offsets, self.indices)
+            if array is not None
+        )
+
+
+    def __len__(self) -> int:
+        return len(self.indices) if self.indices is not None else len(self.drawing_offsets) - 1
+
+
+    def __iter__(self) -> Iterator[Drawing]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+    def __getitem__(self, key: Union[int, slice, numpy.ndarray, list, tuple]):
+        if isinstance(key, tuple):  # array style indexing, such as drawings[indices, ...]
+            key = key[0]
+
+        if isinstance(key, (int, numpy.integer)):
+            return self.get_drawing(key)
+
+        indices = self.indices if self.indices is not None else numpy.arange(len(self))
+        return StrokeArrays(
+            self.points, self.stroke_offsets, self.drawing_offsets,
+            indices=numpy.asarray(indices[key], dtype=numpy.int64),
+            file_path=self.file_path,
+        )
+
+
+    def get_drawing(self, index: int) -> Drawing:
+        """
+        :param index: index of drawing in this sequence
+        :return: int16 points of shape (num_points, 2) and offsets of the
+            drawing's strokes within those points
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Drawing index {index} out of range for {len(self)} drawings")
+
+        global_index = self.indices[index] if self.indices is not None else index
+        stroke_start = self.drawing_offsets[global_index]
+        stroke_end = self.drawing_offsets[global_index + 1]
+        stroke_offsets = self.stroke_offsets[stroke_start: stroke_end + 1]
+
+        return self.points[stroke_offsets[0]: stroke_offsets[-1]], stroke_offsets - stroke_offsets[0]
+
+
+    def compact(self) -> "StrokeArrays":
+        """
+        :return: in-memory copy which holds only the drawings of this subset
+        """
+        if self.indices is None:
+            return StrokeArrays(
+                numpy.array(self.points), numpy.array(self.stroke_offsets), numpy.array(self.drawing_offsets)
+            )
+
+        return StrokeArrays.concatenate([
+            StrokeArrays(points, stroke_offsets, numpy.array([0, len(stroke_offsets) - 1]))
+            for points, stroke_offsets in self
+        ])
+
+
+    @classmethod
+    def concatenate(cls, stroke_arrays: List["StrokeArrays"]) -> "StrokeArrays":
+        """
+        :param stroke_arrays: drawings to join, in order
+        :return: in-memory drawings of every element of `stroke_arrays`
+        """
+        stroke_arrays = [
+            arrays.compact() if arrays.indices is not None else arrays
+            for arrays in stroke_arrays
+        ]
+        stroke_offsets, drawing_offsets = cls._concatenate_offsets(stroke_arrays)
+
+        return cls(
+            numpy.concatenate(
+                [numpy.zeros((0, 2), dtype=numpy.int16)] +
+                [arrays.points for arrays in stroke_arrays]
+            ),
+            stroke_offsets,
+            drawing_offsets,
+        )
+
+
+    @classmethod
+    def concatenate_to_file(
+        cls,
+        stroke_arrays: List["StrokeArrays"],
+        file_path: str,
+        chunk_size: int = 2 ** 20,
+    ) -> "StrokeArrays":
+        """
+        Join drawings directly into a file which is then memory mapped, so the
+        points of mapped drawings are never all held in memory
+
+        :param stroke_arrays: drawings to join, in order
+        :param file_path: path of file to write, must not back any of
+            `stroke_arrays`
+        :param chunk_size: number of points copied at a time
+        :return: drawings of every element of `stroke_arrays` backed by the file
+        """
+        stroke_arrays = [
+            arrays.compact() if arrays.indices is not None else arrays
+            for arrays in stroke_arrays
+        ]
+        stroke_offsets, drawing_offsets = cls._concatenate_offsets(stroke_arrays)
+
+        with open(file_path, "wb") as file:
+            file.write(bytes(cls.HEADER_SIZE))  # written once counts are known
+            for arrays in stroke_arrays:
+                for start in range(0, len(arrays.points), chunk_size):
+                    chunk = arrays.points[start: start + chunk_size]
+                    file.write(numpy.ascontiguousarray(chunk, dtype=numpy.int16).tobytes())
+
+            cls._write_offsets(file, int(stroke_offsets[-1]), stroke_offsets, drawing_offsets)
+
+        return cls.load(file_path)
+
+
+    @staticmethod
+    def _concatenate_offsets(stroke_arrays: List["StrokeArrays"]) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        :param stroke_arrays: drawings without subset indices, in order
+        :return: stroke offsets and drawing offsets of the joined drawings
+        """
+        # counted from offsets, since `from_ndjson` concatenates chunks whose points were spilled
+        point_starts = numpy.cumsum([0] + [arrays.stroke_offsets[-1] for arrays in stroke_arrays])
+        stroke_starts = numpy.cumsum([0] + [len(arrays.stroke_offsets) - 1 for arrays in stroke_arrays])
+
+        stroke_offsets = numpy.concatenate([numpy.zeros(1, dtype=numpy.int64)] + [
+            arrays.stroke_offsets[1:] + point_start
+            for arrays, point_start in zip(stroke_arrays, point_starts)
+        ])
+        drawing_offsets = numpy.concatenate([numpy.zeros(1, dtype=numpy.int64)] + [
+            arrays.drawing_offsets[1:] + stroke_start
+            for arrays, stroke_start in zip(stroke_arrays, stroke_starts)
+        ])
+
+        return stroke_offsets, drawing_offsets
+
+
+    @classmethod
+    def from_strokes(cls, drawings: List[List[List[List[int]]]]) -> "StrokeArrays":
+        """
+        :param drawings: drawings in the Quick, Draw! format, lists of strokes
+            where each stroke is a pair of x and y coordinate lists
+        :return: drawings as flat arrays
+        """
+        strokes = [stroke for drawing in drawings for stroke in drawing]
+        points = numpy.stack([
+            numpy.array(list(chain.from_iterable(xs for xs, _ys in strokes)), dtype=numpy.int64),
+            numpy.array(list(chain.from_iterable(ys for _xs, ys in strokes)), dtype=numpy.int64),
+        ], axis=1)
+
+        int16_info = numpy.iinfo(numpy.int16)
+        if len(points) > 0 and (points.min() < int16_info.min or points.max() > int16_info.max):
+            raise ValueError(f"Coordinates must be within [{int16_info.min}, {int16_info.max}]")
+
+        return cls(
+            points.astype(numpy.int16),
+            numpy.cumsum([0] + [len(xs) for xs, _ys in strokes], dtype=numpy.int64),
+            numpy.cumsum([0] + [len(drawing) for drawing in drawings], dtype=numpy.int64),
+        )
+
+
+    @classmethod
+    def from_ndjson(
+        cls,
+        file_path: str,
+        use_unrecognized: bool = False,
+        spill_path: Optional[str] = None,
+        chunk_size: int = 4096,
+    ) -> "StrokeArrays":
+        """
+        Stream drawings from a Quick, Draw! `.ndjson` file. Lines are read
+        `chunk_size` at a time and each chunk is converted to flat arrays at
+        once, so nested lists only ever exist for one chunk
+
+        :param file_path: path of `.ndjson` file
+        :param use_unrecognized: True if drawings which were not recognized by
+            the Quick, Draw! classifier should be included
+        :param spill_path: if provided, points are written to this file as they
+            are parsed and the result is memory mapped from it
+        :param chunk_size: number of lines parsed at a time
+        :return: drawings as flat arrays
+        """
+        chunks = []
+        spill_file = open(spill_path, "wb") if spill_path is not None else None
+        try:
+            if spill_file is not None:
+                spill_file.write(bytes(cls.HEADER_SIZE))  # written once counts are known
+
+            with open(file_path, "r") as stroke_file:
+                while len(lines := list(islice(stroke_file, chunk_size))) > 0:
+                    drawings_data = [json.loads(line) for line in lines if line.strip()]
+                    chunk = cls.from_strokes([
+                        drawing_data["drawing"]
+                        for drawing_data in drawings_data
+                        if drawing_data["recognized"] or use_unrecognized
+                    ])
+
+                    # spilled points are released, only offsets are kept
+                    if spill_file is not None:
+                        spill_file.write(chunk.points.tobytes())
+                        chunk.points = numpy.zeros((0, 2), dtype=numpy.int16)
+                    chunks.append(chunk)
+
+            stroke_arrays = cls.concatenate(chunks)
+            if spill_file is None:
+                return stroke_arrays
+
+            num_points = int(stroke_arrays.stroke_offsets[-1])
+            cls._write_offsets(spill_file, num_points, stroke_arrays.stroke_offsets, stroke_arrays.drawing_offsets)
+
+        finally:
+            if spill_file is not None:
+                spill_file.close()
+
+        return cls.load(spill_path)
+
+
+    def save(self, file_path: str):
+        """
+        Write drawings to a binary file which can be memory mapped by `load`
+
+        :param file_path: path of file to write
+        """
+        stroke_arrays = self.compact() if self.indices is not None else self
+        with open(file_path, "wb") as file:
+            file.write(bytes(self.HEADER_SIZE))
+            file.write(numpy.ascontiguousarray(stroke_arrays.points, dtype=numpy.int16).tobytes())
+            self._write_offsets(
+                file, len(stroke_arrays.points), stroke_arrays.stroke_offsets, stroke_arrays.drawing_offsets
+            )
+
+
+    @classmethod
+    def load(cls, file_path: str) -> "StrokeArrays":
+        """
+        Memory map drawings written by `save` or `from_ndjson`
+
+        :param file_path: path of file to map
+        :return: drawings backed by the file
+        """
+        with open(file_path, "rb") as file:
+            header = file.read(cls.HEADER_SIZE)
+        if header[:len(cls.MAGIC)] != cls.MAGIC:
+            raise ValueError(f"{file_path} is not a stroke arrays file")
+        num_points, num_strokes, num_drawings = numpy.frombuffer(header[len(cls.MAGIC):], dtype=numpy.int64)
+
+        def map_array(offset: int, dtype: numpy.dtype, shape: Tuple[int, ...]) -> numpy.ndarray:
+            if numpy.prod(shape) == 0:
+                return numpy.zeros(shape, dtype=dtype)
+            return numpy.memmap(file_path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+        points_offset = cls.HEADER_SIZE
+        stroke_offsets_offset = cls._get_offsets_position(int(num_points))
+        drawing_offsets_offset = stroke_offsets_offset + 8 * (int(num_strokes) + 1)
+
+        return cls(
+            map_array(points_offset, numpy.int16, (int(num_points), 2)),
+            map_array(stroke_offsets_offset, numpy.int64, (int(num_strokes) + 1, )),
+            map_array(drawing_offsets_offset, numpy.int64, (int(num_drawings) + 1, )),
+            file_path=file_path,
+        )
+
+
+    @classmethod
+    def _get_offsets_position(cls, num_points: int) -> int:
+        # offsets follow the points, aligned to 8 bytes
+        position = cls.HEADER_SIZE + num_points * 2 * 2
+        return position + (-position % 8)
+
+
+    @classmethod
+    def _write_offsets(
+        cls,
+        file: BinaryIO,
+        num_points: int,
+        stroke_offsets: numpy.ndarray,
+        drawing_offsets: numpy.ndarray,
+    ):
+        # expects file to be positioned after the points
+        file.write(bytes(cls._get_offsets_position(num_points) - file.tell()))
+        file.write(numpy.ascontiguousarray(stroke_offsets, dtype=numpy.int64).tobytes())
+        file.write(numpy.ascontiguousarray(drawing_offsets, dtype=numpy.int64).tobytes())
+
+        file.seek(0)
+        file.write(cls.MAGIC)
+        file.write(numpy.array(
+            [num_points, len(stroke_offsets) - 1, len(drawing_offsets) - 1], dtype=numpy.int64
+        ).tobytes())
+
+
+    def __getstate__(self):
+        # mapped arrays are reopened rather than copied into other processes
+        state = self.__dict__.copy()
+        if self.file_path is not None:
+            state.update(points=None, stroke_offsets=None, drawing_offsets=None)
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.file_path is not None:
+            mapped = StrokeArrays.load(self.file_path)
+            self.points = mapped.points
+            self.stroke_offsets = mapped.stroke_offsets
+            self.drawing_offsets = mapped.drawing_offsets
+
+
+if __name__ == "__main__":
+    # compare with nested lists parsed line by line
+    import os
+    import sys
+    import time
+    import tempfile
+    import tracemalloc
+
+    file_path = sys.argv[1] if len(sys.argv) > 1 else "src/competitive_drawing/train_v2/camera.ndjson"
+
+    def measure(name, load):
+        tracemalloc.start()
+        start = time.perf_counter()
+        drawings = load()
+        duration = time.perf_counter() - start
+        resident, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(
+            f"{name}: {len(drawings)} drawings in {duration:.2f}s, "
+            f"{resident / 2 ** 20:.1f} MiB resident, {peak / 2 ** 20:.1f} MiB peak"
+        )
+        return drawings
+
+    def load_lists():
+        vector_images = []
+        with open(file_path, "r") as stroke_file:
+            for line in filter(str.strip, stroke_file):
+                drawing_data = json.loads(line)
+                if drawing_data["recognized"]:
+                    vector_images.append(drawing_data["drawing"])
+        return vector_images
+
+    measure("nested lists", load_lists)
+    measure("stroke arrays", lambda: StrokeArrays.from_ndjson(file_path))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        spill_path = os.path.join(temp_dir, "strokes.bin")
+        measure("spilled stroke arrays", lambda: StrokeArrays.from_ndjson(
+            file_path, spill_path=spill_path))
@@ -1,10 +1,22 @@
+from typing import Optional, Union
+
 import torch
 import random
 import cairocffi as cairo
 from itertools import accumulate
 
+from competitive_drawing.train_v2.dataset.StrokeArrays import Drawing, StrokeArrays
+
 
 class VecToRaster:
+    """
+    Rasterizes stroke vectors onto a reusable cairo surface. Surfaces cannot be
+    shared between processes, so each data loader worker creates its own
+    rasterizer, see `dataset.init_worker`
+
+    :param seed: seed of the random number generator used for augmentation,
+        defaults to a random seed
+    """
     def __init__(
         self,
         side: int,
@@ -12,7 +24,9 @@ class VecToRaster:
         padding: float,
         min_scale: float,
         max_scale: float,
+        seed: Optional[int] = None,
     ):
+        self.rng = random.Random(seed)
         self.original_side = 256
         self.surface = cairo.ImageSurface(cairo.FORMAT_A8, side, side)
         self.ctx = cairo.Context(self.surface)
@@ -35,36 +49,33 @@ class VecToRaster:
 
     def __call__(
         self,
-        vector_image: list[list[list[int]]],
+        vector_image: Union[list[list[list[int]]], Drawing],
         augment: bool = False,
     ) -> tuple[torch.Tensor, float]:
-        # vector_image: list of strokes
-        # stroke: xs, ys
-        x_max = max([max(stroke[0]) for stroke in vector_image])
-        y_max = max([max(stroke[1]) for stroke in vector_image])
-        image_len = sum([len(stroke[0]) for stroke in vector_image])
+        # vector_image: list of strokes, each of which is xs, ys
+        # or (points, stroke_offsets) read straight from `StrokeArrays`
+        if not isinstance(vector_image, tuple):
+            vector_image = StrokeArrays.from_strokes([vector_image])[0]
+        points, stroke_offsets = vector_image
+
+        x_max, y_max = points.max(axis=0).tolist()
+        image_len = len(points)
 
         # apply partial truncation
         partial_frac = 1.0#rand(0, 1) if augment else 1.0
         partial_len = image_len * partial_frac
 
         # scale points
-        scale = rand(self.min_scale, self.max_scale) if augment else 1.0
+        scale = self.rand(self.min_scale, self.max_scale) if augment else 1.0
         x_max *= scale
         y_max *= scale
 
         # random padding
-        x_pad = rand(0, self.original_side - x_max) if augment else 0
-        y_pad = rand(0, self.original_side - y_max) if augment else 0
+        x_pad = self.rand(0, self.original_side - x_max) if augment else 0
+        y_pad = self.rand(0, self.original_side - y_max) if augment else 0
 
         # apply scale and padding
-        vector_image = [
-            [
-                [x * scale + x_pad for x in xs],
-                [y * scale + y_pad for y in ys]
-            ]
-            for xs, ys in vector_image
-        ]
+        points = points * scale + (x_pad, y_pad)
 
         # clear background
         self.ctx.set_source_rgba(0, 0, 0, 0)
@@ -73,9 +84,10 @@ class VecToRaster:
         # draw strokes
         num_points = 0
         self.ctx.set_source_rgba(0, 0, 0, 1)
-        for xv, yv in vector_image:
-            self.ctx.move_to(xv[0], yv[0])
-            for x, y in zip(xv, yv):
+        for stroke_start, stroke_end in zip(stroke_offsets[:-1], stroke_offsets[1:]):
+            stroke = points[stroke_start: stroke_end].tolist()
+            self.ctx.move_to(*stroke[0])
+            for x, y in stroke:
                 self.ctx.line_to(x, y)
 
                 num_points += 1
@@ -92,5 +104,5 @@ class VecToRaster:
         image = data.reshape(shape) / 255
         return image, partial_frac
 
-def rand(a, b):
-    return (b - a) * random.random() + a
+    def rand(self, a, b):
+        return (b - a) * self.rng.random() + a
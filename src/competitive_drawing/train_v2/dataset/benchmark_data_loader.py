@@ -0,0 +1,59 @@
+import time
+import random
+import argparse
+
+from competitive_drawing.train_v2.dataset.dataset import QuickDrawDataset, load_data, make_data_loader
+from competitive_drawing.train_v2.dataset.raster_cache import load_raster_data
+
+
+parser = argparse.ArgumentParser(
+    description="Measure rasterization throughput of the data loader against its number of workers"
+)
+parser.add_argument("--data_dir", type=str, default=None, help="directory of .ndjson files, defaults to synthetic strokes")
+parser.add_argument("--raster_cache_dir", type=str, default=None, help="read images rasterized ahead of time into this directory, requires --data_dir")
+parser.add_argument("--class_names", type=str, nargs="+", default=["camera", "coffee_cup"])
+parser.add_argument("--num_workers", type=int, nargs="+", default=[0, 1, 2, 4, 8])
+parser.add_argument("--num_samples", type=int, default=8192)
+parser.add_argument("--batch_size", type=int, default=128)
+parser.add_argument("--image_size", type=int, default=64)
+
+
+def make_synthetic_images(num_samples: int) -> list[list[list[list[int]]]]:
+    rng = random.Random(0)
+    return [
+        [
+            [
+                [rng.randrange(256) for _ in range(num_points)],
+                [rng.randrange(256) for _ in range(num_points)],
+            ]
+            for num_points in [rng.randrange(2, 30) for _ in range(rng.randrange(1, 8))]
+        ]
+        for _ in range(num_samples)
+    ]
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    if args.data_dir is not None and args.raster_cache_dir is not None:
+        images, labels = load_raster_data(args.data_dir, args.class_names, args.raster_cache_dir, side=args.image_size)
+        images, labels = images[:args.num_samples], labels[:args.num_samples]
+    elif args.data_dir is not None:
+        images, labels = load_data(args.data_dir, args.class_names)
+        images, labels = images[:args.num_samples], labels[:args.num_samples]
+    else:
+        images = make_synthetic_images(args.num_samples)
+        labels = [index % 2 for index in range(args.num_samples)]
+
+    dataset = QuickDrawDataset(images, labels, side=args.image_size, augment=True)
+
+    for num_workers in args.num_workers:
+        data_loader = make_data_loader(dataset, args.batch_size, num_workers=num_workers)
+        next(iter(data_loader))  # start workers
+
+        start = time.perf_counter()
+        num_loaded = sum(len(batch_images) for batch_images, _labels in data_loader)
+        duration = time.perf_counter() - start
+
+        print(f"num_workers={num_workers}: {num_loaded / duration:.0f} samples/s")
+        del data_loader
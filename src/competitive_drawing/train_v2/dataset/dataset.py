@@ -1,9 +1,12 @@
+from typing import Optional
+
 import os
-import json
+import time
 import torch
-from torchvision import transforms
 
-from competitive_drawing.train_v2.dataset.VecToRaster import VecToRaster
+from competitive_drawing.train.utils.BatchAugmentation import BatchAugmentation
+from competitive_drawing.train.utils.MappedImages import MappedImages
+from competitive_drawing.train_v2.dataset.StrokeArrays import StrokeArrays
 from competitive_drawing.train_v2.utils import smoothed_one_hot
 
 
@@ -24,18 +27,23 @@ class QuickDrawDataset(torch.utils.data.Dataset):
         self.labels = labels
         self.num_classes = max(labels) + 1
 
-        self.vec_to_raster = VecToRaster(
+        # each process creates its own rasterizer, see `init_worker`
+        self.raster_kwargs = dict(
             side=side,
             line_diameter=line_diameter,
             padding=padding,
             min_scale=min_scale,
             max_scale=max_scale,
         )
-        self.augmentations = transforms.Compose([
-            transforms.RandomRotation(15),
-            transforms.RandomHorizontalFlip(),
-            transforms.RandomAffine(5, shear=5),
-        ])
+        self.vec_to_raster = None
+
+        # images rasterized ahead of time by `raster_cache` are scaled and
+        # padded with the rest of the batch rather than in the vector domain
+        self.pre_rasterized = isinstance(images, MappedImages)
+        scale = (min_scale, max_scale) if self.pre_rasterized else None
+
+        # applied to collated batches by `augment_batch`
+        self.batch_augmentation = BatchAugmentation(degrees=15, affine_degrees=5, shear=5, scale=scale)
 
     def __len__(self):
         assert len(self.images) == len(self.labels)
@@ -43,11 +51,16 @@ class QuickDrawDataset(torch.utils.data.Dataset):
 
     def __getitem__(self, idx: int) -> tuple[torch.Tensor, float, int]:
         # get image
-        image = self.images[idx]
-        image, partial_frac = self.vec_to_raster(image, augment=self.augment)
-        image = image.unsqueeze(0)  # add batch dim
-        if self.augment:
-            image = self.augmentations(image)
+        if self.pre_rasterized:
+            image = torch.from_numpy(self.images.get_array(idx).copy()) / 255
+            partial_frac = 1.0
+        else:
+            if self.vec_to_raster is None:
+                self.init_vec_to_raster()
+
+            image = self.images[idx]
+            image, partial_frac = self.vec_to_raster(image, augment=self.augment)
+        image = image.unsqueeze(0)  # add channel dim
 
         # get label
         label = torch.zeros((self.num_classes, ))
@@ -55,32 +68,123 @@ class QuickDrawDataset(torch.utils.data.Dataset):
         label[self.labels[idx]] = partial_frac
 
         return image, label
+
+    def init_vec_to_raster(self, seed: Optional[int] = None):
+        # cairo is only needed by datasets which rasterize online
+        from competitive_drawing.train_v2.dataset.VecToRaster import VecToRaster
+
+        self.vec_to_raster = VecToRaster(**self.raster_kwargs, seed=seed)
+
+    def __getstate__(self):
+        # cairo surfaces cannot be pickled into worker processes
+        state = self.__dict__.copy()
+        state["vec_to_raster"] = None
+        return state
+
+    def augment_batch(self, images: torch.Tensor) -> torch.Tensor:
+        if not self.augment:
+            return images
+
+        return self.batch_augmentation(images)
     
 
-def load_data(data_dir: str, class_names: list[str], use_unrecognized: bool = False) -> tuple[list, list[int]]:
+def init_worker(worker_id: int):
+    """
+    Data loader worker init hook which gives each worker its own rasterizer,
+    seeded with the worker's seed so that workers augment differently.
+    Pre-rasterized datasets do not need a rasterizer
+    """
+    worker_info = torch.utils.data.get_worker_info()
+    if not worker_info.dataset.pre_rasterized:
+        worker_info.dataset.init_vec_to_raster(seed=worker_info.seed % 2 ** 32)
+
+
+def make_data_loader(
+    dataset: QuickDrawDataset,
+    batch_size: int,
+    shuffle: bool = True,
+    num_workers: int = 0,
+    prefetch_factor: Optional[int] = 2,
+    drop_last: bool = True,
+) -> torch.utils.data.DataLoader:
+    """
+    Create a data loader which rasterizes samples in `num_workers` persistent
+    worker processes, each prefetching `prefetch_factor` batches
+
+    :param dataset: dataset of stroke vectors
+    :param batch_size: number of samples per batch
+    :param shuffle: True if samples should be shuffled each epoch
+    :param num_workers: number of worker processes, 0 rasterizes in the main
+        process
+    :param prefetch_factor: number of batches loaded in advance by each worker
+    :param drop_last: True if the last incomplete batch should be dropped
+    :return: data loader
+    """
+    use_workers = num_workers > 0
+    return torch.utils.data.DataLoader(
+        dataset,
+        batch_size=batch_size,
+        shuffle=shuffle,
+        num_workers=num_workers,
+        worker_init_fn=init_worker if use_workers else None,
+        persistent_workers=use_workers,
+        prefetch_factor=prefetch_factor if use_workers else None,
+        pin_memory=torch.cuda.is_available(),
+        drop_last=drop_last,
+    )
+
+
+def load_data(
+    data_dir: str,
+    class_names: list[str],
+    use_unrecognized: bool = False,
+    spill_dir: Optional[str] = None,
+) -> tuple[StrokeArrays, list[int]]:
+    """
+    :param data_dir: directory of `.ndjson` stroke files
+    :param class_names: names of classes to load
+    :param use_unrecognized: True if drawings which were not recognized by the
+        Quick, Draw! classifier should be included
+    :param spill_dir: if provided, strokes are written to binary files in
+        this directory and memory mapped
+    :return: drawings and integer labels
+    """
     images = []
     labels = []
 
     for index, class_name in enumerate(class_names):
         file_path = os.path.join(data_dir, f"{class_name}.ndjson")
-        _images = load_vectors_from_file(file_path, use_unrecognized=use_unrecognized)
-        images.extend(_images)
+        spill_path = os.path.join(spill_dir, f"{class_name}.strokes") if spill_dir is not None else None
+
+        start = time.perf_counter()
+        _images = load_vectors_from_file(file_path, use_unrecognized=use_unrecognized, spill_path=spill_path)
+        print(
+            f"loaded {len(_images)} {class_name} drawings in {time.perf_counter() - start:.2f}s "
+            f"({_images.nbytes / 2 ** 20:.1f} MiB{', mapped' if spill_path is not None else ''})"
+        )
+
+        images.append(_images)
         labels.extend([index] * len(_images))
 
+    if len(images) == 1:
+        images = images[0]
+    elif spill_dir is not None and len(images) > 1:
+        # join mapped classes into a single mapped file without loading them
+        spill_path = os.path.join(spill_dir, f"{'-'.join(class_names)}.strokes")
+        images = StrokeArrays.concatenate_to_file(images, spill_path)
+    else:
+        images = StrokeArrays.concatenate(images)
     assert len(images) == len(labels)
 
     return images, labels
 
 
-def load_vectors_from_file(file_path: str, use_unrecognized: bool) -> list[list[list[int]]]:
-    vector_images = []
-    with open(file_path, "r") as stroke_file:
-        for line in stroke_file:
-            drawing_data = json.loads(line)
-            if drawing_data["recognized"] or use_unrecognized:
-                vector_images.append(drawing_data["drawing"])
-
-    return vector_images
+def load_vectors_from_file(
+    file_path: str,
+    use_unrecognized: bool,
+    spill_path: Optional[str] = None,
+) -> StrokeArrays:
+    return StrokeArrays.from_ndjson(file_path, use_unrecognized=use_unrecognized, spill_path=spill_path)
 
 
 if __name__ == "__main__":
@@ -91,6 +195,7 @@ if __name__ == "__main__":
     dataset = QuickDrawDataset(images, labels, augment=True)
 
     image, label = dataset[8]
+    image = dataset.augment_batch(image[None])[0]
     image = (image * 255).to(torch.uint8)
     print(label)
     write_png(image, f"sample.png")
\ No newline at end of file
@@ -0,0 +1,144 @@
+import os
+import json
+import torch
+import numpy
+import shutil
+import hashlib
+
+from competitive_drawing.train.utils.MappedImages import MappedImages
+from competitive_drawing.train_v2.dataset.dataset import load_vectors_from_file
+
+
+INDEX_FILE_NAME = "index.json"
+
+
+def load_raster_data(
+    data_dir: str,
+    class_names: list[str],
+    cache_dir: str,
+    side: int = 28,
+    line_diameter: float = (1 / 32),
+    padding: float = (1 / 32),
+    use_unrecognized: bool = False,
+    shard_size: int = 65536,
+) -> tuple[MappedImages, numpy.ndarray]:
+    """
+    Load pre-rasterized images of each class, rasterizing classes whose cache is
+    missing or stale. Images are memory mapped from the cache, so datasets only
+    need to apply geometric augmentations online
+
+    :param data_dir: directory of `.ndjson` stroke files
+    :param class_names: names of classes to load
+    :param cache_dir: directory in which rasterized shards are cached
+    :param side: side length of rasterized images
+    :param line_diameter: stroke width as a fraction of the original drawing size
+    :param padding: padding as a fraction of the original drawing size
+    :param use_unrecognized: True if drawings which were not recognized by the
+        Quick, Draw! classifier should be included
+    :param shard_size: maximum number of images per shard
+    :return: images and integer labels
+    """
+    file_paths = []
+    labels = []
+    for index, class_name in enumerate(class_names):
+        class_cache_dir = build_class_cache(
+            os.path.join(data_dir, f"{class_name}.ndjson"),
+            os.path.join(cache_dir, class_name),
+            side, line_diameter, padding, use_unrecognized, shard_size
+        )
+        with open(os.path.join(class_cache_dir, INDEX_FILE_NAME), "r") as index_file:
+            shard_lengths = json.load(index_file)["shard_lengths"]
+
+        file_paths.extend(
+            os.path.join(class_cache_dir, _get_shard_name(shard_index))
+            for shard_index in range(len(shard_lengths))
+        )
+        labels.append(numpy.full(sum(shard_lengths), index, dtype=numpy.int64))
+
+    images = MappedImages(file_paths, (side, side))
+    labels = numpy.concatenate(labels) if len(labels) > 0 else numpy.zeros(0, dtype=numpy.int64)
+    assert len(images) == len(labels)
+
+    return images, labels
+
+
+def build_class_cache(
+    source_path: str,
+    cache_dir: str,
+    side: int,
+    line_diameter: float,
+    padding: float,
+    use_unrecognized: bool,
+    shard_size: int = 65536,
+) -> str:
+    """
+    Rasterize one class into uint8 shards of flattened images, unless an up to
+    date cache exists. Caches are keyed by the raster parameters and the source
+    file's size and modification time, so changing either rebuilds the cache
+    and removes the stale one
+
+    :param source_path: path of the class's `.ndjson` stroke file
+    :param cache_dir: directory which holds the class's caches
+    :param side: side length of rasterized images
+    :param line_diameter: stroke width as a fraction of the original drawing size
+    :param padding: padding as a fraction of the original drawing size
+    :param use_unrecognized: True if unrecognized drawings should be included
+    :param shard_size: maximum number of images per shard
+    :return: directory of the up to date cache
+    """
+    source_stat = os.stat(source_path)
+    cache_key = _get_cache_key({
+        "side": side,
+        "line_diameter": line_diameter,
+        "padding": padding,
+        "use_unrecognized": use_unrecognized,
+        "source_size": source_stat.st_size,
+        "source_mtime_ns": source_stat.st_mtime_ns,
+    })
+    key_dir = os.path.join(cache_dir, cache_key)
+    if os.path.exists(os.path.join(key_dir, INDEX_FILE_NAME)):
+        return key_dir
+
+    # remove stale caches of this class
+    if os.path.isdir(cache_dir):
+        for file_name in os.listdir(cache_dir):
+            stale_dir = os.path.join(cache_dir, file_name)
+            if os.path.exists(os.path.join(stale_dir, INDEX_FILE_NAME)):
+                shutil.rmtree(stale_dir)
+
+    # cairo is only needed to build missing caches
+    from competitive_drawing.train_v2.dataset.VecToRaster import VecToRaster
+
+    # rasterize into a temporary directory, then move into place
+    print(f"rasterizing {source_path} into {key_dir}...")
+    temp_dir = f"{key_dir}.tmp{os.getpid()}"
+    os.makedirs(temp_dir, exist_ok=True)
+
+    vec_to_raster = VecToRaster(side, line_diameter, padding, min_scale=1.0, max_scale=1.0)
+    vector_images = load_vectors_from_file(source_path, use_unrecognized=use_unrecognized)
+    shard_lengths = []
+    for shard_start in range(0, len(vector_images), shard_size):
+        shard_vectors = vector_images[shard_start: shard_start + shard_size]
+        shard = numpy.empty((len(shard_vectors), side * side), dtype=numpy.uint8)
+        for index, vector_image in enumerate(shard_vectors):
+            image, _partial_frac = vec_to_raster(vector_image, augment=False)
+            shard[index] = (image * 255).round().to(torch.uint8).flatten().numpy()
+
+        numpy.save(os.path.join(temp_dir, _get_shard_name(len(shard_lengths))), shard)
+        shard_lengths.append(len(shard_vectors))
+
+    with open(os.path.join(temp_dir, INDEX_FILE_NAME), "w") as index_file:
+        json.dump({"source_path": source_path, "shard_lengths": shard_lengths}, index_file)
+
+    os.replace(temp_dir, key_dir)
+
+    return key_dir
+
+
+def _get_cache_key(parameters: dict) -> str:
+    parameters_json = json.dumps(parameters, sort_keys=True)
+    return hashlib.blake2b(parameters_json.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _get_shard_name(shard_index: int) -> str:
+    return f"shard_{shard_index:05d}.npy"
@@ -6,7 +6,8 @@ import wandb
 
 from sklearn.model_selection import train_test_split
 
-from competitive_drawing.train_v2.dataset.dataset import QuickDrawDataset, load_data
+from competitive_drawing.train_v2.dataset.dataset import QuickDrawDataset, load_data, make_data_loader
+from competitive_drawing.train_v2.dataset.raster_cache import load_raster_data
 from competitive_drawing.train_v2.modeling.classifier import Classifier
 from competitive_drawing.train_v2.train.utils import accuracy_score
 from competitive_drawing.train_v2.utils import collect_func_args
@@ -25,6 +26,7 @@ def train_model(
     data_dir: str,
     use_unrecognized: bool = False,
     image_size: int = 64,
+    raster_cache_dir: Optional[str] = None,
     # data argumentations
     min_scale: float = 0.5,
     max_scale: float = 1.0,
@@ -35,6 +37,8 @@ def train_model(
     batch_size: int = 128,
     test_batch_size: int = 128,
     test_size: float = 0.2,
+    num_workers: int = 4,
+    prefetch_factor: int = 2,
     lr: float = 0.01,
     optimizer: str = "Adam",
     momentum: float = 0.9,
@@ -62,8 +66,12 @@ def train_model(
     )
     print(wandb.config)
 
-    # load data
-    images, labels = load_data(data_dir, class_names, use_unrecognized=use_unrecognized)
+    # load data, either as vectors or as images rasterized ahead of time
+    if raster_cache_dir is not None:
+        images, labels = load_raster_data(data_dir, class_names, raster_cache_dir,
+                                          side=image_size, use_unrecognized=use_unrecognized)
+    else:
+        images, labels = load_data(data_dir, class_names, use_unrecognized=use_unrecognized)
 
     # create datasets
     x_train, x_test, y_train, y_test = train_test_split(
@@ -75,10 +83,10 @@ def train_model(
     augmentations = dict(side=image_size, min_scale=min_scale, max_scale=max_scale)
     train_dataset = QuickDrawDataset(x_train, y_train, **augmentations, augment=True)
     test_dataset = QuickDrawDataset(x_test, y_test, **augmentations, augment=False)
-    train_loader = torch.utils.data.DataLoader(train_dataset, batch_size=batch_size,
-                                               shuffle=True, num_workers=0, drop_last=True)
-    test_loader = torch.utils.data.DataLoader(test_dataset, batch_size=test_batch_size,
-                                              shuffle=True, num_workers=0, drop_last=True)
+    train_loader = make_data_loader(train_dataset, batch_size, num_workers=num_workers,
+                                    prefetch_factor=prefetch_factor)
+    test_loader = make_data_loader(test_dataset, test_batch_size, num_workers=num_workers,
+                                   prefetch_factor=prefetch_factor)
 
     # set up model, optimizer, and criterion
     with DEVICE:
@@ -102,6 +110,7 @@ def train_model(
         for i, (images, labels) in enumerate(train_loader):
             images = images.to(device=DEVICE, dtype=dtype)
             labels = labels.to(device=DEVICE, dtype=dtype)
+            images = train_dataset.augment_batch(images)
 
             # zero the parameter gradients
             optimizer.zero_grad()
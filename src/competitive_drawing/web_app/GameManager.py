@@ -1,36 +1,52 @@
-from typing import List, Tuple, Union, Optional
+from typing import Dict, List, Tuple, Union, Optional
 
-import random
-from collections import defaultdict
-
-from .game import GameType, Game, Player, create_game
-from .model_service import server_update
+from .game import GameType, Game, Player, CanvasFormat, Stroke, create_game
+from .ScalingUpdater import ScalingUpdater
+from .state import GameStateBackend, ShardRouter, create_game_state_backend, create_shard_router
+from competitive_drawing import SETTINGS
 
 
 class GameManager:
     """
     Handles the creation and deletion of games as well as the assignment
     of players to games
+
+    Several web app processes may share the load as shards. Each game is held
+    in memory by the shard which owns its room, while room ownership, rooms
+    waiting for players, and socket session mappings are shared through the
+    game state backend
+
+    :param state_backend: game state shared between shards, defaults to the
+        configured backend
+    :param shard_router: maps rooms to shards, defaults to the configured shards
     """
-    games: List[Game]
+    # games owned by this shard
+    game_by_room_id: Dict[str, Game]
 
-    # game indices
-    game_by_room_id: defaultdict[str, Union[Game, None]]
-    games_by_gametype: defaultdict[GameType, List[Game]]
-    games_by_label_pair_str: defaultdict[str, List[Game]]
 
-    # player indices
-    player_game_by_sid: defaultdict[str, Union[Tuple[Player, Game], Tuple[None, None]]]
+    def __init__(
+        self,
+        state_backend: Optional[GameStateBackend] = None,
+        shard_router: Optional[ShardRouter] = None,
+    ):
+        self.state_backend = (
+            state_backend if state_backend is not None
+            else create_game_state_backend(SETTINGS.game_state_backend)
+        )
+        self.shard_router = shard_router if shard_router is not None else create_shard_router()
 
+        self.game_by_room_id = {}
 
-    def __init__(self):
-        self.games = []
+        # communicates games information to model service, started by the
+        # server entrypoint or by the first game
+        self.scaling_updater = ScalingUpdater()
 
-        self.game_by_room_id = defaultdict(lambda: None)
-        self.games_by_gametype = defaultdict(lambda: [])
-        self.games_by_label_pair_str = defaultdict(lambda: [])
 
-        self.player_game_by_sid = defaultdict(lambda: (None, None))
+    def close(self):
+        """
+        Stop background work, such as updates sent to the model service
+        """
+        self.scaling_updater.close()
 
 
     def assign_game_room(self, game_type: GameType, *game_args, **game_kwargs) -> str:
@@ -42,23 +58,24 @@ class GameManager:
         :param game_kwargs: keyword arguments used to initialize new game if necessary
         :return: assigned room id
         """
-        available_game_room_ids = [
-            game.room_id
-            for game in self.games_by_gametype[game_type]
-            if not game.started
-        ]
+        # if there are rooms needing players on any shard, add to room
+        open_room_id = self.state_backend.get_random_open_room(game_type)
+        if open_room_id is not None:
+            return open_room_id
 
-        # if there are rooms needing players, add to room
-        if len(available_game_room_ids) > 0:
-            random.shuffle(available_game_room_ids)
-            return available_game_room_ids[0]
-
-        # otherwise create a new game and room
+        # otherwise create a new game and room owned by this shard
+        game_kwargs.setdefault("room_id", self.shard_router.new_room_id())
         new_game = self._new_game(game_type, *game_args, **game_kwargs)
         return new_game.room_id
 
     
-    def join_game(self, room_id: str, player_sid: str, player_id_cache: Union[str, None]):
+    def join_game(
+        self,
+        room_id: str,
+        player_sid: str,
+        player_id_cache: Union[str, None],
+        canvas_format: CanvasFormat = CanvasFormat.SERIAL
+    ):
         """
         Called when a player joins a game. Assigns player to game and starts game
         if applicable
@@ -66,19 +83,21 @@ class GameManager:
         :param room_id: room id being joined
         :param player_sid: socket session id
         :param player_id_cache: player id stored in client storage
+        :param canvas_format: canvas encoding supported by the player's client
         """
-        game = self.game_by_room_id[room_id]
+        game = self._get_local_game(room_id)
         if game is None:
-            print(f"WARNING: Could not find game associated with room id {room_id}")
             return
         
         if not game.started:
             # add player
             new_player = game.add_player(player_sid)
-            self.player_game_by_sid[player_sid] = (new_player, game)
+            new_player.canvas_format = canvas_format
+            self.state_backend.set_sid(player_sid, room_id, new_player.id)
 
             # start game
             if game.can_start_game:
+                self.state_backend.close_room(room_id)
                 game.start_game()
 
         else:
@@ -97,17 +116,46 @@ class GameManager:
                 return
 
             # assume a disconnect: game is resumed
-            game.reassign_player_sid(player_id_cache, player_sid)
+            player = game.reassign_player_sid(player_id_cache, player_sid, canvas_format)
+            self.state_backend.set_sid(player_sid, room_id, player.id)
+
+
+    def pop_player_game_by_sid(self, sid: str) -> Union[Tuple[Player, Game], Tuple[None, None]]:
+        """
+        Remove a socket session's association with its player, for example
+        after the socket disconnects
+
+        :param sid: socket session id
+        :return: player and game associated with the socket session, or None
+            and None if the session has no player in a game owned by this shard
+        """
+        room_and_player_ids = self.state_backend.get_sid(sid)
+        if room_and_player_ids is None:
+            return None, None
+
+        self.state_backend.delete_sid(sid)
+        room_id, player_id = room_and_player_ids
+
+        game = self._get_local_game(room_id)
+        if game is None:
+            return None, None
+
+        players = [player for player in game.players if player.id == player_id]
+        if len(players) != 1:
+            return None, None
+
+        return players[0], game
 
 
     def end_turn(
         self,
         room_id: str,
         player_id_cache: Union[str, None],
-        canvas_data_url: Union[str, None],
-        canvas_preview_data_url: Union[str, None]
+        canvas_data_url: Union[str, bytes, None],
+        canvas_preview_data_url: Union[str, bytes, None],
+        strokes: Optional[List[Stroke]] = None
     ):
-        game = self.game_by_room_id[room_id]
+        game = self._get_local_game(room_id)
 
         if game is None:
             raise ValueError(
@@ -120,10 +168,10 @@ class GameManager:
                 "turn"
             )
         
-        if canvas_data_url is None:
+        if canvas_data_url is None and strokes is None:
             raise ValueError(
                 f"WARNING: Player with id {player_id_cache} tried to end turn "
-                "without an image"
+                "without an image or strokes"
             )
         
         if canvas_preview_data_url is None:
@@ -140,7 +188,7 @@ class GameManager:
         
         # save image
         # TODO: image for future data mining
-        game.next_turn(canvas_data_url, canvas_preview_data_url)
+        game.next_turn(canvas_data_url, canvas_preview_data_url, strokes)
 
         if game.can_end_game:
             self.end_game(game, canvas_preview_data_url)
@@ -152,8 +200,22 @@ class GameManager:
         canvas_preview_data_url: Optional[str] = None,
         force_loser: Optional[Player] = None
     ):
-        game.end_game(canvas_preview_data_url, force_loser)
-        self._del_game(game)
+        """
+        End a game and delete it once its winner has been announced
+
+        :param game: game to end
+        :param canvas_preview_data_url: final preview image used to decide the
+            winner
+        :param force_loser: player who loses regardless of model outputs
+        """
+        inference = game.end_game(canvas_preview_data_url, force_loser)
+        if inference is None:
+            self._del_game(game)
+            return
+
+        # called after the game announces the winner, or immediately if the
+        # inference has already finished
+        inference.add_done_callback(lambda _inference: self._del_game(game))
 
 
     def _new_game(self, game_type: GameType, *game_args, **game_kwargs) -> Game:
@@ -169,47 +231,59 @@ class GameManager:
         new_game = create_game(game_type, *game_args, **game_kwargs)
 
         # update indexes
-        self.games.append(new_game)
         self.game_by_room_id[new_game.room_id] = new_game
-        self.games_by_gametype[new_game.game_type].append(new_game)
-        self.games_by_label_pair_str[new_game.label_pair_str].append(new_game)
+        self.state_backend.add_room(
+            new_game.room_id, new_game.game_type, self.shard_router.local_shard_id
+        )
 
         # communicate games information to model service
-        self._update_model_service()
+        self.scaling_updater.record(new_game.label_pair_str, 1)
 
         return new_game
     
 
     def _del_game(self, game: Game):
         """
-        Delete a game instance after the game is finished
+        Delete a game instance after the game is finished. Games which have
+        already been deleted are ignored
 
         :param game: game to be deleted
         """
         # update indexes
-        self.games.remove(game)
+        if self.game_by_room_id.get(game.room_id) is not game:
+            return
+
         del self.game_by_room_id[game.room_id]
-        self.games_by_gametype[game.game_type].remove(game)
-        self.games_by_label_pair_str[game.label_pair_str].remove(game)
+        self.state_backend.delete_room(game.room_id)
 
         for player in game.players:
             if player.sid is not None:
-                del self.player_game_by_sid[player.sid]
+                self.state_backend.delete_sid(player.sid)
 
         # communicate games information to model service
-        self._update_model_service()
+        self.scaling_updater.record(game.label_pair_str, -1)
 
         del game  # redundancy
-        
 
-    def _update_model_service(self):
+
+    def _get_local_game(self, room_id: str) -> Union[Game, None]:
         """
-        Communicate information about the number of active games and label pairs
-        so model service can make scaling decisions
+        :param room_id: room id
+        :return: game owned by this shard, or None if this shard does not own
+            the room
         """
-        num_games_by_label_pair_str = {
-            label_pair_str: len(self.games_by_label_pair_str[label_pair_str])
-            for label_pair_str in self.games_by_label_pair_str
-        }
+        game = self.game_by_room_id.get(room_id)
+        if game is not None:
+            return game
+
+        shard_id = self.state_backend.get_room_shard(room_id)
+        if shard_id is not None:
+            print(
+                f"WARNING: Room {room_id} is owned by shard {shard_id}, not "
+                f"{self.shard_router.local_shard_id}. Requests for a room must be "
+                "routed to its shard"
+            )
+        else:
+            print(f"WARNING: Could not find game associated with room id {room_id}")
 
-        server_update(num_games_by_label_pair_str)
+        return None
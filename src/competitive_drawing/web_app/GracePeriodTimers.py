@@ -0,0 +1,69 @@
+from typing import Callable, Dict
+
+import itertools
+import threading
+from flask_socketio import SocketIO
+
+from competitive_drawing import SETTINGS
+
+
+class GracePeriodTimers:
+    """
+    Runs callbacks after a grace period unless they are cancelled first. Timers
+    run as socket server background tasks, so waiting does not occupy a worker
+    in any async mode
+
+    :param socketio: socket server which runs timers
+    :param grace_period: number of seconds before a callback runs
+    """
+    def __init__(
+        self,
+        socketio: SocketIO,
+        grace_period: float = SETTINGS.client_disconnect_grace_period,
+    ):
+        self.socketio = socketio
+        self.grace_period = grace_period
+
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, int] = {}  # maps keys to their latest timer
+        self._next_token = itertools.count()
+
+
+    def schedule(self, key: str, callback: Callable[[], None]):
+        """
+        Schedule a callback. Replaces any timer already scheduled for `key`
+
+        :param key: identifies the timer for cancellation
+        :param callback: function called once the grace period ends
+        """
+        with self._lock:
+            token = next(self._next_token)
+            self._tokens[key] = token
+
+        self.socketio.start_background_task(self._run, key, token, callback)
+
+
+    def cancel(self, key: str) -> bool:
+        """
+        Cancel the timer scheduled for `key`
+
+        :param key: identifies the timer
+        :return: True if a timer was cancelled
+        """
+        with self._lock:
+            return self._tokens.pop(key, None) is not None
+
+
+    def _run(self, key: str, token: int, callback: Callable[[], None]):
+        self.socketio.sleep(self.grace_period)
+
+        with self._lock:
+            if self._tokens.get(key) != token:
+                return  # cancelled or replaced
+
+            del self._tokens[key]
+
+        try:
+            callback()
+        except Exception as exception:
+            print(f"WARNING: Grace period callback for {key} failed: {exception}")
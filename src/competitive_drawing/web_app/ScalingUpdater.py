@@ -0,0 +1,165 @@
+from typing import Dict, Optional
+
+import time
+import threading
+from collections import defaultdict
+
+from competitive_drawing import SETTINGS
+from .model_service import server_update, server_update_deltas
+
+
+class ScalingUpdater:
+    """
+    Sends game counts to the model service from a background thread so that
+    creating and deleting games never waits on the model service. Changes are
+    coalesced into per label pair deltas which are sent at most once every
+    `period` seconds. A full snapshot is sent instead of deltas when the
+    updater first connects, after a failed update, and whenever the model
+    service reports a new instance id (it restarted and lost its counts)
+
+    The background thread is started by `start`, or lazily by the first
+    `record`, so that importing the web app does not contact the model service
+
+    :param period: minimum number of seconds between updates
+    :param retry_period: number of seconds to wait after a failed update
+    """
+    def __init__(
+        self,
+        period: float = SETTINGS.scaling_update_period,
+        retry_period: float = SETTINGS.scaling_update_retry_period,
+    ):
+        self.period = period
+        self.retry_period = retry_period
+
+        self._lock = threading.Lock()
+        self._num_games: defaultdict[str, int] = defaultdict(lambda: 0)
+        self._pending_deltas: defaultdict[str, int] = defaultdict(lambda: 0)
+        self._needs_snapshot = True
+        self._instance_id: Optional[str] = None
+
+        self._wake = threading.Event()
+        self._wake.set()  # send initial snapshot
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+
+    def start(self):
+        """
+        Start sending updates in the background. Does nothing if the updater
+        has already been started or closed
+        """
+        with self._lock:
+            if self._thread is not None or self._closed.is_set():
+                return
+
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+
+    def record(self, label_pair_str: str, delta: int):
+        """
+        Record a change in the number of games for a label pair. Returns
+        immediately, the change is sent with the next update
+
+        :param label_pair_str: label pair whose number of games changed
+        :param delta: change in number of games
+        """
+        with self._lock:
+            self._num_games[label_pair_str] += delta
+            self._pending_deltas[label_pair_str] += delta
+
+        self.start()
+        self._wake.set()
+
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Stop sending updates and wait for the background thread to exit
+
+        :param timeout: maximum number of seconds to wait for the thread
+        """
+        with self._lock:
+            self._closed.set()
+            thread = self._thread
+
+        self._wake.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+
+    def _run(self):
+        while not self._closed.is_set():
+            self._wake.wait()
+            if self._closed.is_set():
+                return
+
+            # changes which arrive while sending are picked up next period
+            self._wake.clear()
+            succeeded = self._send_update()
+
+            self._closed.wait(self.period if succeeded else self.retry_period)
+            if not succeeded:
+                self._wake.set()
+
+
+    def _send_update(self) -> bool:
+        """
+        Send either pending deltas or a full snapshot to the model service
+
+        :return: True if the update succeeded
+        """
+        with self._lock:
+            needs_snapshot = self._needs_snapshot
+            snapshot = dict(self._num_games)
+            deltas = {
+                label_pair_str: delta
+                for label_pair_str, delta in self._pending_deltas.items()
+                if delta != 0
+            }
+            self._pending_deltas.clear()
+
+        try:
+            if needs_snapshot:
+                instance_id = server_update(snapshot)
+            elif len(deltas) > 0:
+                instance_id = server_update_deltas(deltas)
+            else:
+                return True
+
+        except Exception as exception:
+            print(f"WARNING: Failed to send scaling update: {exception}")
+
+            # snapshot sent once the model service is reachable includes deltas
+            with self._lock:
+                self._needs_snapshot = True
+
+            return False
+
+        with self._lock:
+            restarted = self._instance_id is not None and instance_id != self._instance_id
+            self._instance_id = instance_id
+            if not needs_snapshot and restarted:
+                self._needs_snapshot = True
+                self._wake.set()
+            elif needs_snapshot:
+                self._needs_snapshot = False
+
+        return True
+
+
+if __name__ == "__main__":
+    # coalesce bursts of game changes into a few updates (model service not required)
+    import competitive_drawing.web_app.ScalingUpdater as module
+
+    sent_updates = []
+    module.server_update = lambda snapshot: sent_updates.append(("snapshot", snapshot)) or "a"
+    module.server_update_deltas = lambda deltas: sent_updates.append(("deltas", deltas)) or "a"
+
+    updater = module.ScalingUpdater(period=0.1)
+    for index in range(1000):
+        label_pair_str = ["cat-dog", "apple-bear"][index % 2]
+        updater.record(label_pair_str, 1)
+
+    time.sleep(0.5)
+    for update in sent_updates:
+        print(update)
@@ -1 +1,12 @@
+from competitive_drawing import SETTINGS
+
+# green thread modes must patch blocking libraries before they are imported
+if SETTINGS.web_app_async_mode == "eventlet":
+    import eventlet
+    eventlet.monkey_patch()
+
+elif SETTINGS.web_app_async_mode == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
 from .app import app, socketio
@@ -10,16 +10,25 @@ from .routes import make_routes_blueprint
 from .sockets import make_socket_callbacks
 from .GameManager import GameManager
 from competitive_drawing import SETTINGS
+from competitive_drawing.model_store import get_label_pair_index
 
 
 def create_app():
     # create and configure the app
     app = Flask(__name__, instance_relative_config=True)
     app.config["SECRET_KEY"] = SETTINGS.web_app_secret_key
-    socketio = SocketIO(app)
+    socketio = SocketIO(
+        app,
+        async_mode=SETTINGS.web_app_async_mode,
+        message_queue=SETTINGS.socketio_message_queue,
+    )
+
+    # begin indexing available label pairs in the background
+    get_label_pair_index()
 
     # set up games manager
     games_manager = GameManager()
+    app.extensions["games_manager"] = games_manager
 
     # create instance folder
     os.makedirs(app.instance_path, exist_ok=True)
@@ -39,6 +48,9 @@ app, socketio = create_app()
 
 
 def start_app():
+    # report games to the model service from startup rather than the first game
+    app.extensions["games_manager"].scaling_updater.start()
+
     socketio.run(
         app,
         host=SETTINGS.web_app_host,
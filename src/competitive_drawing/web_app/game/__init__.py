@@ -1,7 +1,8 @@
 from .models.game_type import GameType
 from .models.player import Player
+from .models.canvas_format import CanvasFormat
 
-from .base import Game
+from .base import Game, Stroke
 from .free_play import FreePlayGame
 from .local import LocalGame
 from .online import OnlineGame
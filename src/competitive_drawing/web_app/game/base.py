@@ -1,16 +1,24 @@
-from typing import List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 from abc import ABC, abstractclassmethod
 
 import uuid
+import io
 import random
 import numpy
-from PIL import Image
+from PIL import Image, ImageDraw
+from concurrent.futures import Future
 
 from competitive_drawing import SETTINGS
-from ..game import GameType, Player
-from ..utils import get_available_label_pairs, get_onnx_url, label_pair_to_str, data_url_to_image
+from ..game import GameType, Player, CanvasFormat
+from ..utils import (
+    get_available_label_pairs, get_onnx_url, label_pair_to_str, image_data_to_bytes,
+    image_data_to_data_url
+)
 from ..sockets import emit_start_game, emit_start_turn, emit_assign_player, emit_end_game
-from ..model_service import server_infer
+from ..model_service import server_infer_async
+
+
+Stroke = List[Tuple[float, float]]  # polyline of (x, y) canvas pixel positions
 
 
 class Game(ABC):
@@ -20,7 +28,11 @@ class Game(ABC):
     room_id: str
 
     # game state
-    canvas_image: Image  # used for resuming after a disconnect
+    _canvas_image: Image  # used for resuming after a disconnect
+    _canvas_payloads: Dict[CanvasFormat, Union[List[List[int]], bytes]]  # encoded canvas cache
+    stroke_log: List[List[Stroke]]  # strokes drawn in each turn, rendered onto canvas image
+    new_strokes: Optional[List[Stroke]]  # latest turn's strokes, None if canvas was replaced
+    _stroke_log_complete: bool  # False once the canvas is replaced by a client image
     players: List[Player]
     started: bool
     _player_turn_index: int
@@ -39,6 +51,9 @@ class Game(ABC):
 
         # game state
         self.canvas_image = _new_canvas_image()
+        self.stroke_log = []
+        self.new_strokes = None
+        self._stroke_log_complete = True
         self.players = []
         self._player_turn_index = 0
         self.started = False
@@ -47,6 +62,17 @@ class Game(ABC):
         self.model_outputs = [0.0, 0.0]  # fake score to make the game seem even at the beginning
 
 
+    @property
+    def canvas_image(self) -> Image:
+        return self._canvas_image
+
+
+    @canvas_image.setter
+    def canvas_image(self, canvas_image: Image):
+        self._canvas_image = canvas_image
+        self._canvas_payloads = {}
+
+
     @property
     def turn(self) -> Player:
         return self.players[self._player_turn_index]
@@ -85,21 +111,132 @@ class Game(ABC):
         return new_player
 
 
-    def next_turn(self, canvas_data_url: str, preview_data_url: str):
-        self.canvas_image = data_url_to_image(canvas_data_url)
+    def next_turn(
+        self,
+        canvas_data_url: Optional[str],
+        preview_data_url: str,
+        strokes: Optional[List[Stroke]] = None
+    ) -> Future:
+        """
+        Advance to the next turn. Inference runs asynchronously and the next turn
+        is started once model outputs are available
+
+        :param canvas_data_url: data url or png bytes of canvas image. Only used
+            if `strokes` is not provided
+        :param preview_data_url: data url or png bytes of preview image used for
+            inference
+        :param strokes: strokes drawn this turn, replaces `canvas_data_url`
+        :return: future which resolves to model outputs
+        """
+        if strokes is not None:
+            self.add_strokes(strokes)
+        else:
+            # canvas was replaced, clients must receive the full canvas
+            canvas_png = image_data_to_bytes(canvas_data_url)
+            self.canvas_image = Image.open(io.BytesIO(canvas_png))
+            self._canvas_payloads[CanvasFormat.PNG] = canvas_png  # forward without reencoding
+            self.new_strokes = None
+            self._stroke_log_complete = False
+
         self._player_turn_index = (self._player_turn_index + 1) % len(self.players)
         self.turns_left -= 1
 
-        self.model_outputs = server_infer(self.room_id, self.label_pair, preview_data_url)
+        inference = server_infer_async(
+            self.room_id, self.label_pair, *self._get_inference_inputs(preview_data_url)
+        )
+        inference.add_done_callback(self._on_turn_inference)
+
+        return inference
+
+
+    def _on_turn_inference(self, inference: Future):
+        if inference.exception() is not None:
+            # start the turn anyway with the previous outputs so the game continues
+            print(f"WARNING: Inference failed for room {self.room_id}: {inference.exception()}")
+        else:
+            self.model_outputs = inference.result()
 
         if not self.can_end_game:
-            emit_start_turn(self)        
+            emit_start_turn(self)
+
+
+    def add_strokes(self, strokes: List[Stroke]):
+        """
+        Append strokes to the stroke log and draw them onto the cached canvas
+        image. Only the new strokes are rasterized
+
+        :param strokes: polylines of (x, y) canvas pixel positions
+        """
+        strokes = _validate_strokes(strokes)
+
+        if self.canvas_image.mode not in ("RGB", "RGBA"):
+            self.canvas_image = self.canvas_image.convert("RGB")
+
+        _draw_strokes(self.canvas_image, strokes)
+        self._canvas_payloads = {}
+
+        self.stroke_log.append(strokes)
+        self.new_strokes = strokes
+
+
+    def _get_inference_inputs(
+        self,
+        preview_data_url: Union[str, bytes, None]
+    ) -> Tuple[Optional[str], Optional[List[Stroke]]]:
+        """
+        Strokes are sent to the model service for rasterization whenever the
+        stroke log describes the whole canvas. The client's preview image is
+        always sent, model services which cannot rasterize strokes classify it
+        instead
+
+        :param preview_data_url: data url or png bytes of preview image
+        :return: preview data url and strokes, which are None if the canvas
+            was replaced by a client image
+        """
+        preview_data_url = image_data_to_data_url(preview_data_url)
+        if self._stroke_log_complete:
+            strokes = [stroke for turn_strokes in self.stroke_log for stroke in turn_strokes]
+            return preview_data_url, strokes
+
+        return preview_data_url, None
 
 
     def canvas_image_to_serial(self) -> List[List[int]]:
         return numpy.array(self.canvas_image).tolist()
 
 
+    def canvas_image_to_payload(self, canvas_format: CanvasFormat) -> Union[List[List[int]], bytes]:
+        """
+        Encode the canvas image in the given format. Encodings are cached until
+        the canvas image changes
+
+        :param canvas_format: format requested by the receiving client
+        :return: nested pixel lists for serial format, otherwise bytes
+        """
+        if canvas_format not in self._canvas_payloads:
+            match canvas_format:
+                case CanvasFormat.SERIAL:
+                    payload = self.canvas_image_to_serial()
+
+                case CanvasFormat.RGBA:
+                    payload = numpy.asarray(self.canvas_image.convert("RGBA")).tobytes()
+
+                case CanvasFormat.PNG:
+                    payload_io = io.BytesIO()
+                    self.canvas_image.save(payload_io, format="PNG")
+                    payload = payload_io.getvalue()
+
+                case CanvasFormat.STROKES:
+                    return self.canvas_image_to_payload(CanvasFormat.PNG)  # snapshot
+
+                case _:
+                    raise ValueError(f"Unknown canvas format {canvas_format}")
+
+            self._canvas_payloads[canvas_format] = payload
+
+        return self._canvas_payloads[canvas_format]
+
+
     def has_player(self, player_id: Union[str, None]) -> bool:
         player_ids = [player.id for player in self.players]
         return player_id is not None and player_id in player_ids
@@ -120,32 +257,62 @@ class Game(ABC):
         ]
 
 
-    def reassign_player_sid(self, player_id: str, new_sid: str):
+    def reassign_player_sid(
+        self,
+        player_id: str,
+        new_sid: str,
+        canvas_format: Optional[CanvasFormat] = None
+    ) -> Player:
         found_players = [player for player in self.players if player.id == player_id]
         if len(found_players) != 1:
             raise ValueError()  # TODO
         
         found_player = found_players[0]
         found_player.sid = new_sid
+        if canvas_format is not None:
+            found_player.canvas_format = canvas_format
 
         emit_start_game(self, new_sid)
         emit_assign_player(found_player.id, new_sid)
-        emit_start_turn(self)
+        emit_start_turn(self, send_strokes=False)  # resuming clients need a snapshot
+
+        return found_player
     
 
-    def end_game(self, preview_data_url: str, force_loser: Player):
+    def end_game(self, preview_data_url: str, force_loser: Player) -> Optional[Future]:
+        """
+        End the game and announce the winner. Unless a player is forced to lose,
+        the winner is determined by a final inference which runs asynchronously
+
+        :param preview_data_url: data url or png bytes of final preview image
+        :param force_loser: player who loses regardless of model outputs
+        :return: future which resolves to model outputs if inference is used
+        """
         if force_loser is not None:
             winner = self._get_other_player(force_loser)
             emit_end_game(self, winner.target)
+            return None
             
+        # do another inference for redundancy
+        inference = server_infer_async(
+            self.room_id, self.label_pair, *self._get_inference_inputs(preview_data_url)
+        )
+        inference.add_done_callback(self._on_end_game_inference)
+
+        return inference
+
+
+    def _on_end_game_inference(self, inference: Future):
+        if inference.exception() is not None:
+            # decide the winner with the latest outputs
+            print(f"WARNING: Inference failed for room {self.room_id}: {inference.exception()}")
         else:
-            # do another inference for redundancy
-            self.model_outputs = server_infer(self.room_id, self.label_pair, preview_data_url)
+            self.model_outputs = inference.result()
 
-            # emit winner
-            winner_index = numpy.argmax(self.model_outputs)
-            winner_target = self.label_pair[winner_index]
-            emit_end_game(self, winner_target)
+        # emit winner
+        winner_index = numpy.argmax(self.model_outputs)
+        winner_target = self.label_pair[winner_index]
+        emit_end_game(self, winner_target)
 
 
     def _get_other_player(self, player: Player) -> Player:
@@ -167,7 +334,41 @@ def _new_canvas_image() -> Image:
     return Image.new("RGB", canvas_shape, (255, 255, 255))
 
 
+def _validate_strokes(strokes: List[Stroke]) -> List[Stroke]:
+    try:
+        return [
+            [(float(x), float(y)) for x, y in stroke]
+            for stroke in strokes
+        ]
+    except (TypeError, ValueError) as exception:
+        raise ValueError(f"Invalid strokes: {exception}")
+
+
+def _draw_strokes(image: Image, strokes: List[Stroke]):
+    """
+    Draw strokes onto an image in place with round caps and joints, matching the
+    clients' canvas line style
+
+    :param image: canvas image
+    :param strokes: polylines of (x, y) canvas pixel positions
+    """
+    draw = ImageDraw.Draw(image)
+    line_width = max(round(SETTINGS.canvas_line_width), 1)
+    radius = SETTINGS.canvas_line_width / 2
+
+    for stroke in strokes:
+        if len(stroke) < 2:
+            continue  # clients do not draw strokes without movement
+
+        draw.line(stroke, fill="black", width=line_width, joint="curve")
+        for x, y in (stroke[0], stroke[-1]):
+            draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill="black")
+
+
 def _assign_label_pair() -> Tuple[str, str]:
     available_label_pairs = get_available_label_pairs()
+    if len(available_label_pairs) <= 0:
+        raise ValueError("No label pairs are available in the model store, cannot create a game")
+
     random.shuffle(available_label_pairs)
     return available_label_pairs[0]
@@ -0,0 +1,18 @@
+from enum import Enum
+
+
+class CanvasFormat(Enum):
+    """
+    Encoding of canvas images sent to clients. Clients choose a format when
+    joining a room, clients which do not are sent the serial format
+
+    SERIAL: nested lists of pixel values
+    RGBA: raw uint8 RGBA buffer sent as a binary attachment
+    PNG: png file bytes sent as a binary attachment
+    STROKES: only strokes drawn in the latest turn are sent at the start of a
+        turn, a png snapshot is sent when a game starts or resumes
+    """
+    SERIAL = "serial"
+    RGBA = "rgba"
+    PNG = "png"
+    STROKES = "strokes"
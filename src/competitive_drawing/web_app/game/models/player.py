@@ -2,6 +2,8 @@ from typing import Union
 
 from dataclasses import dataclass
 
+from .canvas_format import CanvasFormat
+
 
 @dataclass
 class Player():
@@ -12,8 +14,10 @@ class Player():
     :param sid: player's socket session id used to track connects and disconnects
     :param target: name of the the player's target drawing class
     :param target_index: index of classifier output which corresponds to target
+    :param canvas_format: encoding of canvas images sent to the player's client
     """
     id: str
     sid: Union[str, None]
     target: str
     target_index: int
+    canvas_format: CanvasFormat = CanvasFormat.SERIAL
@@ -1,10 +1,15 @@
-from typing import Union
+from typing import List, Optional, Union
 
+from functools import partial
+from concurrent.futures import Future
+
+from competitive_drawing import SETTINGS
 from competitive_drawing.web_app.game import GameType
 
-from ..game import Game, Player
-from ..sockets import emit_assign_player
-from ..model_service import server_infer_ai
+from ..game import Game, Player, Stroke
+from ..sockets import emit_assign_player, emit_ai_turn_failed
+from ..model_service import server_infer_ai_async, ModelServiceBusy
+from ..utils import image_data_to_data_url
 
 
 class SinglePlayerGame(Game):
@@ -27,13 +32,64 @@ class SinglePlayerGame(Game):
         return player_one
     
 
-    def next_turn(self, canvas_data_url: str, preview_data_url: str):
-        super().next_turn(canvas_data_url, preview_data_url)
+    def next_turn(
+        self,
+        canvas_data_url: Optional[str],
+        preview_data_url: str,
+        strokes: Optional[List[Stroke]] = None
+    ):
+        inference = super().next_turn(canvas_data_url, preview_data_url, strokes)
 
         if self._player_turn_index == 1: # now AI player's turn
-            server_infer_ai(
-                self.room_id,
-                self.label_pair,
-                preview_data_url,
-                1
+            self._request_ai_stroke(image_data_to_data_url(preview_data_url), self.turns_left, 0)
+
+        return inference
+
+
+    def _request_ai_stroke(self, preview_data_url: str, turns_left: int, num_retries: int):
+        """
+        Request the AI's stroke from the model service. Requests rejected by a
+        busy model service are retried after the delay it asks for
+
+        :param preview_data_url: data url of preview image
+        :param turns_left: number of turns left when the AI's turn started
+        :param num_retries: number of times this request has been retried
+        """
+        request = server_infer_ai_async(
+            self.room_id,
+            self.label_pair,
+            preview_data_url,
+            1
+        )
+        request.add_done_callback(partial(self._on_infer_ai_request, preview_data_url, turns_left, num_retries))
+
+
+    def _on_infer_ai_request(self, preview_data_url: str, turns_left: int, num_retries: int, request: Future):
+        exception = request.exception()
+        if exception is None:
+            return
+
+        if isinstance(exception, ModelServiceBusy) and num_retries < SETTINGS.ai_stroke_max_retries:
+            print(
+                f"WARNING: AI stroke request for room {self.room_id} was rejected, "
+                f"retrying in {exception.retry_after} seconds"
+            )
+            from competitive_drawing.web_app import socketio  # avoid circular import
+            socketio.start_background_task(
+                self._retry_ai_stroke, preview_data_url, turns_left, num_retries + 1, exception.retry_after
             )
+            return
+
+        # the client skips the AI's turn so that the game continues
+        print(f"WARNING: AI stroke request failed for room {self.room_id}: {exception}")
+        emit_ai_turn_failed(self.room_id, "The AI could not find a stroke, its turn is skipped")
+
+
+    def _retry_ai_stroke(self, preview_data_url: str, turns_left: int, num_retries: int, delay: float):
+        from competitive_drawing.web_app import socketio  # avoid circular import
+        socketio.sleep(delay)
+
+        if self.turns_left != turns_left or self._player_turn_index != 1:
+            return  # the AI's turn is already over
+
+        self._request_ai_stroke(preview_data_url, turns_left, num_retries)
@@ -1,36 +1,56 @@
-from typing import Tuple, Dict
+from typing import Dict, List, Optional, Tuple
 
 import json
-import requests
+from concurrent.futures import Future
 
 from competitive_drawing import SETTINGS
+from competitive_drawing.http_client import post, run_async
 from .utils import GAME_CONFIG
 
 
+class ModelServiceBusy(ValueError):
+    """
+    Raised when the model service rejects a request because it is at capacity
+
+    :param retry_after: number of seconds after which the request may be retried
+    """
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 def server_infer(
         room_id: str,
         label_pair: Tuple[str, str],
-        preview_image_data_url: str
+        preview_image_data_url: Optional[str],
+        strokes: Optional[List[List[Tuple[float, float]]]] = None
     ) -> Tuple[float, float]:
     """
     Requence inference from a model service server
 
     :param room_id: unique identifier for game
     :param label_pair: labels which define the model/game
-    :param preview_image_data_url: data url of preview image
+    :param preview_image_data_url: data url of preview image, classified if
+        `strokes` is not provided or cannot be rasterized by the model service
+    :param strokes: every stroke on the canvas, rasterized by the model service
     :return: model outputs
     """
-    response = requests.post(
+    request_data = {
+        "gameConfig": GAME_CONFIG,
+        "label_pair": label_pair,
+    }
+    if preview_image_data_url is not None:
+        request_data["imageDataUrl"] = preview_image_data_url
+    if strokes is not None:
+        request_data["strokes"] = strokes
+
+    response = post(
         f"{SETTINGS.ms_base}/infer",
         headers={
             "Content-Type": "application/json",
             "Room-Id": room_id
         },
-        data=json.dumps({
-            "gameConfig": GAME_CONFIG,
-            "label_pair": label_pair,
-            "imageDataUrl": preview_image_data_url
-        })
+        data=json.dumps(request_data)
     )
 
     if (not response.ok):
@@ -38,11 +58,11 @@ def server_infer(
     
     response_json = response.json()
     if ("modelOutputs" not in response_json):
-        raise ValueError(f"Invalid response body {response.content()}")
+        raise ValueError(f"Invalid response body {response.content}")
     
     model_outputs = response_json["modelOutputs"]
     if (model_outputs is None or len(model_outputs) != 2):
-        raise ValueError(f"Invalid response body {response.content()}")
+        raise ValueError(f"Invalid response body {response.content}")
 
     return tuple(model_outputs)
 
@@ -53,7 +73,17 @@ def server_infer_ai(
     preview_image_data_url: str,
     ai_target_index: int
 ):
-    response = requests.post(
+    """
+    Request that the model service search for the AI's stroke. The stroke is
+    sent back to the web app's `/ai_stroke` route once it is found
+
+    :param room_id: unique identifier for game
+    :param label_pair: labels which define the model/game
+    :param preview_image_data_url: data url of preview image
+    :param ai_target_index: index of the AI's target label
+    :raises ModelServiceBusy: if the model service cannot accept more searches
+    """
+    response = post(
         f"{SETTINGS.ms_base}/infer_stroke",
         headers={
             "Content-Type": "application/json",
@@ -68,18 +98,86 @@ def server_infer_ai(
         }),
     )
 
+    if response.status_code == 503:
+        try:
+            retry_after = float(response.headers.get("Retry-After", 1.0))
+        except ValueError:
+            retry_after = 1.0
+        raise ModelServiceBusy(f"Model service is busy {response}", retry_after)
+
     if (not response.ok):
         raise ValueError(f"Invalid response {response}")
 
 
-def server_update(num_games_by_label_pair_str: Dict[str, int]):
-    response = requests.post(
+def server_update(num_games_by_label_pair_str: Dict[str, int]) -> str:
+    """
+    Send the number of active games for every label pair to the model service
+
+    :param num_games_by_label_pair_str: maps label pair strings to number of
+        active games
+    :return: instance id of the model service
+    """
+    response = post(
         f"{SETTINGS.ms_base}/games",
         headers={"Content-Type": "application/json"},
         data=json.dumps({
-            "label_pair_games": num_games_by_label_pair_str
+            "label_pair_games": num_games_by_label_pair_str,
+            "client_id": SETTINGS.web_app_shard_id,
         }),
     )
 
     if (not response.ok):
         raise ValueError(f"Invalid response {response}")
+
+    return response.json()["instanceId"]
+
+
+def server_update_deltas(deltas_by_label_pair_str: Dict[str, int]) -> str:
+    """
+    Send changes in the number of active games to the model service
+
+    :param deltas_by_label_pair_str: maps label pair strings to the change in
+        number of active games since the last update
+    :return: instance id of the model service
+    """
+    response = post(
+        f"{SETTINGS.ms_base}/games",
+        headers={"Content-Type": "application/json"},
+        data=json.dumps({
+            "label_pair_deltas": deltas_by_label_pair_str,
+            "client_id": SETTINGS.web_app_shard_id,
+        }),
+    )
+
+    if (not response.ok):
+        raise ValueError(f"Invalid response {response}")
+
+    return response.json()["instanceId"]
+
+
+def server_infer_async(
+    room_id: str,
+    label_pair: Tuple[str, str],
+    preview_image_data_url: Optional[str],
+    strokes: Optional[List[List[Tuple[float, float]]]] = None
+) -> Future:
+    """
+    Asynchronous variant of `server_infer` which does not block the caller
+
+    :return: future which resolves to model outputs
+    """
+    return run_async(server_infer, room_id, label_pair, preview_image_data_url, strokes)
+
+
+def server_infer_ai_async(
+    room_id: str,
+    label_pair: Tuple[str, str],
+    preview_image_data_url: str,
+    ai_target_index: int
+) -> Future:
+    """
+    Asynchronous variant of `server_infer_ai` which does not block the caller
+
+    :return: future which resolves once the model service accepts the request
+    """
+    return run_async(server_infer_ai, room_id, label_pair, preview_image_data_url, ai_target_index)
@@ -2,8 +2,8 @@ from flask import Blueprint, render_template, redirect, request, Response
 
 from .game import GameType
 from .GameManager import GameManager
-from .utils import GAME_CONFIG
-from .sockets import emit_ai_stroke
+from .utils import GAME_CONFIG, read_onnx
+from .sockets import emit_ai_stroke, emit_ai_turn_failed
 
 
 def make_routes_blueprint(games_manager: GameManager) -> Blueprint:
@@ -57,6 +57,20 @@ def make_routes_blueprint(games_manager: GameManager) -> Blueprint:
         return render_template("single_player.html", game_config=GAME_CONFIG)
 
 
+    """ Models """
+
+
+    @routes.route("/models/<label_pair_str>/model.onnx", methods=["GET"])
+    def model_onnx(label_pair_str: str):
+        # used when models are served from a local model store
+        try:
+            onnx_data = read_onnx(label_pair_str)
+        except ValueError:
+            return "", 404
+
+        return Response(onnx_data, mimetype="application/octet-stream")
+
+
     """ Receive AI stroke """
 
 
@@ -68,4 +82,17 @@ def make_routes_blueprint(games_manager: GameManager) -> Blueprint:
         return "", 200
 
 
+    @routes.route("/ai_stroke_failed", methods=["POST"])
+    def ai_stroke_failed():
+        """
+        Receives notice that the model service could not search for or send
+        the AI stroke. The client skips the AI's turn so that the game continues
+        """
+        # TODO: assert it's coming from model service
+        print(f"WARNING: AI stroke search failed for room {request.json['roomId']}: {request.json.get('error')}")
+        emit_ai_turn_failed(request.json["roomId"], "The AI could not find a stroke, its turn is skipped")
+
+        return "", 200
+
+
     return routes
@@ -1,61 +1,103 @@
 from typing import Dict, Any, TYPE_CHECKING
 
 from flask import request
-from flask_socketio import join_room, leave_room
+from flask_socketio import join_room, leave_room, ConnectionRefusedError
 
-import time
-
-from competitive_drawing import SETTINGS
+from ..game import CanvasFormat
+from ..GracePeriodTimers import GracePeriodTimers
+from .emit import emit_end_turn_rejected
 if TYPE_CHECKING:
     from ..game import GameManager
 
 
 def make_socket_callbacks(socketio, game_manager: "GameManager"):
+    grace_period_timers = GracePeriodTimers(socketio)
+
+    @socketio.on("connect")
+    def on_connect(auth=None):
+        # sockets are routed to shards by the room id in their connection
+        # query. Rooms owned by other shards cannot be played from this one
+        room_id = request.args.get("roomId")
+        if room_id is not None and not game_manager.shard_router.is_local(room_id):
+            shard_id = game_manager.shard_router.get_shard(room_id)
+            print(f"WARNING: Refused connection for room {room_id} owned by shard {shard_id}")
+            raise ConnectionRefusedError(f"Room {room_id} is owned by shard {shard_id}")
+
+
     @socketio.on("join_room")
     def on_join_room(data: Dict[str, Any]):
         room_id = data["roomId"]
         player_id = data["playerId"]
         sid = request.sid
 
+        # clients which do not request a canvas format receive the serial format
+        try:
+            canvas_format = CanvasFormat(data.get("canvasFormat", CanvasFormat.SERIAL.value))
+        except ValueError:
+            print(f"WARNING: Unknown canvas format {data['canvasFormat']}, using serial format")
+            canvas_format = CanvasFormat.SERIAL
+
+        # a reconnecting player is no longer leaving
+        if player_id is not None and grace_period_timers.cancel(player_id):
+            print(f"Reconnected: {sid}")
+
         # join socket room
         join_room(room_id)
 
         # join game associated with room
-        game_manager.join_game(room_id, sid, player_id)
+        game_manager.join_game(room_id, sid, player_id, canvas_format)
 
 
     @socketio.on("end_turn")
     def end_turn(data: Dict[str, Any]):
         room_id = data["roomId"]
         player_id = data["playerId"]
-        canvas_data_url = data["canvas"]
+        canvas_data_url = data.get("canvas")  # not sent by clients which send strokes
         canvas_preview_data_url = data["preview"]
+        strokes = data.get("strokes")
 
         # may end game if criteria are met
-        game_manager.end_turn(room_id, player_id, canvas_data_url, canvas_preview_data_url)
+        try:
+            game_manager.end_turn(
+                room_id, player_id, canvas_data_url, canvas_preview_data_url, strokes
+            )
+        except ValueError as exception:
+            # clients wait for their own strokes until told otherwise
+            print(exception)
+            emit_end_turn_rejected(
+                request.sid,
+                "Your turn could not be ended, the canvas has been restored",
+                game_manager.game_by_room_id.get(room_id),
+            )
 
 
     @socketio.on("disconnect")
     def disconnect():
-        print(f"Lost connection to: {request.sid}...")
+        sid = request.sid
+        print(f"Lost connection to: {sid}...")
 
-        player, game = game_manager.player_game_by_sid[request.sid]
+        player, game = game_manager.pop_player_game_by_sid(sid)
         if player is None:
-            print(f"WARNING: Could not find player with sid {request.sid}")
+            print(f"WARNING: Could not find player with sid {sid}")
             return
         
-        # check if player reconnects in time
-        # Note: there's a race condition if the client reconnects faster than it
-        # takes the code to get to here. In this case, the client will be met with
-        # a message asking to refresh, at which point it can try again
-        player.sid = None
-        time.sleep(SETTINGS.client_disconnect_grace_period)
-        if player.sid is not None:
-            print(f"Reconnected: {request.sid}")
+        if player.sid != sid:
+            print(f"Reconnected: {sid}")  # rejoined before this event was handled
             return
-        
-        print(f"Disconnected: {request.sid}")
-        
-        # end game
-        if game is not None:
-            game_manager.end_game(game, force_loser=player)
+
+        # end the game unless the player reconnects within the grace period.
+        # Rejoining the room cancels the timer
+        player.sid = None
+
+        def on_grace_period_end():
+            if player.sid is not None:
+                print(f"Reconnected: {sid}")
+                return
+
+            print(f"Disconnected: {sid}")
+
+            # end game
+            if game is not None:
+                game_manager.end_game(game, force_loser=player)
+
+        grace_period_timers.schedule(player.id, on_grace_period_end)
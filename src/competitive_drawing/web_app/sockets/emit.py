@@ -1,6 +1,6 @@
-from typing import TYPE_CHECKING, Optional, List
+from typing import TYPE_CHECKING, Any, Dict, Optional, List
 if TYPE_CHECKING:
-    from ..game import Game
+    from ..game import Game, Stroke
 
 
 def emit_assign_player(player_id: str, sid: str):
@@ -9,25 +9,26 @@ def emit_assign_player(player_id: str, sid: str):
     socketio.emit("assign_player", {"playerId": player_id}, to=sid)
 
 
-def emit_start_turn(game: "Game"):
-    from competitive_drawing.web_app import socketio  # avoid circular import
-
-    socketio.emit("start_turn", {
-        "canvas": game.canvas_image_to_serial(),
+def emit_start_turn(game: "Game", send_strokes: bool = True):
+    """
+    :param game: game whose turn is starting
+    :param send_strokes: send only the latest turn's strokes to clients which
+        use the strokes format. Should be False if clients may have already
+        drawn them
+    """
+    _emit_with_canvas("start_turn", {
+        "canvas": None,
         "turn": game.turn.id,
         "target": game.turn.target,
         "turnsLeft": game.turns_left,
         "modelOutputs": game.model_outputs
-    }, to=game.room_id)
+    }, game, strokes=game.new_strokes if send_strokes else None)
 
 
 def emit_start_game(game: "Game", sid: Optional[str] = None):
-    from competitive_drawing.web_app import socketio  # avoid circular import
-
-    destination = sid if sid is not None else game.room_id
-    socketio.emit("start_game", {
+    _emit_with_canvas("start_game", {
         "onnxUrl": game.onnx_url,
-        "canvas": game.canvas_image_to_serial(),
+        "canvas": None,
         "targets": {
             player.id: player.target
             for player in game.players
@@ -37,7 +38,7 @@ def emit_start_game(game: "Game", sid: Optional[str] = None):
             for player in game.players
         },
         "totalNumTurns": game.total_num_turns,
-    }, to=destination)
+    }, game, sid)
 
 
 def emit_end_game(game: "Game", winner_target: str):
@@ -55,4 +56,82 @@ def emit_ai_stroke(stroke_samples: List[List[float]], room_id: str):
     socketio.emit("ai_stroke", {
         "strokeSamples": stroke_samples
     }, to=room_id)
-    
+
+
+def emit_ai_turn_failed(room_id: str, message: str):
+    from competitive_drawing.web_app import socketio  # avoid circular import
+
+    socketio.emit("ai_turn_failed", {
+        "message": message
+    }, to=room_id)
+
+
+def emit_end_turn_rejected(sid: str, message: str, game: Optional["Game"] = None):
+    """
+    :param sid: socket session which tried to end the turn
+    :param message: reason shown to the player
+    :param game: game of the room, if found. Its canvas is sent so that the
+        client can discard the rejected turn's strokes
+    """
+    from competitive_drawing.web_app import socketio  # avoid circular import
+
+    if game is None:
+        socketio.emit("end_turn_rejected", {"message": message}, to=sid)
+        return
+
+    _emit_with_canvas("end_turn_rejected", {"canvas": None, "message": message}, game, sid)
+
+
+def _emit_with_canvas(
+    event: str,
+    data: Dict[str, Any],
+    game: "Game",
+    sid: Optional[str] = None,
+    strokes: Optional[List["Stroke"]] = None,
+):
+    """
+    Emit an event whose "canvas" field holds the game canvas encoded in each
+    recipient's canvas format. Binary formats are sent as socket.io binary
+    attachments and are labeled with a "canvasFormat" field. The event is sent
+    to the whole room at once unless its players use different formats
+
+    Recipients using the strokes format are sent `strokes` in place of the
+    canvas if provided and a png snapshot of the canvas otherwise
+
+    :param event: event name
+    :param data: event data with a "canvas" placeholder
+    :param game: game whose canvas is sent
+    :param sid: only send to this socket session, defaults to the game's room
+    :param strokes: strokes which update the recipients' canvases
+    """
+    from competitive_drawing.web_app import socketio  # avoid circular import
+    from ..game import CanvasFormat  # avoid circular import
+
+    recipients = [
+        player
+        for player in game.players
+        if player.sid is not None and (sid is None or player.sid == sid)
+    ]
+    canvas_formats = {player.canvas_format for player in recipients}
+
+    if len(canvas_formats) <= 1:
+        canvas_format = canvas_formats.pop() if len(canvas_formats) > 0 else CanvasFormat.SERIAL
+        destinations = [(sid if sid is not None else game.room_id, canvas_format)]
+    else:
+        destinations = [(player.sid, player.canvas_format) for player in recipients]
+
+    for destination, canvas_format in destinations:
+        destination_data = dict(data)
+        if canvas_format == CanvasFormat.STROKES and strokes is not None:
+            del destination_data["canvas"]
+            destination_data["strokes"] = strokes
+            destination_data["canvasFormat"] = CanvasFormat.STROKES.value
+
+        else:
+            destination_data["canvas"] = game.canvas_image_to_payload(canvas_format)
+            if canvas_format == CanvasFormat.STROKES:
+                destination_data["canvasFormat"] = CanvasFormat.PNG.value
+            elif canvas_format != CanvasFormat.SERIAL:
+                destination_data["canvasFormat"] = canvas_format.value
+
+        socketio.emit(event, destination_data, to=destination)
@@ -0,0 +1,67 @@
+from typing import Dict, Optional, Union
+
+import threading
+
+from .RandomSet import RandomSet
+
+
+class FakeRedis:
+    """
+    In-process stand-in for a redis-py client implementing the commands used by
+    `RedisGameStateBackend`. Like redis-py, values are returned as bytes. Used
+    for local development and testing without a redis server
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes: Dict[str, Dict[bytes, bytes]] = {}
+        self._sets: Dict[str, RandomSet[bytes]] = {}
+
+
+    def hset(self, name: str, key: str, value: Union[str, bytes]) -> int:
+        with self._lock:
+            hash = self._hashes.setdefault(name, {})
+            is_new = _encode(key) not in hash
+            hash[_encode(key)] = _encode(value)
+
+            return int(is_new)
+
+
+    def hget(self, name: str, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._hashes.get(name, {}).get(_encode(key))
+
+
+    def hdel(self, name: str, *keys: str) -> int:
+        with self._lock:
+            hash = self._hashes.get(name, {})
+            return sum(hash.pop(_encode(key), None) is not None for key in keys)
+
+
+    def sadd(self, name: str, *values: str) -> int:
+        with self._lock:
+            members = self._sets.setdefault(name, RandomSet())
+            num_members = len(members)
+            for value in values:
+                members.add(_encode(value))
+
+            return len(members) - num_members
+
+
+    def srem(self, name: str, *values: str) -> int:
+        with self._lock:
+            members = self._sets.get(name, RandomSet())
+            num_members = len(members)
+            for value in values:
+                members.discard(_encode(value))
+
+            return num_members - len(members)
+
+
+    def srandmember(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            members = self._sets.get(name)
+            return members.choice() if members is not None else None
+
+
+def _encode(value: Union[str, bytes]) -> bytes:
+    return value.encode("utf-8") if isinstance(value, str) else value
@@ -0,0 +1,55 @@
+from typing import Dict, Generic, Hashable, Iterator, List, Optional, TypeVar
+
+import random
+
+
+T = TypeVar("T", bound=Hashable)
+
+
+class RandomSet(Generic[T]):
+    """
+    Set supporting constant time insertion, removal, and uniformly random
+    selection. Members are stored in a list with an index of their positions,
+    removed members are swapped with the last member before popping
+    """
+    def __init__(self):
+        self._members: List[T] = []
+        self._positions: Dict[T, int] = {}  # maps members to their index in `_members`
+
+
+    def add(self, member: T):
+        if member in self._positions:
+            return
+
+        self._positions[member] = len(self._members)
+        self._members.append(member)
+
+
+    def discard(self, member: T):
+        position = self._positions.pop(member, None)
+        if position is None:
+            return
+
+        last_member = self._members.pop()
+        if position < len(self._members):
+            self._members[position] = last_member
+            self._positions[last_member] = position
+
+
+    def choice(self) -> Optional[T]:
+        """
+        :return: uniformly random member, or None if the set is empty
+        """
+        return random.choice(self._members) if len(self._members) > 0 else None
+
+
+    def __contains__(self, member: T) -> bool:
+        return member in self._positions
+
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._members)
@@ -0,0 +1,59 @@
+from typing import List
+
+import uuid
+import hashlib
+
+
+class ShardRouter:
+    """
+    Consistently maps rooms to web app shards with rendezvous hashing. Every
+    process configured with the same shard ids routes a room to the same shard,
+    and adding or removing a shard only moves the rooms of that shard. New room
+    ids are chosen so that they route to the local shard, which owns the games
+    it creates
+
+    Clients connect their sockets with the room id in the `roomId` query
+    parameter. The load balancer in front of the shards must send each
+    connection to `get_shard(roomId)`, which is reproducible from the
+    blake2b scores below
+
+    :param shard_ids: ids of all shards
+    :param local_shard_id: id of this process' shard
+    """
+    def __init__(self, shard_ids: List[str], local_shard_id: str):
+        if local_shard_id not in shard_ids:
+            raise ValueError(f"Local shard {local_shard_id} is not one of {shard_ids}")
+
+        self.shard_ids = list(shard_ids)
+        self.local_shard_id = local_shard_id
+
+
+    def get_shard(self, room_id: str) -> str:
+        """
+        :param room_id: room id
+        :return: id of the shard which owns the room
+        """
+        return max(self.shard_ids, key=lambda shard_id: _score(shard_id, room_id))
+
+
+    def is_local(self, room_id: str) -> bool:
+        return self.get_shard(room_id) == self.local_shard_id
+
+
+    def new_room_id(self) -> str:
+        """
+        Generate a room id owned by the local shard. Takes one attempt per shard
+        on average
+
+        :return: new room id
+        """
+        while True:
+            room_id = uuid.uuid4().hex
+            if self.is_local(room_id):
+                return room_id
+
+
+def _score(shard_id: str, room_id: str) -> int:
+    # stable across processes, unlike hash()
+    digest = hashlib.blake2b(f"{shard_id}:{room_id}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
@@ -0,0 +1,7 @@
+from .base import GameStateBackend
+from .memory import InMemoryGameStateBackend
+from .redis_backend import RedisGameStateBackend
+from .FakeRedis import FakeRedis
+from .RandomSet import RandomSet
+from .ShardRouter import ShardRouter
+from .factory import create_game_state_backend, create_shard_router
@@ -0,0 +1,103 @@
+from typing import Optional, Tuple
+from abc import ABC, abstractmethod
+
+from ..game import GameType
+
+
+class GameStateBackend(ABC):
+    """
+    Interface for game state shared between web app shards. Live games are held
+    in memory by the shard which owns their room, the backend stores which
+    shard owns each room, the rooms which are waiting for players, and which
+    room and player each socket session belongs to
+    """
+
+    """ Rooms """
+
+
+    @abstractmethod
+    def add_room(self, room_id: str, game_type: GameType, shard_id: str):
+        """
+        Register a new room, which is open for players to join
+
+        :param room_id: room id
+        :param game_type: type of game played in room
+        :param shard_id: id of the shard which owns the room
+        """
+        raise NotImplementedError()
+
+
+    @abstractmethod
+    def get_room_shard(self, room_id: str) -> Optional[str]:
+        """
+        :param room_id: room id
+        :return: id of the shard which owns the room, or None if there is no
+            such room
+        """
+        raise NotImplementedError()
+
+
+    @abstractmethod
+    def delete_room(self, room_id: str):
+        """
+        Remove a room and close it to new players
+
+        :param room_id: room id
+        """
+        raise NotImplementedError()
+
+
+    """ Matchmaking """
+
+
+    @abstractmethod
+    def close_room(self, room_id: str):
+        """
+        Stop assigning new players to a room, for example once its game starts
+
+        :param room_id: room id
+        """
+        raise NotImplementedError()
+
+
+    @abstractmethod
+    def get_random_open_room(self, game_type: GameType) -> Optional[str]:
+        """
+        :param game_type: desired game type
+        :return: id of a random room of the game type which is waiting for
+            players, or None if there are no such rooms
+        """
+        raise NotImplementedError()
+
+
+    """ Socket sessions """
+
+
+    @abstractmethod
+    def set_sid(self, sid: str, room_id: str, player_id: str):
+        """
+        Associate a socket session with a player
+
+        :param sid: socket session id
+        :param room_id: room of the player
+        :param player_id: player id
+        """
+        raise NotImplementedError()
+
+
+    @abstractmethod
+    def get_sid(self, sid: str) -> Optional[Tuple[str, str]]:
+        """
+        :param sid: socket session id
+        :return: room id and player id associated with the socket session, or
+            None if the session is not associated with a player
+        """
+        raise NotImplementedError()
+
+
+    @abstractmethod
+    def delete_sid(self, sid: str):
+        """
+        :param sid: socket session id
+        """
+        raise NotImplementedError()
@@ -0,0 +1,26 @@
+from competitive_drawing import SETTINGS
+from .base import GameStateBackend
+from .memory import InMemoryGameStateBackend
+from .redis_backend import RedisGameStateBackend
+from .FakeRedis import FakeRedis
+from .ShardRouter import ShardRouter
+
+
+def create_game_state_backend(backend: str) -> GameStateBackend:
+    match backend:
+        case "memory":
+            return InMemoryGameStateBackend()
+
+        case "redis":
+            import redis  # optional dependency
+
+            return RedisGameStateBackend(redis.Redis.from_url(SETTINGS.redis_url))
+
+        case "fake_redis":
+            return RedisGameStateBackend(FakeRedis())
+
+    raise ValueError(f"Unknown game state backend {backend}")
+
+
+def create_shard_router() -> ShardRouter:
+    return ShardRouter(SETTINGS.web_app_shard_ids, SETTINGS.web_app_shard_id)
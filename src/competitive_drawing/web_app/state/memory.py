@@ -0,0 +1,103 @@
+from typing import Dict, Optional, Tuple
+
+import threading
+
+from ..game import GameType
+from .base import GameStateBackend
+from .RandomSet import RandomSet
+
+
+class InMemoryGameStateBackend(GameStateBackend):
+    """
+    Game state backend held in process memory. Suitable when the web app runs
+    as a single shard. Open rooms are kept in one `RandomSet` per game type so
+    that joining, starting, and deleting rooms take constant time
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rooms: Dict[str, Tuple[GameType, str]] = {}  # maps room ids to game types and shards
+        self._open_rooms: Dict[GameType, RandomSet[str]] = {game_type: RandomSet() for game_type in GameType}
+        self._sids: Dict[str, Tuple[str, str]] = {}  # maps sids to room ids and player ids
+
+
+    def add_room(self, room_id: str, game_type: GameType, shard_id: str):
+        with self._lock:
+            self._rooms[room_id] = (game_type, shard_id)
+            self._open_rooms[game_type].add(room_id)
+
+
+    def get_room_shard(self, room_id: str) -> Optional[str]:
+        room = self._rooms.get(room_id)
+        return room[1] if room is not None else None
+
+
+    def delete_room(self, room_id: str):
+        with self._lock:
+            room = self._rooms.pop(room_id, None)
+            if room is not None:
+                self._open_rooms[room[0]].discard(room_id)
+
+
+    def close_room(self, room_id: str):
+        with self._lock:
+            room = self._rooms.get(room_id)
+            if room is not None:
+                self._open_rooms[room[0]].discard(room_id)
+
+
+    def get_random_open_room(self, game_type: GameType) -> Optional[str]:
+        with self._lock:
+            return self._open_rooms[game_type].choice()
+
+
+    def set_sid(self, sid: str, room_id: str, player_id: str):
+        self._sids[sid] = (room_id, player_id)
+
+
+    def get_sid(self, sid: str) -> Optional[Tuple[str, str]]:
+        return self._sids.get(sid)
+
+
+    def delete_sid(self, sid: str):
+        self._sids.pop(sid, None)
+
+
+if __name__ == "__main__":
+    # matchmaking cost as the number of open rooms grows, compared with scanning
+    # and shuffling a list of rooms
+    import time
+    import uuid
+    import random
+
+    num_operations = 1000
+
+    for num_rooms in [10, 100, 1_000, 10_000, 100_000]:
+        room_ids = [uuid.uuid4().hex for _ in range(num_rooms)]
+
+        # scan: find open rooms, shuffle, and remove started rooms from a list
+        rooms = [(room_id, GameType.ONLINE, False) for room_id in room_ids]
+        start = time.perf_counter()
+        for _ in range(num_operations):
+            open_room_ids = [room_id for room_id, game_type, started in rooms if game_type == GameType.ONLINE and not started]
+            random.shuffle(open_room_ids)
+            room = next(room for room in rooms if room[0] == open_room_ids[0])
+            rooms.remove(room)
+            rooms.append((uuid.uuid4().hex, GameType.ONLINE, False))
+        scan_time = (time.perf_counter() - start) / num_operations
+
+        # backend: choose a random open room, start it, and replace it
+        backend = InMemoryGameStateBackend()
+        for room_id in room_ids:
+            backend.add_room(room_id, GameType.ONLINE, "0")
+        start = time.perf_counter()
+        for _ in range(num_operations):
+            room_id = backend.get_random_open_room(GameType.ONLINE)
+            backend.close_room(room_id)
+            backend.delete_room(room_id)
+            backend.add_room(uuid.uuid4().hex, GameType.ONLINE, "0")
+        backend_time = (time.perf_counter() - start) / num_operations
+
+        print(
+            f"{num_rooms:>7} rooms: scan {scan_time * 1e6:10.1f}us, "
+            f"backend {backend_time * 1e6:6.1f}us per assignment"
+        )
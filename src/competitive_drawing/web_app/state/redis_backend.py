@@ -0,0 +1,82 @@
+from typing import Any, Optional, Tuple, Union
+
+import json
+
+from ..game import GameType
+from .base import GameStateBackend
+
+
+class RedisGameStateBackend(GameStateBackend):
+    """
+    Game state backend stored in redis, shared by every web app shard. Any
+    client with the redis-py interface may be used, such as `FakeRedis` for
+    local testing. Open rooms are kept in one redis set per game type so that
+    random selection and removal are constant time
+
+    :param client: redis client
+    :param prefix: prefix of all keys written by the backend
+    """
+    def __init__(self, client: Any, prefix: str = "competitive_drawing:"):
+        self.client = client
+        self.prefix = prefix
+
+        self._rooms_key = f"{prefix}rooms"
+        self._sids_key = f"{prefix}sids"
+
+
+    def add_room(self, room_id: str, game_type: GameType, shard_id: str):
+        room = json.dumps({"gameType": game_type.value, "shardId": shard_id})
+        self.client.hset(self._rooms_key, room_id, room)
+        self.client.sadd(self._open_rooms_key(game_type), room_id)
+
+
+    def get_room_shard(self, room_id: str) -> Optional[str]:
+        room = self._get_room(room_id)
+        return room["shardId"] if room is not None else None
+
+
+    def delete_room(self, room_id: str):
+        self.close_room(room_id)
+        self.client.hdel(self._rooms_key, room_id)
+
+
+    def close_room(self, room_id: str):
+        room = self._get_room(room_id)
+        if room is not None:
+            self.client.srem(self._open_rooms_key(GameType(room["gameType"])), room_id)
+
+
+    def get_random_open_room(self, game_type: GameType) -> Optional[str]:
+        room_id = self.client.srandmember(self._open_rooms_key(game_type))
+        return _decode(room_id) if room_id is not None else None
+
+
+    def set_sid(self, sid: str, room_id: str, player_id: str):
+        self.client.hset(self._sids_key, sid, json.dumps([room_id, player_id]))
+
+
+    def get_sid(self, sid: str) -> Optional[Tuple[str, str]]:
+        value = self.client.hget(self._sids_key, sid)
+        if value is None:
+            return None
+
+        room_id, player_id = json.loads(_decode(value))
+        return room_id, player_id
+
+
+    def delete_sid(self, sid: str):
+        self.client.hdel(self._sids_key, sid)
+
+
+    def _get_room(self, room_id: str) -> Optional[dict]:
+        room = self.client.hget(self._rooms_key, room_id)
+        return json.loads(_decode(room)) if room is not None else None
+
+
+    def _open_rooms_key(self, game_type: GameType) -> str:
+        return f"{self.prefix}open_rooms:{game_type.value}"
+
+
+def _decode(value: Union[str, bytes]) -> str:
+    # clients return bytes unless created with decode_responses=True
+    return value.decode("utf-8") if isinstance(value, bytes) else value
@@ -5,7 +5,7 @@ details: The DrawingBoard controls the drawing canvas as well as the preview can
          Future implementations will allow a virtual preview canvas rather than
          relying on one already appended to the DOM.
 */
-import { resizeImageData } from "/static/scripts/helpers.js";
+import { resizeImageData, canvasToPngBuffer } from "/static/scripts/helpers.js";
 
 export class DrawingBoard {
     constructor(distanceIndicator, gameConfig) {
@@ -41,6 +41,7 @@ export class DrawingBoard {
         this.canvasContext.lineWidth = this.canvasLineWidth;
 
         this.enabled = false
+        this.turnStrokes = []  // polylines drawn since the last call to takeTurnStrokes
         this.mouseHolding = false
         this.lastMouseX = 0
         this.lastMouseY = 0
@@ -189,6 +190,11 @@ export class DrawingBoard {
     }
 
 
+    async getPreviewImagePng() {
+        return await canvasToPngBuffer(this.previewCanvas)
+    }
+
+
     async putPreviewImageData(previewCanvasImageData, updateCanvas=false) {
         this.previewCanvasContext.putImageData(previewCanvasImageData, 0, 0)
         if (updateCanvas) {
@@ -207,6 +213,27 @@ export class DrawingBoard {
     }
 
 
+    takeTurnStrokes() {
+        // strokes without any movement are not drawn
+        const turnStrokes = this.turnStrokes.filter((stroke) => stroke.length > 1)
+        this.turnStrokes = []
+        return turnStrokes
+    }
+
+
+    drawStrokes(strokes) {
+        // strokes are polylines of [x, y] canvas positions drawn by other clients
+        for (const stroke of strokes) {
+            this.canvasContext.beginPath();
+            this.canvasContext.moveTo(stroke[0][0], stroke[0][1]);
+            for (const [x, y] of stroke.slice(1)) {
+                this.canvasContext.lineTo(x, y);
+            }
+            this.canvasContext.stroke();
+        }
+    }
+
+
     onMouseDown(event) {
         if (this._distanceIndicator == null || this._distanceIndicator.distanceRemaining > 1) {
             this._mouseDown(event)
@@ -224,6 +251,7 @@ export class DrawingBoard {
         this.mouseHolding = true;
         this.lastMouseX = mouseX;
         this.lastMouseY = mouseY;
+        this.turnStrokes.push([[mouseX, mouseY]])
     }
 
 
@@ -263,6 +291,7 @@ export class DrawingBoard {
 
         this.canvasContext.lineTo(mouseX, mouseY);
         this.canvasContext.stroke();
+        this.turnStrokes[this.turnStrokes.length - 1].push([mouseX, mouseY])
 
         if (this._distanceIndicator) {
             this._distanceIndicator.mouseDistance += strokeDistance
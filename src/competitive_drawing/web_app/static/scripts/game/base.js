@@ -4,7 +4,7 @@ import { DistanceIndicator } from "/static/scripts/components/distance_indicator
 import { DrawingBoard } from "/static/scripts/components/drawing_board.js";
 import { Inferencer } from "/static/scripts/components/inference.js";
 import { TurnIndicator } from "/static/scripts/components/turn_indicator.js";
-import { getRoomIdFromUrl, imageToImageData } from "/static/scripts/helpers.js";
+import { getRoomIdFromUrl, canvasPayloadToImageData } from "/static/scripts/helpers.js";
 
 export class GameBase {
     constructor(gameType, gameConfig, debug=false) {
@@ -12,12 +12,14 @@ export class GameBase {
         this.gameConfig = gameConfig
         this.debug = debug
 
-        // sockets
-        this.socket = io()
+        // sockets are routed to the shard which owns the room
         this.roomId = getRoomIdFromUrl()
+        this.socket = io({ query: { "roomId": this.roomId } })
+        this.socket.on("connect_error", this.onConnectError.bind(this))
         this.socket.on("assign_player", this.onAssignPlayer.bind(this))
         this.socket.on("start_game", this.onStartGame.bind(this))
         this.socket.on("start_turn", this.onStartTurn.bind(this))
+        this.socket.on("end_turn_rejected", this.onEndTurnRejected.bind(this))
         this.socket.on("end_game", this.onEndGame.bind(this))
 
         // components
@@ -28,6 +30,12 @@ export class GameBase {
         this.drawingBoard.afterMouseMove = this.clientInferImage.bind(this)
         this.distanceIndicator.onButtonClick = this.onEndTurnButtonClick.bind(this)
 
+        // true after this client ends a turn, its strokes are already drawn.
+        // Only the start of the turn which follows carries those strokes
+        this.awaitingOwnStrokes = false
+        this.awaitingTurnsLeft = null
+        this.turnsLeft = null
+
         // inference
         this.inferenceMutex = false  // true for locked, false for unlocked
         this.inferencer = null
@@ -36,6 +44,7 @@ export class GameBase {
         this.socket.emit("join_room", {
             "roomId": this.roomId,
             "playerId": this.playerId,
+            "canvasFormat": "strokes",
         })
 
         // disable canvas until start game message is received
@@ -53,6 +62,11 @@ export class GameBase {
     }
 
 
+    onConnectError(error) {
+        console.error(`Could not connect to room ${this.roomId}: ${error.message}`)
+    }
+
+
     onAssignPlayer(data) {
         if (self.debug) {
             console.log("onAssignPlayer")
@@ -73,8 +87,8 @@ export class GameBase {
         await this.inferencer.initialize()
 
         // initialize canvas and confidence bar
-        const canvasImageData = imageToImageData(
-            data["canvas"],
+        const canvasImageData = await canvasPayloadToImageData(
+            data,
             this.drawingBoard.canvasSize,
             this.drawingBoard.canvasSize
         )
@@ -99,12 +113,22 @@ export class GameBase {
         await this.inferencer.initialize()
 
         // update canvas and preview
-        const canvasImageData = imageToImageData(
-            data["canvas"],
-            this.drawingBoard.canvasSize,
-            this.drawingBoard.canvasSize
-        )
-        this.drawingBoard.putCanvasImageData(canvasImageData, true)
+        const isOwnStrokes = this.awaitingOwnStrokes && data["turnsLeft"] == this.awaitingTurnsLeft
+        if (data["canvasFormat"] == "strokes") {
+            if (!isOwnStrokes) {
+                this.drawingBoard.drawStrokes(data["strokes"])
+            }
+        } else {
+            const canvasImageData = await canvasPayloadToImageData(
+                data,
+                this.drawingBoard.canvasSize,
+                this.drawingBoard.canvasSize
+            )
+            this.drawingBoard.putCanvasImageData(canvasImageData, true)
+        }
+        this.awaitingOwnStrokes = false
+        this.turnsLeft = data["turnsLeft"]
+        this.drawingBoard.takeTurnStrokes()  // discard strokes from previous turns
         await this.drawingBoard.updatePreview()
 
         // update turn indicator
@@ -132,19 +156,56 @@ export class GameBase {
     }
 
     async onEndTurnButtonClick(_event) {
-        const canvasDataUrl = this.drawingBoard.getCanvasImageDataUrl()
         await this.drawingBoard.updatePreview()
-        const imageDataUrl = this.drawingBoard.getPreviewImageDataUrl()
+        const previewPng = await this.drawingBoard.getPreviewImagePng()
+        this.expectOwnStrokes()
         this.socket.emit("end_turn", {
             "game_type": this.gameType,
             "roomId": this.roomId,
             "playerId": this.playerId,
-            "canvas": canvasDataUrl,
-            "preview": imageDataUrl,
+            "strokes": this.drawingBoard.takeTurnStrokes(),
+            "preview": previewPng,
         })
     }
 
 
+    expectOwnStrokes() {
+        // the next turn starts with the strokes this client is about to send
+        this.awaitingOwnStrokes = true
+        this.awaitingTurnsLeft = this.turnsLeft - 1
+    }
+
+
+    async onEndTurnRejected(data) {
+        if (this.debug) {
+            console.log("end_turn_rejected")
+            console.log(data)
+        }
+
+        // the turn's strokes were not applied, restore the server's canvas
+        this.awaitingOwnStrokes = false
+        if ("canvas" in data) {
+            const canvasImageData = await canvasPayloadToImageData(
+                data,
+                this.drawingBoard.canvasSize,
+                this.drawingBoard.canvasSize
+            )
+            this.drawingBoard.putCanvasImageData(canvasImageData, true)
+            await this.drawingBoard.updatePreview()
+        }
+
+        Toastify({
+            text: data["message"],
+            duration: 10000,
+            className: "info",
+            gravity: "toastify-top",
+            style: {
+                background: "linear-gradient(to right, #ff5f6d, #ffc371)",
+            }
+        }).showToast();
+    }
+
+
     onEndGame(data) {
         if (this.debug) {
             console.log("end_game")
@@ -13,6 +13,7 @@ export class SinglePlayerGame extends GameBase {
 
         // custom socket
         this.socket.on("ai_stroke", this.onAIStroke.bind(this))
+        this.socket.on("ai_turn_failed", this.onAITurnFailed.bind(this))
     }
 
 
@@ -106,15 +107,35 @@ export class SinglePlayerGame extends GameBase {
         // Simulate drawing the stroke on the drawingBoard
         await this.drawingBoard.replayStroke(data["strokeSamples"], 3000)
 
-        // End AI turn
-        const canvasDataUrl = this.drawingBoard.getCanvasImageDataUrl()
+        await this.endAITurn()
+    }
+
+
+    async onAITurnFailed(data) {
+        Toastify({
+            text: data["message"],
+            duration: 10000,
+            className: "info",
+            gravity: "toastify-top",
+            style: {
+                background: "linear-gradient(to right, #ff5f6d, #ffc371)",
+            }
+        }).showToast();
+
+        // skip the AI's turn without drawing
+        await this.endAITurn()
+    }
+
+
+    async endAITurn() {
         await this.drawingBoard.updatePreview()
-        const imageDataUrl = this.drawingBoard.getPreviewImageDataUrl()
+        const previewPng = await this.drawingBoard.getPreviewImagePng()
+        this.expectOwnStrokes()
         this.socket.emit("end_turn", {
             "roomId": this.roomId,
             "playerId": this.aiId,
-            "canvas": canvasDataUrl,
-            "preview": imageDataUrl,
+            "strokes": this.drawingBoard.takeTurnStrokes(),
+            "preview": previewPng,
         })
         this.aiInferenceMutex = false
     }
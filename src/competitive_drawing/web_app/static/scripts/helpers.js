@@ -28,6 +28,30 @@ export function imageToImageData(image, width, height) {
     return imageData;
 }
 
+export async function canvasPayloadToImageData(data, width, height) {
+    // decode the canvas field of server messages in any canvas format
+    switch (data["canvasFormat"]) {
+        case "rgba":
+            return new ImageData(new Uint8ClampedArray(data["canvas"]), width, height)
+
+        case "png":
+            const imageBitmap = await createImageBitmap(new Blob([data["canvas"]], { type: "image/png" }))
+            const decodeCanvas = new OffscreenCanvas(width, height)
+            const decodeContext = decodeCanvas.getContext("2d")
+            decodeContext.drawImage(imageBitmap, 0, 0, width, height)
+            return decodeContext.getImageData(0, 0, width, height)
+
+        default:
+            return imageToImageData(data["canvas"], width, height)
+    }
+}
+
+export async function canvasToPngBuffer(canvas) {
+    // png bytes are sent to the server as a binary attachment
+    const blob = await new Promise((resolve) => canvas.toBlob(resolve, "image/png"))
+    return await blob.arrayBuffer()
+}
+
 export async function resizeImageData(srcImageData, dstImageSize) {
     const dstImageData = await pica.resizeBuffer({
         "src": srcImageData.data,
@@ -1,6 +1,5 @@
-from typing import Tuple
+from typing import Tuple, Union
 
-import re
 import base64
 from PIL import Image
 from io import BytesIO
@@ -15,11 +14,42 @@ def label_pair_to_str(label_pair: Tuple[str, str]) -> str:
 
 
 
-def data_url_to_image(data_url):
-    image_data_str = re.sub("^data:image/.+;base64,", "", data_url)
-    image_data = base64.b64decode(image_data_str)
-    image_data_io = BytesIO(image_data)
-    return Image.open(image_data_io)
+def data_url_to_image(data_url: Union[str, bytes]) -> Image:
+    """
+    Convert image data sent by a client to a PIL Image. Clients either send
+    base64 data urls or raw image file bytes as binary attachments
+
+    :param data_url: base64 image data url or image file bytes
+    :return: decoded image
+    """
+    return Image.open(BytesIO(image_data_to_bytes(data_url)))
+
+
+def image_data_to_bytes(image_data: Union[str, bytes]) -> bytes:
+    """
+    Get image file bytes from a base64 data url or image file bytes
+
+    :param image_data: base64 image data url or image file bytes
+    :return: image file bytes
+    """
+    if isinstance(image_data, (bytes, bytearray, memoryview)):
+        return bytes(image_data)
+
+    _header, _separator, image_data_str = image_data.partition(",")
+    return base64.b64decode(image_data_str)
+
+
+def image_data_to_data_url(image_data: Union[str, bytes]) -> str:
+    """
+    Get a base64 png data url from a data url or png file bytes
+
+    :param image_data: base64 image data url or png file bytes
+    :return: base64 image data url
+    """
+    if isinstance(image_data, str):
+        return image_data
+
+    return "data:image/png;base64," + base64.b64encode(image_data).decode("ascii")
 
 
 GAME_CONFIG = {
@@ -0,0 +1,23 @@
+from typing import List, Tuple
+
+from competitive_drawing.model_store import get_model_store, get_label_pair_index
+from .helpers import label_pair_to_str
+
+
+def get_available_label_pairs() -> List[List[str]]:
+    return get_label_pair_index().get()
+
+
+def get_onnx_url(label_pair: Tuple[str, str]) -> str:
+    return get_model_store().get_onnx_url(label_pair_to_str(label_pair))
+
+
+def read_onnx(label_pair_str: str) -> bytes:
+    available_label_pair_strs = [
+        label_pair_to_str(label_pair)
+        for label_pair in get_available_label_pairs()
+    ]
+    if label_pair_str not in available_label_pair_strs:
+        raise ValueError(f"Unknown label pair {label_pair_str}")
+
+    return get_model_store().read_onnx(label_pair_str)
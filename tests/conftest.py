@@ -0,0 +1,38 @@
+import pytest
+
+from competitive_drawing import SETTINGS
+from competitive_drawing.model_store import factory, get_model_store, get_label_pair_index
+
+
+LABEL_PAIR_STRS = ["apple-bear", "cat-dog"]
+
+
+@pytest.fixture(autouse=True, scope="session")
+def local_model_store(tmp_path_factory):
+    """
+    Select a local model store over a temporary tree of placeholder models so
+    that tests run without network access or credentials, whatever the
+    configured backend
+    """
+    models_dir = tmp_path_factory.mktemp("models")
+    for label_pair_str in LABEL_PAIR_STRS:
+        label_pair_dir = models_dir / SETTINGS.s3_models_root_folder / label_pair_str
+        label_pair_dir.mkdir(parents=True)
+        (label_pair_dir / "model.onnx").write_bytes(b"onnx")
+
+    settings = SETTINGS.model_copy(update={"models_backend": "local", "models_local_dir": str(models_dir)})
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(factory, "SETTINGS", settings)
+
+        # the web app begins indexing the configured store when it is imported
+        _clear_model_store()
+        yield models_dir
+        _clear_model_store()
+
+
+def _clear_model_store():
+    if get_label_pair_index.cache_info().currsize > 0:
+        get_label_pair_index().stop()
+
+    get_model_store.cache_clear()
+    get_label_pair_index.cache_clear()
@@ -0,0 +1,89 @@
+from typing import List, Tuple
+
+import pytest
+import torch
+
+from competitive_drawing.model_service.opponent.models.BatchBezierCurve import BatchBezierCurve
+
+
+def de_casteljau(key_points: List[Tuple[float, float]], t: float) -> Tuple[List, List, Tuple]:
+    """
+    Reference evaluation of a single curve
+
+    :return: key points of the start portion, key points of the end portion, and
+        the point at t
+    """
+    degree_points = [list(key_points)]
+    while len(degree_points[-1]) > 1:
+        prev_points = degree_points[-1]
+        degree_points.append([
+            tuple((1 - t) * a + t * b for a, b in zip(prev_points[i], prev_points[i + 1]))
+            for i in range(len(prev_points) - 1)
+        ])
+
+    start_points = [points[0] for points in degree_points]
+    end_points = [points[-1] for points in reversed(degree_points)]
+    return start_points, end_points, degree_points[-1][0]
+
+
+def reference_t_at_length(key_points: List[Tuple[float, float]], fraction: float) -> float:
+    num_ts = 20001
+    points = torch.tensor([de_casteljau(key_points, t / (num_ts - 1))[2] for t in range(num_ts)])
+    lengths = torch.cumsum(torch.norm(points[1:] - points[:-1], dim=1), dim=0)
+    index = torch.searchsorted(lengths, fraction * lengths[-1])
+    return (int(index) + 1) / (num_ts - 1)
+
+
+KEY_POINTS = torch.tensor([
+    [[0.0, 0.0], [10.0, 30.0], [40.0, 30.0], [50.0, 0.0]],
+    [[5.0, 5.0], [5.0, 45.0], [45.0, 45.0], [45.0, 5.0]],
+    [[0.0, 0.0], [20.0, 0.0], [20.0, 20.0], [40.0, 40.0]],
+])
+
+
+@pytest.mark.parametrize("num_samples", [3, 15, 50])
+def test_sample_uniform_matches_reference(num_samples):
+    curves = BatchBezierCurve(KEY_POINTS)
+    samples = curves.sample_uniform(num_samples)
+
+    assert samples.shape == (len(KEY_POINTS), num_samples, 2)
+    for curve_index, key_points in enumerate(KEY_POINTS.tolist()):
+        expected = torch.tensor([
+            de_casteljau(key_points, t / (num_samples - 1))[2]
+            for t in range(num_samples)
+        ])
+        assert torch.allclose(samples[curve_index], expected, atol=1e-4)
+
+
+@pytest.mark.parametrize("keep_start", [True, False])
+def test_truncate_matches_reference(keep_start):
+    fraction = 0.4
+    curves = BatchBezierCurve(KEY_POINTS, num_approximations=500)
+    curves.truncate(
+        torch.full((len(KEY_POINTS), ), fraction),
+        torch.full((len(KEY_POINTS), ), keep_start),
+    )
+
+    for curve_index, key_points in enumerate(KEY_POINTS.tolist()):
+        if keep_start:
+            t = reference_t_at_length(key_points, fraction)
+            expected = de_casteljau(key_points, t)[0]
+        else:
+            t = reference_t_at_length(key_points, 1.0 - fraction)
+            expected = de_casteljau(key_points, t)[1]
+
+        assert torch.allclose(curves.key_points[curve_index], torch.tensor(expected), atol=0.1)
+
+
+def test_truncate_curve_mask():
+    curves = BatchBezierCurve(KEY_POINTS)
+    original_arc_lengths = curves.arc_lengths.clone()
+    curve_mask = torch.tensor([True, False, True])
+    curves.truncate(
+        torch.full((len(KEY_POINTS), ), 0.5),
+        torch.ones(len(KEY_POINTS), dtype=torch.bool),
+        curve_mask=curve_mask,
+    )
+
+    assert torch.equal(curves.key_points[1], KEY_POINTS[1])
+    assert torch.allclose(curves.arc_lengths[curve_mask], original_arc_lengths[curve_mask] / 2, rtol=0.02)
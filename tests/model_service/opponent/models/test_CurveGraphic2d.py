@@ -0,0 +1,54 @@
+import pytest
+import torch
+
+from competitive_drawing.model_service.opponent.models.CurveGraphic2d import CurveGraphic2d
+
+
+@pytest.mark.parametrize(
+    "canvas_shape,num_curves,num_keypoints",
+    [
+        ([50, 50], 1, 4),
+        ([50, 50], 8, 4),
+        ([20, 30], 5, 3),
+    ],
+)
+def test_vectorized_matches_dense(canvas_shape, num_curves, num_keypoints):
+    torch.manual_seed(0)
+    keypoints = torch.rand((num_curves, num_keypoints, 2))
+    widths = [1.5] * num_curves
+    aa_factors = [2.0] * num_curves
+
+    canvases = {}
+    gradients = {}
+    for vectorized in [True, False]:
+        inputs = keypoints.clone().requires_grad_(True)
+        graphic = CurveGraphic2d(
+            canvas_shape,
+            max_length=1000,  # avoid random truncation
+            vectorized=vectorized,
+        )
+        canvas = graphic(inputs, widths, aa_factors)
+        canvas.sum().backward()
+
+        canvases[vectorized] = canvas.detach()
+        gradients[vectorized] = inputs.grad
+
+    assert canvases[True].shape == (num_curves, *canvas_shape)
+    assert torch.allclose(canvases[True], canvases[False], atol=1e-6)
+    assert torch.allclose(gradients[True], gradients[False], atol=1e-3, rtol=1e-4)
+
+
+def test_vectorized_matches_dense_truncated():
+    keypoints = torch.tensor([[[0.0, 0.0], [0.0, 1.0], [1.0, 1.0], [1.0, 0.0]]])
+
+    canvases = []
+    for vectorized in [True, False]:
+        graphic = CurveGraphic2d(
+            [40, 40],
+            max_length=20,
+            vectorized=vectorized,
+            generator=torch.Generator().manual_seed(0),
+        )
+        canvases.append(graphic(keypoints, [1.5], [2.0]))
+
+    assert torch.allclose(canvases[0], canvases[1], atol=1e-6)
@@ -0,0 +1,77 @@
+import torch
+
+from competitive_drawing.model_service.opponent.models.BatchBezierCurve import BatchBezierCurve
+from competitive_drawing.model_service.opponent.models.StrokeScoreModel import StrokeScoreModel
+
+
+class MeanScoreModel(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.weight = torch.nn.Parameter(torch.ones(1))
+
+    def forward(self, images: torch.Tensor):
+        logits = images.mean(dim=(1, 2, 3))[:, None] * torch.stack([self.weight, -self.weight], dim=1)
+        return logits, torch.softmax(logits, dim=1)
+
+
+def make_model(initial_inputs: torch.Tensor, seed: int, max_length: float = 20.0) -> StrokeScoreModel:
+    return StrokeScoreModel(
+        torch.zeros((40, 40)),
+        initial_inputs.clone(),
+        MeanScoreModel(),
+        target_index=0,
+        max_length=max_length,
+        widths=[1.5] * len(initial_inputs),
+        aa_factors=[2.0] * len(initial_inputs),
+        seed=seed,
+    )
+
+
+INITIAL_INPUTS = torch.tensor([
+    [[0.1, 0.1], [0.1, 0.9], [0.9, 0.9], [0.9, 0.1]],  # over-length
+    [[0.5, 0.5], [0.5, 0.5], [0.5, 0.5], [0.5, 0.5]],  # zero-length
+    [[0.2, 0.2], [0.25, 0.2], [0.3, 0.2], [0.35, 0.2]],  # within max_length
+    [[0.0, 0.0], [0.3, 0.6], [0.6, 0.3], [1.0, 1.0]],  # over-length
+])
+
+
+def test_constrain_keypoints_matches_per_curve_loop():
+    seed = 0
+    model = make_model(INITIAL_INPUTS, seed)
+    model.constrain_keypoints()
+
+    # same sides as drawn by the model's generator
+    keep_start = torch.randint(0, 2, (len(INITIAL_INPUTS), ), generator=torch.Generator().manual_seed(seed)).bool()
+    canvas_shape_tensor = torch.tensor([40.0, 40.0])
+    for curve_index, inputs in enumerate(INITIAL_INPUTS):
+        curve = BatchBezierCurve((inputs * canvas_shape_tensor)[None], num_approximations=model.graphic.num_samples)
+        expected = inputs
+        if curve.arc_lengths[0] > model.max_length:
+            curve.truncate(model.max_length / curve.arc_lengths, keep_start[curve_index: curve_index + 1])
+            expected = curve.key_points[0] / canvas_shape_tensor
+        expected = expected.clone()
+        expected[0].clamp_(0.0, 1.0)
+        expected[-1].clamp_(0.0, 1.0)
+
+        assert torch.allclose(model.inputs[curve_index], expected, atol=1e-6)
+
+    assert torch.equal(model.inputs[1], INITIAL_INPUTS[1])
+    assert torch.equal(model.inputs[2], INITIAL_INPUTS[2])
+
+
+def test_constrain_keypoints_zero_length_gradients_are_finite():
+    model = make_model(INITIAL_INPUTS, seed=1)
+    model.constrain_keypoints()
+    assert torch.all(torch.isfinite(model.inputs))
+
+    _canvas, target_scores = model()
+    target_scores.sum().backward()
+    assert torch.all(torch.isfinite(model.inputs.grad))
+
+
+def test_constrain_keypoints_is_reproducible():
+    models = [make_model(INITIAL_INPUTS, seed=2, max_length=5.0) for _ in range(2)]
+    for model in models:
+        model.constrain_keypoints()
+
+    assert torch.equal(models[0].inputs, models[1].inputs)
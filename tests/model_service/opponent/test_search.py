@@ -0,0 +1,114 @@
+import pytest
+import torch
+
+from competitive_drawing.model_service.opponent import grid_search_stroke, SearchParameters
+from competitive_drawing.model_service.opponent import search as search_module
+
+
+class InkScoreModel(torch.nn.Module):
+    """
+    Scores canvases by the amount of ink in their top left quadrant
+    """
+    def __init__(self):
+        super().__init__()
+        self.weight = torch.nn.Parameter(torch.tensor(0.05))
+
+    def forward(self, images: torch.Tensor):
+        ink = images[:, 0, :images.shape[2] // 2, :images.shape[3] // 2].sum(dim=(1, 2))
+        logits = torch.stack([ink * self.weight, -ink * self.weight], dim=1)
+        return logits, torch.softmax(logits, dim=1)
+
+
+def search(**search_kwargs):
+    search_kwargs = {"grid_shape": (2, 2), "max_steps": 40, "seed": 0, **search_kwargs}
+    search_parameters = SearchParameters(**search_kwargs)
+    return grid_search_stroke(
+        torch.zeros((28, 28)),
+        InkScoreModel(),
+        0,
+        torch.optim.Adamax,
+        {"lr": 0.03},
+        search_parameters,
+        max_length=20,
+    )
+
+
+def test_defaults_run_every_step():
+    parameters = SearchParameters()
+    assert parameters.patience is None
+    assert parameters.score_threshold is None
+    assert parameters.prune_step is None
+    assert parameters.warm_start_prune_step is None
+
+    _score, _keypoints, num_steps = search()
+    assert num_steps == 40
+
+
+def test_seed_reproducibility():
+    score_a, keypoints_a, num_steps_a = search(prune_step=10)
+    score_b, keypoints_b, num_steps_b = search(prune_step=10)
+
+    assert num_steps_a == num_steps_b
+    assert float(score_a) == float(score_b)
+    assert torch.equal(keypoints_a, keypoints_b)
+
+
+def test_score_threshold_stops_early():
+    _score, _keypoints, num_steps = search()
+    score, _keypoints, early_num_steps = search(score_threshold=0.0)
+
+    assert early_num_steps == 1 < num_steps
+
+
+def test_patience_stops_once_converged():
+    # the first step sets each candidate's best score, after which no candidate
+    # can improve by more than 1.0, so each converges `patience` steps later
+    _score, _keypoints, num_steps = search(patience=5, min_score_delta=1.0)
+    assert num_steps == 1 + 5
+
+
+def test_pruning_converges_to_best_candidate():
+    score, keypoints, num_steps = search(prune_step=5)
+    unpruned_score, _keypoints, _num_steps = search()
+
+    assert num_steps == 40
+    assert keypoints.shape == (4, 2)
+    assert float(score) >= float(unpruned_score) - 0.05
+
+
+class FakeClock:
+    """
+    Advances by one second each time it is read
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        now = self.now
+        self.now += 1.0
+        return now
+
+
+@pytest.mark.parametrize("time_limit", [0.0, 1e-6])
+@pytest.mark.parametrize("return_best", [True, False])
+def test_time_limit_stops_after_first_step(time_limit, return_best):
+    score, keypoints, num_steps = search(time_limit=time_limit, return_best=return_best)
+    one_step_score, one_step_keypoints, _num_steps = search(max_steps=1, return_best=return_best)
+
+    assert num_steps == 1
+    assert float(score) == float(one_step_score)
+    assert torch.equal(keypoints, one_step_keypoints)
+
+
+@pytest.mark.parametrize("return_best", [True, False])
+def test_time_limit_returns_like_finished_search(monkeypatch, return_best):
+    # the deadline is read once before the first step and once after each step
+    monkeypatch.setattr(search_module, "time", FakeClock())
+    score, keypoints, num_steps = search(time_limit=2.5, return_best=return_best)
+    monkeypatch.undo()
+
+    three_step_score, three_step_keypoints, _num_steps = search(max_steps=3, return_best=return_best)
+
+    assert num_steps == 3
+    assert float(score) == float(three_step_score)
+    assert torch.equal(keypoints, three_step_keypoints)
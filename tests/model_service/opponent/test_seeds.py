@@ -0,0 +1,168 @@
+import pytest
+import torch
+
+from competitive_drawing.model_service.opponent import (
+    grid_search_stroke,
+    get_seed_keypoints,
+    SearchParameters,
+)
+from competitive_drawing.model_service.opponent import search as search_module
+from competitive_drawing.model_service.opponent.seeds import (
+    get_continuation_keypoints,
+    get_saliency_keypoints,
+)
+
+
+class InkScoreModel(torch.nn.Module):
+    """
+    Scores canvases by the amount of ink in their top left quadrant
+    """
+    def __init__(self):
+        super().__init__()
+        self.weight = torch.nn.Parameter(torch.tensor(0.05))
+
+    def forward(self, images: torch.Tensor):
+        ink = images[:, 0, :images.shape[2] // 2, :images.shape[3] // 2].sum(dim=(1, 2))
+        logits = torch.stack([ink * self.weight, -ink * self.weight], dim=1)
+        return logits, torch.softmax(logits, dim=1)
+
+
+class ConstantScoreModel(torch.nn.Module):
+    """
+    Ignores the canvas, so its saliency is zero everywhere
+    """
+    def forward(self, images: torch.Tensor):
+        logits = torch.zeros((len(images), 2)) + 0.0 * images.sum()
+        return logits, torch.softmax(logits, dim=1)
+
+
+PREVIOUS_KEYPOINTS = torch.tensor([[0.1, 0.1], [0.2, 0.2], [0.3, 0.3], [0.4, 0.4]])
+
+
+def test_continuation_keypoints():
+    seeds = get_continuation_keypoints(PREVIOUS_KEYPOINTS, 0.3)
+
+    assert seeds.shape == (3, 4, 2)
+    assert torch.allclose(seeds[0], PREVIOUS_KEYPOINTS)
+
+    # translated to start at the previous endpoint
+    assert torch.allclose(seeds[1][0], PREVIOUS_KEYPOINTS[-1])
+    assert torch.allclose(seeds[1] - seeds[1][0], PREVIOUS_KEYPOINTS - PREVIOUS_KEYPOINTS[0])
+
+    # straight continuation along the final direction
+    assert torch.allclose(seeds[2][0], PREVIOUS_KEYPOINTS[-1])
+    assert torch.allclose(torch.norm(seeds[2][-1] - seeds[2][0]), torch.tensor(0.3))
+
+
+def test_continuation_keypoints_are_clamped():
+    previous_keypoints = torch.tensor([[0.6, 0.6], [0.7, 0.7], [0.8, 0.8], [0.9, 0.9]])
+    seeds = get_continuation_keypoints(previous_keypoints, 0.5)
+
+    assert torch.all(seeds >= 0.0)
+    assert torch.all(seeds <= 1.0)
+    assert torch.allclose(seeds[1][-1], torch.tensor([1.0, 1.0]))
+    assert torch.allclose(seeds[2][-1], torch.tensor([1.0, 1.0]))
+
+
+def test_saliency_keypoints_follow_saliency():
+    seeds = get_saliency_keypoints(torch.zeros((28, 28)), InkScoreModel(), 0, 3, 4, 0.2, seed=0)
+
+    assert 0 < len(seeds) <= 3
+    assert seeds.shape[1:] == (4, 2)
+    assert torch.all(seeds >= 0.0)
+    assert torch.all(seeds <= 1.0)
+
+    # seeds are centered where ink increases the score
+    centers = seeds.mean(dim=1)
+    assert torch.all(centers < 0.5)
+
+
+def test_saliency_keypoints_are_reproducible():
+    seeds_a = get_saliency_keypoints(torch.zeros((28, 28)), InkScoreModel(), 0, 3, 4, 0.2, seed=0)
+    seeds_b = get_saliency_keypoints(torch.zeros((28, 28)), InkScoreModel(), 0, 3, 4, 0.2, seed=0)
+
+    assert torch.equal(seeds_a, seeds_b)
+
+
+@pytest.mark.parametrize(
+    "score_model,num_seeds",
+    [
+        (ConstantScoreModel(), 3),  # no saliency
+        (InkScoreModel(), 0),
+    ],
+)
+def test_saliency_keypoints_without_seeds(score_model, num_seeds):
+    seeds = get_saliency_keypoints(torch.zeros((28, 28)), score_model, 0, num_seeds, 4, 0.2)
+
+    assert seeds.shape == (0, 4, 2)
+
+
+def test_seed_keypoints_with_previous_keypoints():
+    search_parameters = SearchParameters(num_saliency_seeds=2, seed=0)
+    seeds = get_seed_keypoints(
+        torch.zeros((28, 28)), InkScoreModel(), 0, search_parameters, 5.6, PREVIOUS_KEYPOINTS
+    )
+
+    assert seeds.shape == (3 + 2, 4, 2)
+    assert torch.allclose(seeds[0], PREVIOUS_KEYPOINTS)
+
+
+@pytest.mark.parametrize(
+    "previous_keypoints",
+    [
+        None,
+        torch.zeros((3, 2)),  # keypoints of a different search configuration
+    ],
+)
+def test_seed_keypoints_without_previous_keypoints(previous_keypoints):
+    search_parameters = SearchParameters(num_saliency_seeds=2, seed=0)
+    seeds = get_seed_keypoints(
+        torch.zeros((28, 28)), InkScoreModel(), 0, search_parameters, 5.6, previous_keypoints
+    )
+
+    assert seeds.shape == (2, 4, 2)
+
+
+def test_search_from_seed_keypoints(monkeypatch):
+    initial_inputs = []
+    prune_steps = []
+
+    class RecordingStrokeScoreModel(search_module.StrokeScoreModel):
+        def __init__(self, base_canvas, inputs, *args, **kwargs):
+            initial_inputs.append(inputs.clone())  # inputs are optimized in place
+            super().__init__(base_canvas, inputs, *args, **kwargs)
+
+        def prune(self, keep_indices):
+            prune_steps.append(len(keep_indices))
+            super().prune(keep_indices)
+
+    monkeypatch.setattr(search_module, "StrokeScoreModel", RecordingStrokeScoreModel)
+
+    seed_keypoints = get_continuation_keypoints(PREVIOUS_KEYPOINTS, 0.3)
+    search_parameters = SearchParameters(
+        grid_shape=(3, 3),
+        warm_start_grid_shape=(2, 2),
+        max_steps=10,
+        prune_step=None,
+        warm_start_prune_step=5,
+        seed=0,
+    )
+    score, keypoints, num_steps = grid_search_stroke(
+        torch.zeros((28, 28)),
+        InkScoreModel(),
+        0,
+        torch.optim.Adamax,
+        {"lr": 0.03},
+        search_parameters,
+        seed_keypoints=seed_keypoints,
+        max_length=20,
+    )
+
+    # seeds are searched first, alongside the smaller warm start grid
+    assert initial_inputs[0].shape == (3 + 2 * 2, 4, 2)
+    assert torch.allclose(initial_inputs[0][:3], seed_keypoints)
+
+    # warm started searches prune at `warm_start_prune_step`
+    assert prune_steps == [round(7 * search_parameters.prune_keep_fraction)]
+    assert num_steps == 10
+    assert keypoints.shape == (4, 2)
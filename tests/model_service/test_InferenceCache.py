@@ -0,0 +1,112 @@
+import types
+
+import pytest
+import torch
+from PIL import Image
+
+from competitive_drawing.model_service import InferenceCache as inference_cache_module
+from competitive_drawing.model_service.InferenceCache import InferenceCache, get_model_version
+from competitive_drawing.model_service.Inferencer import Inferencer
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=0.0)
+    clock.monotonic = lambda: clock.now
+    monkeypatch.setattr(inference_cache_module, "time", clock)
+
+    return clock
+
+
+class CountingModel(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.weight = torch.nn.Parameter(torch.tensor(1.0))
+        self.num_inputs = 0
+
+    def forward(self, batch):
+        self.num_inputs += len(batch)
+        outputs = batch.mean(dim=(1, 2, 3))[:, None].repeat(1, 2) * self.weight
+        return outputs, outputs
+
+
+def test_hits_and_misses(clock):
+    inference_cache = InferenceCache(max_entries=4, ttl=10.0)
+    key = InferenceCache.get_key("cat-dog", "v1", b"canvas")
+
+    assert inference_cache.get(key) is None
+    inference_cache.put(key, [0.25, 0.75])
+    assert inference_cache.get(key) == [0.25, 0.75]
+    assert inference_cache.get(InferenceCache.get_key("cat-dog", "v1", b"other canvas")) is None
+
+    assert inference_cache.get_stats() == {"hits": 1, "misses": 2, "size": 1}
+
+
+def test_entries_expire(clock):
+    inference_cache = InferenceCache(max_entries=4, ttl=10.0)
+    inference_cache.put("key", [0.25, 0.75])
+
+    clock.now = 10.0
+    assert inference_cache.get("key") == [0.25, 0.75]
+
+    clock.now = 10.5
+    assert inference_cache.get("key") is None
+    assert inference_cache.get_stats() == {"hits": 1, "misses": 1, "size": 0}
+
+
+def test_least_recently_used_are_evicted(clock):
+    inference_cache = InferenceCache(max_entries=2, ttl=10.0)
+    inference_cache.put("a", [0.0])
+    inference_cache.put("b", [1.0])
+
+    # reading "a" makes "b" the least recently used
+    assert inference_cache.get("a") == [0.0]
+    inference_cache.put("c", [2.0])
+
+    assert inference_cache.get("b") is None
+    assert inference_cache.get("a") == [0.0]
+    assert inference_cache.get("c") == [2.0]
+
+
+def test_zero_max_entries_disables_cache(clock):
+    inference_cache = InferenceCache(max_entries=0, ttl=10.0)
+    inference_cache.put("key", [0.25, 0.75])
+
+    assert inference_cache.get("key") is None
+    assert inference_cache.get_stats()["size"] == 0
+
+
+def test_model_version_changes_with_weights():
+    model = CountingModel()
+    same_model = CountingModel()
+    other_model = CountingModel()
+    with torch.no_grad():
+        other_model.weight.fill_(2.0)
+
+    assert get_model_version(model) == get_model_version(same_model)
+    assert get_model_version(model) != get_model_version(other_model)
+
+
+def test_inferencer_reuses_cached_outputs():
+    inference_cache = InferenceCache(max_entries=4, ttl=10.0)
+    model = CountingModel()
+    other_model = CountingModel()
+    with torch.no_grad():
+        other_model.weight.fill_(2.0)
+
+    inferencer = Inferencer(model, "cat-dog", inference_cache=inference_cache)
+    other_inferencer = Inferencer(other_model, "cat-dog", inference_cache=inference_cache)
+    try:
+        image = Image.new("L", (50, 50), 0)
+        outputs = inferencer.infer_image(image)
+        assert inferencer.infer_image(image.copy()) == outputs
+        assert model.num_inputs == 1
+
+        # a different model version misses the shared cache
+        assert other_inferencer.infer_image(image) == [2 * output for output in outputs]
+        assert other_model.num_inputs == 1
+        assert inference_cache.get_stats() == {"hits": 1, "misses": 2, "size": 2}
+
+    finally:
+        inferencer.close()
+        other_inferencer.close()
@@ -0,0 +1,45 @@
+import pytest
+import torch
+from PIL import Image
+
+from competitive_drawing.model_service import Inferencer as inferencer_module
+
+
+@pytest.mark.parametrize("warm_start", [True, False])
+def test_search_stroke_warm_start(monkeypatch, warm_start):
+    seed_keypoints = torch.zeros((3, 4, 2))
+    searched_seed_keypoints = []
+
+    def grid_search_stroke(*args, seed_keypoints=None, **kwargs):
+        searched_seed_keypoints.append(seed_keypoints)
+        return torch.tensor(0.5), torch.rand((4, 2)), 1
+
+    monkeypatch.setattr(inferencer_module, "get_seed_keypoints", lambda *args: seed_keypoints)
+    monkeypatch.setattr(inferencer_module, "grid_search_stroke", grid_search_stroke)
+
+    _stroke_samples, keypoints, score, num_steps = inferencer_module.search_stroke(
+        None, Image.new("L", (50, 50)), 0, 1.0, 10.0, warm_start=warm_start
+    )
+
+    assert searched_seed_keypoints == [seed_keypoints if warm_start else None]
+    assert keypoints.shape == (4, 2)
+    assert (score, num_steps) == (0.5, 1)
+
+
+def test_search_stroke_stops_early_by_default(monkeypatch):
+    searched_parameters = []
+
+    def grid_search_stroke(base_canvas, model, target_index, optimizer_class, optimizer_kwargs, search_parameters, **kwargs):
+        searched_parameters.append(search_parameters)
+        return torch.tensor(0.5), torch.rand((4, 2)), 1
+
+    monkeypatch.setattr(inferencer_module, "grid_search_stroke", grid_search_stroke)
+
+    inferencer_module.search_stroke(None, Image.new("L", (50, 50)), 0, 1.0, 10.0, warm_start=False)
+
+    # search parameters are neutral, early stopping and pruning are enabled by the settings
+    (search_parameters, ) = searched_parameters
+    assert search_parameters.patience is not None
+    assert search_parameters.score_threshold is not None
+    assert search_parameters.prune_step is not None
+    assert search_parameters.warm_start_prune_step is not None
@@ -0,0 +1,57 @@
+import numpy
+import pytest
+import torch
+from PIL import Image
+
+from competitive_drawing.model_service.InputPreprocessor import InputPreprocessor
+from competitive_drawing.model_service.utils import pil_to_input
+
+
+MODES = ["RGB", "RGBA", "L", "LA", "P"]
+SIZES = [28, 50, 64]
+
+
+def get_image(mode: str, size: int, seed: int = 0) -> Image.Image:
+    rng = numpy.random.default_rng(seed)
+    image = Image.fromarray(rng.integers(0, 256, (size, size, 4), dtype=numpy.uint8), "RGBA")
+    if mode == "P":
+        return image.convert("RGB").quantize(colors=64)
+
+    return image.convert(mode)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("mode", MODES)
+def test_matches_pil_to_input(mode, size):
+    images = [get_image(mode, size, seed) for seed in range(3)]
+    preprocessor = InputPreprocessor(image_size=size, max_batch_size=4, device="cpu")
+
+    batch = preprocessor(images)
+
+    assert batch.shape == (3, 1, size, size)
+    assert torch.equal(batch, torch.cat([pil_to_input(image).cpu() for image in images]))
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_inverted_channels_and_tensors_match_images(mode):
+    images = [get_image(mode, 28, seed) for seed in range(3)]
+    preprocessor = InputPreprocessor(image_size=28, max_batch_size=4, device="cpu")
+    expected = preprocessor(images).clone()  # batches are views of the buffer
+
+    batch = preprocessor([
+        images[0],
+        preprocessor.invert_image(images[1]),
+        pil_to_input(images[2]).cpu(),
+    ])
+
+    assert torch.equal(batch, expected)
+
+
+def test_rejects_wrong_size_and_large_batches():
+    preprocessor = InputPreprocessor(image_size=28, max_batch_size=2, device="cpu")
+
+    with pytest.raises(ValueError):
+        preprocessor([get_image("RGB", 50)])
+
+    with pytest.raises(ValueError):
+        preprocessor([get_image("RGB", 28)] * 3)
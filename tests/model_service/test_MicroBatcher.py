@@ -0,0 +1,132 @@
+import time
+import pytest
+import threading
+
+from competitive_drawing.model_service.MicroBatcher import MicroBatcher
+
+
+def double_batch(items):
+    time.sleep(0.001)
+    return [item * 2 for item in items]
+
+
+def test_submit_batches_results():
+    batcher = MicroBatcher(double_batch, max_batch_size=4, max_wait=0.01, result_timeout=5.0)
+    results = {}
+
+    def submit(item):
+        results[item] = batcher.submit(item)
+
+    threads = [threading.Thread(target=submit, args=(item, )) for item in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert results == {item: item * 2 for item in range(16)}
+
+
+def test_submit_after_close_raises():
+    batcher = MicroBatcher(double_batch, max_batch_size=4, max_wait=0.01, result_timeout=5.0)
+    batcher.close()
+
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
+
+
+def test_concurrent_submit_and_close():
+    for _ in range(20):
+        batcher = MicroBatcher(double_batch, max_batch_size=3, max_wait=0.001, result_timeout=5.0)
+        outcomes = []
+        outcomes_lock = threading.Lock()
+        start = threading.Barrier(17)
+
+        def submit(item):
+            start.wait()
+            try:
+                outcome = batcher.submit(item) == item * 2
+            except RuntimeError:
+                outcome = "closed"
+            with outcomes_lock:
+                outcomes.append(outcome)
+
+        threads = [threading.Thread(target=submit, args=(item, )) for item in range(16)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        batcher.close()
+
+        # no caller hangs, and every caller either gets its result or is told the batcher closed
+        for thread in threads:
+            thread.join(timeout=5.0)
+            assert not thread.is_alive()
+        assert len(outcomes) == 16
+        assert all(outcome is True or outcome == "closed" for outcome in outcomes)
+
+
+def test_close_processes_submitted_requests():
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_batch(items):
+        started.set()
+        release.wait()
+        return items
+
+    batcher = MicroBatcher(slow_batch, max_batch_size=1, max_wait=0.0, result_timeout=5.0)
+    results = []
+    threads = [
+        threading.Thread(target=lambda item=item: results.append(batcher.submit(item)))
+        for item in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    started.wait()
+    while batcher._queue.qsize() < 2:  # remaining requests are queued
+        time.sleep(0.001)
+
+    closer = threading.Thread(target=batcher.close)
+    closer.start()
+    release.set()
+    closer.join(timeout=5.0)
+    for thread in threads:
+        thread.join(timeout=5.0)
+
+    assert sorted(results) == [0, 1, 2]
+
+
+def test_close_fails_pending_requests_after_timeout():
+    release = threading.Event()
+    batcher = MicroBatcher(lambda items: release.wait() and items, max_batch_size=1, max_wait=0.0, result_timeout=5.0)
+    outcomes = []
+
+    def submit(item):
+        try:
+            outcomes.append(batcher.submit(item))
+        except RuntimeError:
+            outcomes.append("closed")
+
+    threads = [threading.Thread(target=submit, args=(item, )) for item in range(3)]
+    for thread in threads:
+        thread.start()
+    while batcher._queue.qsize() < 2:
+        time.sleep(0.001)
+
+    batcher.close(timeout=0.05)  # the first request is still being processed
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5.0)
+
+    assert sorted(outcomes, key=str) == [0, "closed", "closed"]
+
+
+def test_submit_times_out():
+    release = threading.Event()
+    batcher = MicroBatcher(lambda items: release.wait() and items, max_batch_size=1, max_wait=0.0, result_timeout=0.05)
+
+    with pytest.raises(TimeoutError):
+        batcher.submit(1)
+
+    release.set()
+    batcher.close()
@@ -0,0 +1,92 @@
+import io
+import threading
+
+import pytest
+import torch
+from PIL import Image
+
+try:
+    import cairocffi
+except (ImportError, OSError):  # cairocffi raises OSError if libcairo is missing
+    pytest.skip("cairo is not available", allow_module_level=True)
+
+from competitive_drawing import SETTINGS
+from competitive_drawing.model_service.StrokeRasterizer import StrokeRasterizer, StrokeRasterizerPool
+from competitive_drawing.model_service.utils import pil_to_input
+from competitive_drawing.web_app.game.base import _draw_strokes
+
+
+STROKES = [
+    [(10.0, 10.0), (50.0, 50.0), (60.0, 20.0)],
+    [(80.0, 80.0), (20.0, 90.0)],
+]
+
+
+def get_client_preview_input(strokes) -> torch.Tensor:
+    # render the canvas with the clients' line style, then downscale and pad
+    # it onto the preview as `DrawingBoard.updatePreview` does
+    canvas = Image.new("RGB", (SETTINGS.canvas_size, SETTINGS.canvas_size), "white")
+    _draw_strokes(canvas, strokes)
+
+    inner_size = SETTINGS.image_size - SETTINGS.image_padding
+    preview = Image.new("RGB", (SETTINGS.image_size, SETTINGS.image_size), "white")
+    preview.paste(
+        canvas.resize((inner_size, inner_size), Image.LANCZOS),
+        (SETTINGS.image_padding, SETTINGS.image_padding)
+    )
+
+    preview_png = io.BytesIO()
+    preview.save(preview_png, format="PNG")
+    return pil_to_input(Image.open(io.BytesIO(preview_png.getvalue()))).cpu()
+
+
+def get_centroid(input: torch.Tensor) -> torch.Tensor:
+    image = input[0, 0]
+    ys, xs = torch.meshgrid(
+        torch.arange(image.shape[0], dtype=torch.float),
+        torch.arange(image.shape[1], dtype=torch.float),
+        indexing="ij",
+    )
+    return torch.stack([(xs * image).sum(), (ys * image).sum()]) / image.sum()
+
+
+def test_matches_client_preview():
+    input = StrokeRasterizer(static_crop=True)(STROKES)
+    preview_input = get_client_preview_input(STROKES)
+
+    assert input.shape == preview_input.shape
+    assert (input - preview_input).abs().mean() < 0.05
+    assert 0.5 < input.sum() / preview_input.sum() < 2.0
+    assert torch.allclose(get_centroid(input), get_centroid(preview_input), atol=1.0)
+
+
+def test_pool_inputs_are_not_overwritten():
+    pool = StrokeRasterizerPool()
+
+    first_input = pool(STROKES[:1])
+    first_input_copy = first_input.clone()
+    second_input = pool(STROKES[1:])
+
+    assert len(pool) == 1  # rasterizer was reused
+    assert torch.equal(first_input, first_input_copy)
+    assert not torch.equal(first_input, second_input)
+
+
+def test_pool_is_thread_safe():
+    pool = StrokeRasterizerPool()
+    expected = [StrokeRasterizer()([stroke]).clone() for stroke in STROKES]
+
+    mismatches = []
+    def rasterize(index: int):
+        for _ in range(50):
+            if not torch.equal(pool([STROKES[index]]), expected[index]):
+                mismatches.append(index)
+
+    threads = [threading.Thread(target=rasterize, args=(index % len(STROKES), )) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert mismatches == []
+    assert 1 <= len(pool) <= len(threads)
@@ -0,0 +1,87 @@
+import json
+import threading
+import pytest
+import torch
+from concurrent.futures import ThreadPoolExecutor
+
+from competitive_drawing.model_service import StrokeSearchPool as stroke_search_pool_module
+from competitive_drawing.model_service.StrokeSearchPool import StrokeSearchPool
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def _make_pool(**kwargs):
+        pool = StrokeSearchPool(num_workers=1, **kwargs)
+        pool._executor.shutdown()  # no worker processes are spawned before the first submit
+        pool._executor = ThreadPoolExecutor(max_workers=1)
+        pools.append(pool)
+
+        return pool
+
+    yield _make_pool
+
+    for pool in pools:
+        pool.shutdown()
+
+
+def search(pool: StrokeSearchPool, room_id: str):
+    # callbacks run in order, so the pool's callback has finished once this one runs
+    done = threading.Event()
+    pool.submit("cat-dog", room_id, None, 0, 1.0, 10.0).add_done_callback(lambda future: done.set())
+    assert done.wait(timeout=10)
+
+
+@pytest.fixture
+def posts(monkeypatch):
+    posts = []
+    monkeypatch.setattr(stroke_search_pool_module, "post", lambda url, **kwargs: posts.append((url, kwargs)))
+    monkeypatch.setattr(stroke_search_pool_module, "run_async", lambda function, *args: function(*args))
+
+    return posts
+
+
+def test_failed_search_is_reported(make_pool, posts, monkeypatch):
+    def search_and_send_stroke(*args):
+        raise RuntimeError("search failed")
+
+    monkeypatch.setattr(stroke_search_pool_module, "_search_and_send_stroke", search_and_send_stroke)
+    pool = make_pool()
+
+    future = pool.submit("cat-dog", "room", None, 0, 1.0, 10.0)
+    with pytest.raises(RuntimeError):
+        future.result()
+    pool._executor.shutdown(wait=True)  # wait for done callbacks
+
+    assert len(posts) == 1
+    url, kwargs = posts[0]
+    assert url.endswith("/ai_stroke_failed")
+    assert json.loads(kwargs["data"]) == {"roomId": "room", "error": "search failed"}
+    assert pool._room_keypoints == {}
+
+    # the failed search's slot is released
+    assert pool._slots.acquire(blocking=False)
+
+
+def test_room_keypoints_are_evicted_least_recently_searched_first(make_pool, posts, monkeypatch):
+    previous_keypoints = {}
+
+    def search_and_send_stroke(label_pair_str, room_id, *args):
+        previous_keypoints[room_id] = args[-1]
+        return torch.full((4, 2), float(ord(room_id)))
+
+    monkeypatch.setattr(stroke_search_pool_module, "_search_and_send_stroke", search_and_send_stroke)
+    pool = make_pool(max_warm_start_rooms=2)
+
+    for room_id in ["a", "b", "a", "c"]:
+        search(pool, room_id)
+
+    # "b" was searched least recently when "c" was added
+    assert list(pool._room_keypoints) == ["a", "c"]
+    assert torch.equal(previous_keypoints["a"], torch.full((4, 2), float(ord("a"))))
+
+    search(pool, "b")
+    assert previous_keypoints["b"] is None
+    assert list(pool._room_keypoints) == ["c", "b"]
+    assert posts == []
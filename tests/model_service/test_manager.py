@@ -0,0 +1,76 @@
+import time
+import pytest
+import torch
+from PIL import Image
+
+from competitive_drawing.model_service.manager import ModelManager
+from competitive_drawing.model_service.ModelCache import ModelCache
+
+
+class ConstantModel(torch.nn.Module):
+    def forward(self, batch):
+        outputs = torch.zeros(len(batch), 2)
+        return outputs, outputs
+
+
+@pytest.fixture
+def model_manager():
+    model_manager = ModelManager()
+    model_manager.model_cache = ModelCache(load_function=lambda label_pair_str: ConstantModel())
+    yield model_manager
+
+    for label_pair_str in list(model_manager.inferencers):
+        model_manager.stop_inferencer(label_pair_str, grace_period=0)
+
+
+def test_scale_sums_shards(model_manager):
+    model_manager.scale({"cat-dog": 1, "apple-bear": 2}, client_id="0")
+    model_manager.scale({"cat-dog": 3}, client_id="1")
+
+    assert model_manager.client_label_pair_games == {
+        "0": {"cat-dog": 1, "apple-bear": 2},
+        "1": {"cat-dog": 3},
+    }
+    assert model_manager.label_pair_games == {"cat-dog": 4, "apple-bear": 2}
+    assert set(model_manager.inferencers) == {"cat-dog", "apple-bear"}
+
+
+def test_snapshot_replaces_only_its_shard(model_manager):
+    model_manager.scale({"cat-dog": 1, "apple-bear": 2}, client_id="0")
+    model_manager.scale({"cat-dog": 3}, client_id="1")
+
+    # shard 0 restarted without games
+    model_manager.scale({}, client_id="0")
+
+    assert model_manager.client_label_pair_games == {"0": {}, "1": {"cat-dog": 3}}
+    assert model_manager.label_pair_games == {"cat-dog": 3}
+    assert set(model_manager.inferencers) == {"cat-dog"}
+
+
+def test_update_games_per_shard(model_manager):
+    model_manager.scale({"cat-dog": 1}, client_id="0")
+    model_manager.update_games({"cat-dog": 2}, client_id="1")
+    model_manager.update_games({"cat-dog": -1}, client_id="0")
+
+    assert model_manager.client_label_pair_games == {"0": {"cat-dog": 0}, "1": {"cat-dog": 2}}
+    assert model_manager.label_pair_games == {"cat-dog": 2}
+    assert set(model_manager.inferencers) == {"cat-dog"}
+
+    model_manager.update_games({"cat-dog": -2}, client_id="1")
+    assert model_manager.label_pair_games == {"cat-dog": 0}
+    assert model_manager.inferencers == {}
+
+
+def test_stopped_inferencer_serves_requests_during_grace_period(model_manager):
+    model_manager.scale({"cat-dog": 1})
+    inferencer = model_manager.inferencers["cat-dog"]
+
+    model_manager.stop_inferencer("cat-dog", grace_period=0.5)
+    assert model_manager.inferencers == {}
+
+    # a request which fetched the inferencer before the scale down
+    assert inferencer.infer_image(Image.new("L", (50, 50))) == [0.0, 0.0]
+
+    time.sleep(1.0)
+    with pytest.raises(RuntimeError):
+        inferencer.infer_image(Image.new("L", (50, 50), 255))
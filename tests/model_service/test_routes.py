@@ -0,0 +1,97 @@
+import io
+import base64
+
+import pytest
+from flask import Flask
+from PIL import Image
+
+from competitive_drawing.model_service import routes
+
+
+class FakeInferencer:
+    def __init__(self):
+        self.calls = []
+
+    def infer_image(self, image):
+        self.calls.append("image")
+        return [1.0, 0.0]
+
+    def infer_strokes(self, strokes):
+        self.calls.append("strokes")
+        return [0.0, 1.0]
+
+
+class ClosedInferencer:
+    def infer_image(self, image):
+        raise RuntimeError("Cannot submit to a closed batcher")
+
+    def infer_strokes(self, strokes):
+        raise RuntimeError("Cannot submit to a closed batcher")
+
+
+class FakeModelManager:
+    def __init__(self):
+        self.inferencer = FakeInferencer()
+
+    def get_inferencer(self, label_pair):
+        return self.inferencer
+
+
+class ScaledDownModelManager(FakeModelManager):
+    def __init__(self):
+        super().__init__()
+        self.held_inferencers = [ClosedInferencer()]  # fetched right before a scale down
+
+    def get_inferencer(self, label_pair):
+        if len(self.held_inferencers) > 0:
+            return self.held_inferencers.pop()
+
+        return self.inferencer
+
+
+def get_image_data_url() -> str:
+    image_io = io.BytesIO()
+    Image.new("RGB", (50, 50), "white").save(image_io, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(image_io.getvalue()).decode("utf-8")
+
+
+@pytest.fixture
+def client_and_inferencer():
+    model_manager = FakeModelManager()
+    app = Flask(__name__)
+    app.register_blueprint(routes.make_routes_blueprint(model_manager, None))
+
+    return app.test_client(), model_manager.inferencer
+
+
+@pytest.mark.parametrize(
+    "rasterizer_available,request_data,expected_call",
+    [
+        (True, {"strokes": [], "imageDataUrl": True}, "strokes"),
+        (False, {"strokes": [], "imageDataUrl": True}, "image"),
+        (False, {"strokes": []}, "strokes"),
+        (True, {"imageDataUrl": True}, "image"),
+    ],
+)
+def test_infer_falls_back_to_preview(client_and_inferencer, monkeypatch, rasterizer_available, request_data, expected_call):
+    client, inferencer = client_and_inferencer
+    monkeypatch.setattr(routes, "is_stroke_rasterizer_available", lambda: rasterizer_available)
+    if "imageDataUrl" in request_data:
+        request_data["imageDataUrl"] = get_image_data_url()
+
+    response = client.post("/infer", json={"label_pair": ["cat", "dog"], **request_data})
+
+    assert response.status_code == 200
+    assert inferencer.calls == [expected_call]
+
+
+def test_infer_retries_closed_inferencer(monkeypatch):
+    model_manager = ScaledDownModelManager()
+    app = Flask(__name__)
+    app.register_blueprint(routes.make_routes_blueprint(model_manager, None))
+    monkeypatch.setattr(routes, "is_stroke_rasterizer_available", lambda: True)
+
+    response = app.test_client().post("/infer", json={"label_pair": ["cat", "dog"], "strokes": []})
+
+    assert response.status_code == 200
+    assert model_manager.inferencer.calls == ["strokes"]
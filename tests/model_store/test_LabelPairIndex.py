@@ -0,0 +1,53 @@
+import pytest
+
+from competitive_drawing.model_store import LabelPairIndex
+
+
+class FakeModelStore:
+    def __init__(self, responses):
+        self.responses = responses
+        self.num_calls = 0
+
+    def list_label_pairs(self):
+        response = self.responses[min(self.num_calls, len(self.responses) - 1)]
+        self.num_calls += 1
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def make_index(responses) -> LabelPairIndex:
+    index = LabelPairIndex(FakeModelStore(responses), refresh_period=3600)
+    index._attempted.wait(5)
+    return index
+
+
+def test_get_returns_label_pairs():
+    index = make_index([[["cat", "dog"]]])
+
+    assert index.get(timeout=5) == [["cat", "dog"]]
+    index.stop()
+
+
+def test_failed_initial_refresh_is_retried():
+    index = make_index([ConnectionError("unreachable"), [["cat", "dog"]]])
+
+    assert index.get(timeout=5) == [["cat", "dog"]]
+    assert index.model_store.num_calls == 2
+    index.stop()
+
+
+def test_failed_initial_refresh_raises():
+    index = make_index([ConnectionError("unreachable")])
+
+    with pytest.raises(RuntimeError, match="unreachable"):
+        index.get(timeout=5)
+    index.stop()
+
+
+def test_failed_refresh_keeps_last_label_pairs():
+    index = make_index([[["cat", "dog"]], ConnectionError("unreachable")])
+    index.refresh()
+
+    assert index.get(timeout=5) == [["cat", "dog"]]
+    index.stop()
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from competitive_drawing.model_store import s3
+
+
+class FakeS3Client:
+    def __init__(self):
+        self.etag = "first"
+        self.num_downloads = 0
+
+    def head_object(self, Bucket, Key):
+        return {"ETag": f'"{self.etag}"'}
+
+    def download_file(self, bucket, key, file_path):
+        self.num_downloads += 1
+        with open(file_path, "w") as file:
+            file.write(self.etag)
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    monkeypatch.setattr(s3.boto3, "client", lambda *args, **kwargs: FakeS3Client())
+    return s3.S3ModelStore("bucket", "models", 60, cache_dir=str(tmp_path))
+
+
+def test_cached_file_is_reused(store, tmp_path):
+    first_path = store.get_state_dict_file("a-b")
+    second_path = store.get_state_dict_file("a-b")
+
+    assert first_path == second_path == str(tmp_path / "a-b" / "first.pth")
+    assert store._client.num_downloads == 1
+
+
+def test_new_etag_removes_stale_files(store, tmp_path):
+    first_path = store.get_state_dict_file("a-b")
+    other_pair_path = store.get_state_dict_file("c-d")
+
+    store._client.etag = "second"
+    second_path = store.get_state_dict_file("a-b")
+
+    assert second_path == str(tmp_path / "a-b" / "second.pth")
+    assert not os.path.exists(first_path)
+    assert os.listdir(tmp_path / "a-b") == ["second.pth"]
+    assert os.path.exists(other_pair_path)  # other label pairs are untouched
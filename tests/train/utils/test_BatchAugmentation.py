@@ -0,0 +1,68 @@
+import pytest
+import torch
+
+from competitive_drawing.train.utils import BatchAugmentation, QuickDrawDataset
+
+
+DEVICES = ["cpu"] + (["cuda"] if torch.cuda.is_available() else [])
+
+
+def get_identity_augmentation(**kwargs) -> BatchAugmentation:
+    kwargs = {"degrees": 0.0, "flip_probability": 0.0, "affine_degrees": 0.0, "shear": 0.0, **kwargs}
+    return BatchAugmentation(**kwargs)
+
+
+def test_identity():
+    torch.manual_seed(0)
+    images = torch.rand((8, 1, 28, 28))
+
+    assert torch.allclose(get_identity_augmentation()(images), images, atol=1e-5)
+
+
+@pytest.mark.parametrize("device", DEVICES)
+@pytest.mark.parametrize("dtype", [torch.float32, torch.float64, torch.uint8])
+def test_preserves_shape_dtype_and_device(device, dtype):
+    images = (torch.rand((8, 1, 28, 28)) * 255).to(dtype=dtype, device=device)
+
+    output = BatchAugmentation(scale=(0.3, 1.0))(images)
+
+    assert output.shape == images.shape
+    assert output.dtype == dtype
+    assert output.device == images.device
+
+
+@pytest.mark.parametrize("scale", [0.3, 0.5, 0.8])
+def test_scale_shrinks_without_clipping(scale):
+    torch.manual_seed(0)
+    images = torch.ones((8, 1, 28, 28))
+
+    output = get_identity_augmentation(scale=(scale, scale))(images)
+
+    # all ink is kept inside the canvas, shrunk by the scale in each dimension
+    ink_fraction = output.sum(dim=(1, 2, 3)) / images[0].numel()
+    assert torch.allclose(ink_fraction, torch.full_like(ink_fraction, scale ** 2), atol=0.05)
+    assert torch.all(output <= 1.0 + 1e-5)
+
+
+def test_value_fills_borders():
+    torch.manual_seed(0)
+    images = torch.zeros((8, 1, 28, 28))
+
+    output = get_identity_augmentation(scale=(0.5, 0.5), value=1.0)(images)
+
+    border_fraction = output.sum(dim=(1, 2, 3)) / images[0].numel()
+    assert torch.allclose(border_fraction, torch.full_like(border_fraction, 1.0 - 0.5 ** 2), atol=0.05)
+
+    # rotated images leave their corners to be filled
+    output = get_identity_augmentation(degrees=45.0, value=1.0)(torch.zeros((8, 1, 28, 28)))
+    assert torch.allclose(output[:, :, 0, 0], torch.ones((8, 1)))
+
+
+def test_test_dataset_is_not_augmented():
+    images = torch.rand((8, 1, 28, 28))
+
+    train_dataset = QuickDrawDataset([0], [0])
+    test_dataset = QuickDrawDataset([0], [0], is_test=True)
+
+    assert not torch.equal(train_dataset.augment_batch(images), images)
+    assert test_dataset.augment_batch(images) is images
@@ -0,0 +1,143 @@
+import pickle
+
+import numpy
+import pytest
+import torch
+
+from competitive_drawing.train.utils import MappedImages, OneHotLabels, load_data
+
+
+IMAGE_SHAPE = (4, 3)
+NUM_IMAGES_PER_CLASS = [5, 1, 7]
+
+
+class ArrayDataset(torch.utils.data.Dataset):
+    # wraps images so that the data loader pickles them into its workers
+    def __init__(self, images: MappedImages):
+        self.images = images
+
+    def __len__(self):
+        return len(self.images)
+
+    def __getitem__(self, index: int):
+        return torch.from_numpy(self.images.get_array(index).copy())
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for class_index, num_images in enumerate(NUM_IMAGES_PER_CLASS):
+        numpy.save(tmp_path / f"class_{class_index}.npy", get_class_images(class_index, num_images))
+
+    return tmp_path
+
+
+def get_class_images(class_index: int, num_images: int) -> numpy.ndarray:
+    num_pixels = IMAGE_SHAPE[0] * IMAGE_SHAPE[1]
+    # unique per class and image, all below 255
+    return (
+        class_index * 50 + numpy.arange(num_images)[:, None] * 5
+        + numpy.arange(num_pixels)[None, :] % 5
+    ).astype(numpy.uint8)
+
+
+def get_expected_images() -> numpy.ndarray:
+    return numpy.concatenate([
+        get_class_images(class_index, num_images)
+        for class_index, num_images in enumerate(NUM_IMAGES_PER_CLASS)
+    ]).reshape(-1, *IMAGE_SHAPE)
+
+
+def get_images(data_dir) -> MappedImages:
+    file_paths = [str(data_dir / f"class_{index}.npy") for index in range(len(NUM_IMAGES_PER_CLASS))]
+    return MappedImages(file_paths, IMAGE_SHAPE)
+
+
+def test_offset_table(data_dir):
+    images = get_images(data_dir)
+    expected = get_expected_images()
+
+    assert images.offsets.tolist() == [0, 5, 6, 13]
+    assert images.num_images_per_file.tolist() == NUM_IMAGES_PER_CLASS
+    assert len(images) == len(expected)
+    assert images.shape == (len(expected), *IMAGE_SHAPE)
+    for index in range(len(images)):
+        assert numpy.array_equal(images.get_array(index), expected[index])
+        assert numpy.array_equal(numpy.asarray(images[index]), expected[index])
+
+    assert numpy.array_equal(images.get_array(-1), expected[-1])
+    with pytest.raises(IndexError):
+        images.get_array(len(images))
+
+
+def test_subsets(data_dir):
+    images = get_images(data_dir)
+    expected = get_expected_images()
+
+    subset = images[numpy.array([12, 0, 5, 6])]
+    assert len(subset) == 4
+    assert subset.arrays is images.arrays  # maps are shared
+    assert numpy.array_equal(subset.get_array(2), expected[5])
+
+    subsubset = subset[1:3]
+    assert [subsubset.get_array(index).tolist() for index in range(2)] == expected[[0, 5]].tolist()
+
+
+def test_wrong_image_shape(data_dir):
+    with pytest.raises(ValueError):
+        MappedImages([str(data_dir / "class_0.npy")], (3, 3))
+
+
+def test_pickle_reopens_maps(data_dir):
+    subset = get_images(data_dir)[numpy.array([7, 1])]
+
+    unpickled = pickle.loads(pickle.dumps(subset))
+
+    assert isinstance(unpickled.arrays[0], numpy.memmap)
+    assert unpickled.offsets.tolist() == subset.offsets.tolist()
+    assert numpy.array_equal(unpickled.get_array(0), subset.get_array(0))
+    assert numpy.array_equal(unpickled.get_array(1), subset.get_array(1))
+
+
+def test_data_loader_worker(data_dir):
+    images = get_images(data_dir)[numpy.arange(3, 9)]
+    data_loader = torch.utils.data.DataLoader(
+        ArrayDataset(images),
+        batch_size=len(images),
+        num_workers=1,
+        multiprocessing_context="spawn",  # pickles the dataset into the worker
+    )
+
+    batch = next(iter(data_loader))
+
+    assert batch.tolist() == get_expected_images()[3:9].tolist()
+
+
+def test_load_data_one_hot(data_dir):
+    class_names = [f"class_{index}" for index in range(len(NUM_IMAGES_PER_CLASS))]
+    images, labels, loaded_class_names = load_data(str(data_dir), IMAGE_SHAPE, class_names, one_hot=True)
+
+    assert loaded_class_names == class_names
+    assert isinstance(labels, OneHotLabels)
+    assert len(images) == len(labels) == sum(NUM_IMAGES_PER_CLASS)
+    assert labels.shape == (sum(NUM_IMAGES_PER_CLASS), len(class_names))
+    assert labels[5].tolist() == [0.0, 1.0, 0.0]
+    assert labels[-1].tolist() == [0.0, 0.0, 1.0]
+
+    integer_images, integer_labels, _ = load_data(str(data_dir), IMAGE_SHAPE, class_names)
+    assert integer_labels.tolist() == [0] * 5 + [1] * 1 + [2] * 7
+    assert len(integer_images) == len(images)
+
+
+def test_one_hot_labels_subsets():
+    labels = OneHotLabels(numpy.array([2, 0, 1, 2]), 3)
+
+    subset = labels[numpy.array([3, 1])]
+    assert isinstance(subset, OneHotLabels)
+    assert subset.shape == (2, 3)
+    assert subset[0].dtype == numpy.float32
+    assert [subset[index].tolist() for index in range(2)] == [[0.0, 0.0, 1.0], [1.0, 0.0, 0.0]]
+    assert labels[1:3][0].tolist() == [1.0, 0.0, 0.0]
+
+    unpickled = pickle.loads(pickle.dumps(labels))
+    assert unpickled.labels.tolist() == labels.labels.tolist()
+    assert unpickled.num_classes == 3
@@ -0,0 +1,177 @@
+import json
+import pickle
+
+import numpy
+import pytest
+from sklearn.model_selection import train_test_split
+
+from competitive_drawing.train_v2.dataset.StrokeArrays import StrokeArrays
+from competitive_drawing.train_v2.dataset.dataset import load_data
+
+
+DRAWINGS = [
+    [[[0, 100, 200], [0, 50, 0]]],
+    [[[10, 20], [30, 40]], [[50, 60, 70], [70, 80, 90]]],
+    [[[255], [255]]],
+    [[[1, 2, 3, 4], [5, 6, 7, 8]], [[9], [10]], [[11, 12], [13, 14]]],
+    [[[7, 8], [9, 10]]],
+]
+
+
+def to_lists(drawing) -> list:
+    # convert a (points, stroke_offsets) drawing back to the Quick, Draw! format
+    points, stroke_offsets = drawing
+    return [
+        [points[start: end, 0].tolist(), points[start: end, 1].tolist()]
+        for start, end in zip(stroke_offsets[:-1], stroke_offsets[1:])
+    ]
+
+
+def assert_drawings_equal(stroke_arrays: StrokeArrays, drawings: list):
+    assert len(stroke_arrays) == len(drawings)
+    assert [to_lists(drawing) for drawing in stroke_arrays] == drawings
+
+
+def write_ndjson(file_path, drawings, recognized=None):
+    recognized = recognized if recognized is not None else [True] * len(drawings)
+    with open(file_path, "w") as file:
+        for drawing, is_recognized in zip(drawings, recognized):
+            file.write(json.dumps({"word": "test", "recognized": is_recognized, "drawing": drawing}) + "\n")
+
+
+@pytest.fixture
+def ndjson_path(tmp_path):
+    ndjson_path = tmp_path / "cat.ndjson"
+    write_ndjson(ndjson_path, DRAWINGS)
+    return str(ndjson_path)
+
+
+def test_from_strokes():
+    stroke_arrays = StrokeArrays.from_strokes(DRAWINGS)
+
+    assert stroke_arrays.points.dtype == numpy.int16
+    assert stroke_arrays.drawing_offsets.tolist() == [0, 1, 3, 4, 7, 8]
+    assert_drawings_equal(stroke_arrays, DRAWINGS)
+
+    with pytest.raises(ValueError):
+        StrokeArrays.from_strokes([[[[40000], [0]]]])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 4096])
+def test_from_ndjson_spill(ndjson_path, tmp_path, chunk_size):
+    in_memory = StrokeArrays.from_ndjson(ndjson_path, chunk_size=chunk_size)
+    spilled = StrokeArrays.from_ndjson(ndjson_path, spill_path=str(tmp_path / "cat.strokes"), chunk_size=chunk_size)
+
+    assert in_memory.file_path is None
+    assert isinstance(spilled.points, numpy.memmap)
+    assert spilled.file_path == str(tmp_path / "cat.strokes")
+    assert_drawings_equal(in_memory, DRAWINGS)
+    assert_drawings_equal(spilled, DRAWINGS)
+
+
+def test_from_ndjson_unrecognized(tmp_path):
+    ndjson_path = tmp_path / "cat.ndjson"
+    write_ndjson(ndjson_path, DRAWINGS, recognized=[True, False, True, False, True])
+
+    assert_drawings_equal(StrokeArrays.from_ndjson(str(ndjson_path)), [DRAWINGS[0], DRAWINGS[2], DRAWINGS[4]])
+    assert_drawings_equal(StrokeArrays.from_ndjson(str(ndjson_path), use_unrecognized=True), DRAWINGS)
+
+
+def test_subsets():
+    stroke_arrays = StrokeArrays.from_strokes(DRAWINGS)
+
+    subset = stroke_arrays[numpy.array([3, 0, 4])]
+    assert subset.points is stroke_arrays.points  # arrays are shared
+    assert_drawings_equal(subset, [DRAWINGS[3], DRAWINGS[0], DRAWINGS[4]])
+    assert_drawings_equal(subset[1:], [DRAWINGS[0], DRAWINGS[4]])
+    assert_drawings_equal(stroke_arrays[::2], DRAWINGS[::2])
+    assert to_lists(subset[-1]) == DRAWINGS[4]
+
+    compacted = subset.compact()
+    assert compacted.indices is None
+    assert len(compacted.points) == 7 + 3 + 2
+    assert_drawings_equal(compacted, [DRAWINGS[3], DRAWINGS[0], DRAWINGS[4]])
+
+    with pytest.raises(IndexError):
+        subset.get_drawing(3)
+
+
+def test_save_and_load(tmp_path):
+    stroke_arrays = StrokeArrays.from_strokes(DRAWINGS)
+
+    stroke_arrays.save(str(tmp_path / "all.strokes"))
+    assert_drawings_equal(StrokeArrays.load(str(tmp_path / "all.strokes")), DRAWINGS)
+
+    stroke_arrays[numpy.array([4, 1])].save(str(tmp_path / "subset.strokes"))
+    assert_drawings_equal(StrokeArrays.load(str(tmp_path / "subset.strokes")), [DRAWINGS[4], DRAWINGS[1]])
+
+    StrokeArrays.from_strokes([]).save(str(tmp_path / "empty.strokes"))
+    assert len(StrokeArrays.load(str(tmp_path / "empty.strokes"))) == 0
+
+    (tmp_path / "invalid.strokes").write_bytes(bytes(StrokeArrays.HEADER_SIZE))
+    with pytest.raises(ValueError):
+        StrokeArrays.load(str(tmp_path / "invalid.strokes"))
+
+
+def test_pickle(ndjson_path, tmp_path):
+    in_memory = StrokeArrays.from_strokes(DRAWINGS)[numpy.array([1, 3])]
+    assert_drawings_equal(pickle.loads(pickle.dumps(in_memory)), [DRAWINGS[1], DRAWINGS[3]])
+
+    spilled = StrokeArrays.from_ndjson(ndjson_path, spill_path=str(tmp_path / "cat.strokes"))[numpy.array([2, 0])]
+    state = spilled.__getstate__()
+    assert state["points"] is None  # maps are reopened rather than copied
+
+    unpickled = pickle.loads(pickle.dumps(spilled))
+    assert isinstance(unpickled.points, numpy.memmap)
+    assert_drawings_equal(unpickled, [DRAWINGS[2], DRAWINGS[0]])
+
+
+def test_concatenate(ndjson_path, tmp_path):
+    in_memory = StrokeArrays.from_strokes(DRAWINGS[:2])
+    spilled = StrokeArrays.from_ndjson(ndjson_path, spill_path=str(tmp_path / "cat.strokes"))
+    subset = spilled[numpy.array([4, 3])]
+    expected = DRAWINGS[:2] + DRAWINGS + [DRAWINGS[4], DRAWINGS[3]]
+
+    concatenated = StrokeArrays.concatenate([in_memory, spilled, subset])
+    assert concatenated.file_path is None
+    assert_drawings_equal(concatenated, expected)
+
+    mapped = StrokeArrays.concatenate_to_file([in_memory, spilled, subset], str(tmp_path / "joined.strokes"), chunk_size=2)
+    assert mapped.file_path == str(tmp_path / "joined.strokes")
+    assert isinstance(mapped.points, numpy.memmap)
+    assert_drawings_equal(mapped, expected)
+    assert mapped.stroke_offsets.tolist() == concatenated.stroke_offsets.tolist()
+    assert mapped.drawing_offsets.tolist() == concatenated.drawing_offsets.tolist()
+
+
+def test_train_test_split():
+    stroke_arrays = StrokeArrays.from_strokes(DRAWINGS)
+    labels = list(range(len(DRAWINGS)))
+
+    train_drawings, test_drawings, train_labels, test_labels = train_test_split(
+        stroke_arrays, labels, test_size=2, random_state=0
+    )
+
+    assert isinstance(train_drawings, StrokeArrays) and isinstance(test_drawings, StrokeArrays)
+    assert len(train_drawings) == 3 and len(test_drawings) == 2
+    assert_drawings_equal(train_drawings, [DRAWINGS[label] for label in train_labels])
+    assert_drawings_equal(test_drawings, [DRAWINGS[label] for label in test_labels])
+
+
+@pytest.mark.parametrize("spill", [False, True])
+def test_load_data(tmp_path, spill):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write_ndjson(data_dir / "cat.ndjson", DRAWINGS[:3])
+    write_ndjson(data_dir / "dog.ndjson", DRAWINGS[3:])
+    spill_dir = tmp_path if spill else None
+
+    images, labels = load_data(str(data_dir), ["cat", "dog"], spill_dir=str(spill_dir) if spill else None)
+
+    assert labels == [0, 0, 0, 1, 1]
+    assert_drawings_equal(images, DRAWINGS)
+    if spill:
+        assert images.file_path == str(tmp_path / "cat-dog.strokes")
+        assert isinstance(images.points, numpy.memmap)
+    else:
+        assert images.file_path is None
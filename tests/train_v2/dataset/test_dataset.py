@@ -0,0 +1,45 @@
+import types
+
+import numpy
+import torch
+
+from competitive_drawing.train.utils import MappedImages
+from competitive_drawing.train_v2.dataset.dataset import QuickDrawDataset, init_worker, make_data_loader
+
+
+def get_pre_rasterized_dataset(tmp_path) -> QuickDrawDataset:
+    numpy.save(tmp_path / "shard.npy", numpy.arange(4 * 28 * 28, dtype=numpy.int64).reshape(4, -1).astype(numpy.uint8))
+    images = MappedImages([str(tmp_path / "shard.npy")], (28, 28))
+    return QuickDrawDataset(images, [0, 1, 1, 0], augment=False)
+
+
+def test_init_worker_skips_rasterizer_for_pre_rasterized(tmp_path, monkeypatch):
+    quick_draw_dataset = get_pre_rasterized_dataset(tmp_path)
+    worker_info = types.SimpleNamespace(dataset=quick_draw_dataset, seed=1)
+    monkeypatch.setattr(torch.utils.data, "get_worker_info", lambda: worker_info)
+
+    init_worker(0)
+
+    assert quick_draw_dataset.pre_rasterized
+    assert quick_draw_dataset.vec_to_raster is None
+
+
+def test_pre_rasterized_data_loader_workers(tmp_path):
+    quick_draw_dataset = get_pre_rasterized_dataset(tmp_path)
+    data_loader = make_data_loader(quick_draw_dataset, batch_size=4, shuffle=False, num_workers=1)
+
+    images, labels = next(iter(data_loader))
+
+    assert images.shape == (4, 1, 28, 28)
+    assert torch.equal(images[2, 0], torch.from_numpy(quick_draw_dataset.images.get_array(2).copy()) / 255)
+    assert labels.argmax(dim=1).tolist() == [0, 1, 1, 0]
+
+
+def test_augment_batch_without_augment(tmp_path):
+    quick_draw_dataset = get_pre_rasterized_dataset(tmp_path)
+    images = torch.rand((4, 1, 28, 28))
+
+    assert quick_draw_dataset.augment_batch(images) is images
+
+    quick_draw_dataset.augment = True
+    assert not torch.equal(quick_draw_dataset.augment_batch(images), images)
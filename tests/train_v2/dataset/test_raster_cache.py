@@ -0,0 +1,110 @@
+import os
+import sys
+import json
+import types
+
+import pytest
+import torch
+
+from competitive_drawing.train.utils import MappedImages
+from competitive_drawing.train_v2.dataset import raster_cache
+from competitive_drawing.train_v2.dataset.raster_cache import INDEX_FILE_NAME, build_class_cache, load_raster_data
+
+
+DRAWINGS = [
+    [[[0, 100, 200], [0, 50, 0]]],
+    [[[10, 20], [30, 40]], [[50, 60], [70, 80]]],
+    [[[255, 0], [255, 0]]],
+]
+
+
+class FakeVecToRaster:
+    # records rasterized drawings, cache logic does not depend on cairo
+    num_calls = 0
+
+    def __init__(self, side, line_diameter, padding, min_scale, max_scale, seed=None):
+        self.side = side
+
+    def __call__(self, vector_image, augment=False):
+        FakeVecToRaster.num_calls += 1
+        points, _stroke_offsets = vector_image
+        return torch.full((self.side, self.side), float(len(points)) / 255), 1.0
+
+
+@pytest.fixture(autouse=True)
+def fake_vec_to_raster(monkeypatch):
+    FakeVecToRaster.num_calls = 0
+    module = types.ModuleType("competitive_drawing.train_v2.dataset.VecToRaster")
+    module.VecToRaster = FakeVecToRaster
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+
+
+def write_ndjson(file_path, drawings):
+    with open(file_path, "w") as file:
+        for drawing in drawings:
+            file.write(json.dumps({"word": "test", "recognized": True, "drawing": drawing}) + "\n")
+
+
+@pytest.fixture
+def source_path(tmp_path):
+    source_path = tmp_path / "cat.ndjson"
+    write_ndjson(source_path, DRAWINGS)
+    return str(source_path)
+
+
+def build(source_path, cache_dir, side=4, shard_size=65536):
+    return build_class_cache(source_path, str(cache_dir), side, 1 / 32, 1 / 32, False, shard_size)
+
+
+def test_cache_key():
+    parameters = {"side": 28, "padding": 0.03125, "source_mtime_ns": 1}
+
+    assert raster_cache._get_cache_key(parameters) == raster_cache._get_cache_key(dict(reversed(parameters.items())))
+    assert raster_cache._get_cache_key(parameters) != raster_cache._get_cache_key({**parameters, "side": 32})
+    assert raster_cache._get_cache_key(parameters) != raster_cache._get_cache_key({**parameters, "source_mtime_ns": 2})
+
+
+def test_cache_is_reused(source_path, tmp_path):
+    key_dir = build(source_path, tmp_path / "cache")
+    assert FakeVecToRaster.num_calls == len(DRAWINGS)
+    assert os.path.exists(os.path.join(key_dir, INDEX_FILE_NAME))
+
+    assert build(source_path, tmp_path / "cache") == key_dir
+    assert FakeVecToRaster.num_calls == len(DRAWINGS)  # not rasterized again
+
+
+def test_changed_parameters_invalidate_cache(source_path, tmp_path):
+    key_dir = build(source_path, tmp_path / "cache", side=4)
+    new_key_dir = build(source_path, tmp_path / "cache", side=8)
+
+    assert new_key_dir != key_dir
+    assert not os.path.exists(key_dir)  # stale cache is removed
+    assert os.listdir(tmp_path / "cache") == [os.path.basename(new_key_dir)]
+
+
+def test_changed_source_invalidates_cache(source_path, tmp_path):
+    key_dir = build(source_path, tmp_path / "cache")
+
+    write_ndjson(source_path, DRAWINGS[:2])
+    stat = os.stat(source_path)
+    os.utime(source_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    new_key_dir = build(source_path, tmp_path / "cache")
+
+    assert new_key_dir != key_dir
+    assert not os.path.exists(key_dir)
+    with open(os.path.join(new_key_dir, INDEX_FILE_NAME)) as index_file:
+        assert json.load(index_file)["shard_lengths"] == [2]
+
+
+def test_load_raster_data(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write_ndjson(data_dir / "cat.ndjson", DRAWINGS)
+    write_ndjson(data_dir / "dog.ndjson", DRAWINGS[:1])
+
+    images, labels = load_raster_data(str(data_dir), ["cat", "dog"], str(tmp_path / "cache"), side=4, shard_size=2)
+
+    assert isinstance(images, MappedImages)
+    assert labels.tolist() == [0, 0, 0, 1]
+    assert len(images.file_paths) == 3  # cat is split into two shards
+    assert [int(images.get_array(index)[0, 0]) for index in range(len(images))] == [3, 4, 2, 3]
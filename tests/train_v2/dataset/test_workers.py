@@ -0,0 +1,78 @@
+import os
+import sys
+import types
+import pickle
+import random
+import threading
+
+import pytest
+import torch
+
+from competitive_drawing.train_v2.dataset.dataset import QuickDrawDataset, make_data_loader
+
+
+class FakeVecToRaster:
+    # draws one augmentation value per image, like the cairo rasterizer's rng
+    instance_pids = []
+
+    def __init__(self, side, line_diameter, padding, min_scale, max_scale, seed=None):
+        FakeVecToRaster.instance_pids.append(os.getpid())
+        self.side = side
+        self.rng = random.Random(seed)
+        self.surface = threading.Lock()  # like cairo surfaces, cannot be pickled
+
+    def __call__(self, vector_image, augment=False):
+        return torch.full((self.side, self.side), self.rng.random()), 1.0
+
+
+@pytest.fixture(autouse=True)
+def fake_vec_to_raster(monkeypatch):
+    # forked data loader workers inherit the fake module
+    FakeVecToRaster.instance_pids = []
+    module = types.ModuleType("competitive_drawing.train_v2.dataset.VecToRaster")
+    module.VecToRaster = FakeVecToRaster
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+
+
+def get_augmentation_values(num_workers: int = 2, num_images: int = 8) -> list[float]:
+    quick_draw_dataset = QuickDrawDataset([None] * num_images, [0, 1] * (num_images // 2), side=4)
+    data_loader = make_data_loader(quick_draw_dataset, batch_size=1, shuffle=False, num_workers=num_workers)
+
+    values = [float(images[0, 0, 0, 0]) for images, _labels in data_loader]
+
+    assert quick_draw_dataset.vec_to_raster is None
+    return values
+
+
+def test_workers_augment_differently():
+    torch.manual_seed(0)
+    values = get_augmentation_values()
+
+    # batches alternate between the two workers
+    assert len(set(values)) == len(values)
+    assert values[0] != values[1]
+
+    # worker rasterizers are seeded by the data loader's seed
+    torch.manual_seed(0)
+    assert get_augmentation_values() == values
+
+
+def test_parent_never_builds_rasterizer():
+    get_augmentation_values()
+
+    assert len(FakeVecToRaster.instance_pids) == 0  # workers record in their own processes
+
+
+def test_getstate_drops_rasterizer():
+    quick_draw_dataset = QuickDrawDataset([None] * 2, [0, 1], side=4)
+    quick_draw_dataset.init_vec_to_raster(seed=0)
+
+    unpickled_dataset = pickle.loads(pickle.dumps(quick_draw_dataset))
+
+    assert unpickled_dataset.vec_to_raster is None
+    assert isinstance(quick_draw_dataset.vec_to_raster, FakeVecToRaster)
+
+    # the unpickled dataset builds its own rasterizer on first use
+    image, _label = unpickled_dataset[0]
+    assert image.shape == (1, 4, 4)
+    assert isinstance(unpickled_dataset.vec_to_raster, FakeVecToRaster)
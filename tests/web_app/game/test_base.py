@@ -0,0 +1,24 @@
+import pytest
+
+from competitive_drawing.web_app.game import base
+
+
+def test_assign_label_pair_without_label_pairs(monkeypatch):
+    monkeypatch.setattr(base, "get_available_label_pairs", lambda: [])
+
+    with pytest.raises(ValueError, match="No label pairs"):
+        base._assign_label_pair()
+
+
+def test_inference_inputs_include_preview():
+    game = base.Game.__new__(base.Game)
+    game.stroke_log = [[[(0.0, 0.0), (1.0, 1.0)]], [[(2.0, 2.0), (3.0, 3.0)]]]
+
+    game._stroke_log_complete = True
+    assert game._get_inference_inputs(b"png") == (
+        "data:image/png;base64,cG5n",
+        [[(0.0, 0.0), (1.0, 1.0)], [(2.0, 2.0), (3.0, 3.0)]],
+    )
+
+    game._stroke_log_complete = False
+    assert game._get_inference_inputs(b"png") == ("data:image/png;base64,cG5n", None)
@@ -0,0 +1,94 @@
+import time
+import pytest
+from concurrent.futures import Future
+
+from competitive_drawing import SETTINGS
+from competitive_drawing.web_app.game import create_game, GameType
+from competitive_drawing.web_app.game import single_player
+from competitive_drawing.web_app.model_service import ModelServiceBusy
+
+
+def make_future(exception=None) -> Future:
+    future = Future()
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(None)
+    return future
+
+
+@pytest.fixture
+def ai_game(monkeypatch):
+    game = create_game(GameType.SINGLE_PLAYER)
+    game.add_player(None)
+    game._player_turn_index = 1  # AI player's turn
+
+    failed_rooms = []
+    monkeypatch.setattr(single_player, "emit_ai_turn_failed", lambda room_id, message: failed_rooms.append(room_id))
+
+    return game, failed_rooms
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_busy_model_service_is_retried(ai_game, monkeypatch):
+    game, failed_rooms = ai_game
+    responses = [make_future(ModelServiceBusy("busy", 0.01)), make_future(ModelServiceBusy("busy", 0.01)), make_future()]
+    requests = []
+
+    def server_infer_ai_async(*args):
+        requests.append(args)
+        return responses[len(requests) - 1]
+
+    monkeypatch.setattr(single_player, "server_infer_ai_async", server_infer_ai_async)
+    game._request_ai_stroke("data:image/png;base64,", game.turns_left, 0)
+
+    assert wait_for(lambda: len(requests) == 3)
+    time.sleep(0.05)
+    assert len(requests) == 3
+    assert failed_rooms == []
+
+
+def test_exhausted_retries_fail_turn(ai_game, monkeypatch):
+    game, failed_rooms = ai_game
+    requests = []
+
+    def server_infer_ai_async(*args):
+        requests.append(args)
+        return make_future(ModelServiceBusy("busy", 0.01))
+
+    monkeypatch.setattr(single_player, "server_infer_ai_async", server_infer_ai_async)
+    game._request_ai_stroke("data:image/png;base64,", game.turns_left, 0)
+
+    assert wait_for(lambda: failed_rooms == [game.room_id])
+    assert len(requests) == 1 + SETTINGS.ai_stroke_max_retries
+
+
+def test_other_failures_fail_turn(ai_game, monkeypatch):
+    game, failed_rooms = ai_game
+    monkeypatch.setattr(single_player, "server_infer_ai_async", lambda *args: make_future(ValueError("error")))
+    game._request_ai_stroke("data:image/png;base64,", game.turns_left, 0)
+
+    assert failed_rooms == [game.room_id]
+
+
+def test_retry_is_dropped_once_turn_ends(ai_game, monkeypatch):
+    game, failed_rooms = ai_game
+    requests = []
+
+    def server_infer_ai_async(*args):
+        requests.append(args)
+        return make_future(ModelServiceBusy("busy", 0.05))
+
+    monkeypatch.setattr(single_player, "server_infer_ai_async", server_infer_ai_async)
+    game._request_ai_stroke("data:image/png;base64,", game.turns_left, 0)
+    game.turns_left -= 1  # the turn ends before the retry
+
+    time.sleep(0.2)
+    assert len(requests) == 1
+    assert failed_rooms == []
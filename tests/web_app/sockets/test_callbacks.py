@@ -0,0 +1,34 @@
+import pytest
+from flask import Flask
+from flask_socketio import SocketIO, SocketIOTestClient
+
+from competitive_drawing.web_app.GameManager import GameManager
+from competitive_drawing.web_app.sockets import make_socket_callbacks
+from competitive_drawing.web_app.state import InMemoryGameStateBackend, ShardRouter
+
+
+@pytest.fixture
+def shard_app():
+    app = Flask(__name__)
+    socketio = SocketIO(app)
+    game_manager = GameManager(InMemoryGameStateBackend(), ShardRouter(["0", "1"], "0"))
+    make_socket_callbacks(socketio, game_manager)
+
+    yield app, socketio, game_manager
+    game_manager.close()
+
+
+def test_connection_to_local_room_is_accepted(shard_app):
+    app, socketio, game_manager = shard_app
+    room_id = game_manager.shard_router.new_room_id()
+
+    client = SocketIOTestClient(app, socketio, query_string=f"roomId={room_id}")
+    assert client.is_connected()
+
+
+def test_connection_to_other_shards_room_is_refused(shard_app):
+    app, socketio, _game_manager = shard_app
+    room_id = ShardRouter(["0", "1"], "1").new_room_id()
+
+    client = SocketIOTestClient(app, socketio, query_string=f"roomId={room_id}")
+    assert not client.is_connected()
@@ -4,16 +4,23 @@ from flask import request
 from flask_socketio import SocketIOTestClient, join_room
 
 from competitive_drawing.web_app.app import app, socketio
-from competitive_drawing.web_app.game import create_game, GameType, Player
+from competitive_drawing.web_app.game import create_game, GameType, Player, CanvasFormat
 from competitive_drawing.web_app.sockets import (
     emit_assign_player,
     emit_start_turn,
     emit_start_game,
     emit_end_game,
     emit_ai_stroke,
+    emit_end_turn_rejected,
 )
 
 
+@pytest.fixture(autouse=True, scope="module")
+def close_games_manager():
+    yield
+    app.extensions["games_manager"].close()
+
+
 def get_client_sid(client: SocketIOTestClient) -> str:
     global client_sid
     @socketio.on("connect")
@@ -256,3 +263,158 @@ def test_emit_end_game(ai_stroke):
         json.dumps(client_a.get_received()) ==
         f'[{{"name": "ai_stroke", "args": [{{"strokeSamples": {ai_stroke}}}], "namespace": "/"}}]'
     )
+
+
+def add_client_player(game, player_id: str, canvas_format: CanvasFormat) -> SocketIOTestClient:
+    client = SocketIOTestClient(app, socketio)
+    client.connect()
+    assert client.is_connected()
+
+    # add directly to avoid side effect emissions
+    target_index = len(game.players)
+    game.players.append(Player(
+        id=player_id,
+        sid=get_client_sid(client),
+        target=game.label_pair[target_index],
+        target_index=target_index,
+        canvas_format=canvas_format,
+    ))
+    client_join_room(client, game.room_id)
+
+    return client
+
+
+def get_canvas_events(client: SocketIOTestClient, event: str) -> list:
+    return [message["args"][0] for message in client.get_received() if message["name"] == event]
+
+
+@pytest.mark.parametrize(
+    "canvas_format",
+    [CanvasFormat.RGBA, CanvasFormat.PNG],
+)
+def test_emit_start_game_binary_canvas_format(canvas_format):
+    game = create_game(GameType.LOCAL)
+    client = add_client_player(game, "player_a", canvas_format)
+
+    emit_start_game(game)
+
+    events = get_canvas_events(client, "start_game")
+    assert len(events) == 1
+    assert events[0]["canvasFormat"] == canvas_format.value
+    assert isinstance(events[0]["canvas"], bytes)
+    assert events[0]["canvas"] == game.canvas_image_to_payload(canvas_format)
+
+
+def test_emit_start_game_strokes_format_falls_back_to_png():
+    game = create_game(GameType.LOCAL)
+    client = add_client_player(game, "player_a", CanvasFormat.STROKES)
+
+    emit_start_game(game)
+
+    events = get_canvas_events(client, "start_game")
+    assert len(events) == 1
+    assert events[0]["canvasFormat"] == CanvasFormat.PNG.value
+    assert events[0]["canvas"] == game.canvas_image_to_payload(CanvasFormat.PNG)
+    assert events[0]["canvas"].startswith(b"\x89PNG")
+    assert "strokes" not in events[0]
+
+
+def test_emit_start_turn_mixed_canvas_formats():
+    game = create_game(GameType.ONLINE)
+    client_a = add_client_player(game, "player_a", CanvasFormat.SERIAL)
+    client_b = add_client_player(game, "player_b", CanvasFormat.RGBA)
+
+    emit_start_turn(game)
+
+    # each client receives exactly one event, in its own format
+    events_a = get_canvas_events(client_a, "start_turn")
+    assert len(events_a) == 1
+    assert "canvasFormat" not in events_a[0]
+    assert events_a[0]["canvas"] == game.canvas_image_to_serial()
+
+    events_b = get_canvas_events(client_b, "start_turn")
+    assert len(events_b) == 1
+    assert events_b[0]["canvasFormat"] == CanvasFormat.RGBA.value
+    assert events_b[0]["canvas"] == game.canvas_image_to_payload(CanvasFormat.RGBA)
+
+
+def test_emit_start_turn_strokes_format_sends_new_strokes():
+    game = create_game(GameType.LOCAL)
+    client = add_client_player(game, "player_a", CanvasFormat.STROKES)
+    game.add_strokes([[(10.0, 10.0), (20.0, 30.0)]])
+
+    emit_start_turn(game)
+
+    events = get_canvas_events(client, "start_turn")
+    assert len(events) == 1
+    assert events[0]["canvasFormat"] == CanvasFormat.STROKES.value
+    assert events[0]["strokes"] == [[[10.0, 10.0], [20.0, 30.0]]]
+    assert "canvas" not in events[0]
+
+
+def test_emit_start_turn_strokes_format_snapshot():
+    game = create_game(GameType.LOCAL)
+    client = add_client_player(game, "player_a", CanvasFormat.STROKES)
+    game.add_strokes([[(10.0, 10.0), (20.0, 30.0)]])
+
+    emit_start_turn(game, send_strokes=False)
+
+    events = get_canvas_events(client, "start_turn")
+    assert len(events) == 1
+    assert events[0]["canvasFormat"] == CanvasFormat.PNG.value
+    assert events[0]["canvas"] == game.canvas_image_to_payload(CanvasFormat.PNG)
+    assert "strokes" not in events[0]
+
+
+def test_emit_end_turn_rejected_restores_canvas():
+    game = create_game(GameType.LOCAL)
+    client = add_client_player(game, "player_a", CanvasFormat.STROKES)
+
+    emit_end_turn_rejected(game.players[0].sid, "rejected", game)
+
+    events = get_canvas_events(client, "end_turn_rejected")
+    assert len(events) == 1
+    assert events[0]["message"] == "rejected"
+    assert events[0]["canvasFormat"] == CanvasFormat.PNG.value
+    assert events[0]["canvas"] == game.canvas_image_to_payload(CanvasFormat.PNG)
+
+
+def test_end_turn_of_wrong_player_is_rejected():
+    games_manager = app.extensions["games_manager"]
+    game = create_game(GameType.LOCAL)
+    client = add_client_player(game, "player_a", CanvasFormat.STROKES)
+    games_manager.game_by_room_id[game.room_id] = game
+    game.started = True
+
+    try:
+        client.emit("end_turn", {
+            "roomId": game.room_id,
+            "playerId": "player_b",
+            "strokes": [[[10.0, 10.0], [20.0, 30.0]]],
+            "preview": b"",
+        })
+    finally:
+        del games_manager.game_by_room_id[game.room_id]
+
+    events = get_canvas_events(client, "end_turn_rejected")
+    assert len(events) == 1
+    assert events[0]["canvas"] == game.canvas_image_to_payload(CanvasFormat.PNG)
+    assert game.turns_left == game.total_num_turns
+
+
+def test_ai_stroke_failed_route():
+    game = create_game(GameType.SINGLE_PLAYER)
+
+    client_a = SocketIOTestClient(app, socketio)
+    client_a.connect()
+    assert client_a.is_connected()
+    client_join_room(client_a, game.room_id)
+
+    response = app.test_client().post(
+        "/ai_stroke_failed",
+        json={"roomId": game.room_id, "error": "search failed"}
+    )
+    assert response.status_code == 200
+
+    received = client_a.get_received()
+    assert [message["name"] for message in received] == ["ai_turn_failed"]
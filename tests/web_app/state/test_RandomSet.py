@@ -0,0 +1,57 @@
+import random
+from collections import Counter
+
+from competitive_drawing.web_app.state import RandomSet
+
+
+def assert_consistent(random_set: RandomSet, expected: set):
+    assert len(random_set) == len(expected)
+    assert set(random_set) == expected
+    assert all(member in random_set for member in expected)
+    for position, member in enumerate(random_set._members):
+        assert random_set._positions[member] == position
+
+
+def test_add_and_discard_match_set():
+    rng = random.Random(0)
+    random_set = RandomSet()
+    expected = set()
+
+    for _ in range(2000):
+        member = rng.randrange(50)
+        if rng.random() < 0.5:
+            random_set.add(member)
+            expected.add(member)
+        else:
+            random_set.discard(member)
+            expected.discard(member)
+
+        assert_consistent(random_set, expected)
+
+
+def test_duplicates_and_missing_members():
+    random_set = RandomSet()
+    random_set.add("a")
+    random_set.add("a")
+    random_set.discard("b")
+
+    assert_consistent(random_set, {"a"})
+
+    random_set.discard("a")
+    random_set.discard("a")
+    assert_consistent(random_set, set())
+
+
+def test_choice():
+    random_set = RandomSet()
+    assert random_set.choice() is None
+
+    for member in ["a", "b", "c", "d"]:
+        random_set.add(member)
+    random_set.discard("b")
+
+    random.seed(0)
+    counts = Counter(random_set.choice() for _ in range(3000))
+
+    assert set(counts) == {"a", "c", "d"}
+    assert all(800 < count < 1200 for count in counts.values())  # uniform
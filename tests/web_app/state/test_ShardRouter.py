@@ -0,0 +1,40 @@
+import pytest
+
+from competitive_drawing.web_app.state import ShardRouter
+
+
+ROOM_IDS = [f"room_{index}" for index in range(200)]
+
+
+def test_assignment_is_stable_across_routers():
+    router = ShardRouter(["0", "1", "2"], "0")
+    other_router = ShardRouter(["2", "0", "1"], "1")  # another process
+
+    assignments = [router.get_shard(room_id) for room_id in ROOM_IDS]
+    assert assignments == [other_router.get_shard(room_id) for room_id in ROOM_IDS]
+    assert assignments == [router.get_shard(room_id) for room_id in ROOM_IDS]
+    assert set(assignments) == {"0", "1", "2"}
+
+
+def test_removing_shard_only_moves_its_rooms():
+    router = ShardRouter(["0", "1", "2"], "0")
+    smaller_router = ShardRouter(["0", "1"], "0")
+
+    for room_id in ROOM_IDS:
+        if router.get_shard(room_id) != "2":
+            assert smaller_router.get_shard(room_id) == router.get_shard(room_id)
+
+
+def test_new_room_ids_are_local():
+    routers = [ShardRouter(["0", "1", "2"], shard_id) for shard_id in ["0", "1", "2"]]
+
+    for router in routers:
+        for _ in range(20):
+            room_id = router.new_room_id()
+            assert router.is_local(room_id)
+            assert all(other.get_shard(room_id) == router.local_shard_id for other in routers)
+
+
+def test_unknown_local_shard():
+    with pytest.raises(ValueError):
+        ShardRouter(["0", "1"], "2")
@@ -0,0 +1,67 @@
+import pytest
+
+from competitive_drawing.web_app.game import GameType
+from competitive_drawing.web_app.state import InMemoryGameStateBackend, RedisGameStateBackend, FakeRedis
+
+
+def create_redis_backend() -> RedisGameStateBackend:
+    redis = pytest.importorskip("redis")
+    client = redis.Redis()
+    try:
+        client.ping()
+    except redis.exceptions.ConnectionError:
+        pytest.skip("redis server is not available")
+
+    backend = RedisGameStateBackend(client, prefix="competitive_drawing_test:")
+    for key in client.scan_iter("competitive_drawing_test:*"):
+        client.delete(key)
+
+    return backend
+
+
+@pytest.fixture(params=["memory", "fake_redis", "redis"])
+def backend(request):
+    match request.param:
+        case "memory":
+            return InMemoryGameStateBackend()
+        case "fake_redis":
+            return RedisGameStateBackend(FakeRedis())
+        case "redis":
+            return create_redis_backend()
+
+
+def test_room_round_trip(backend):
+    backend.add_room("room_a", GameType.ONLINE, "1")
+
+    assert backend.get_room_shard("room_a") == "1"
+    assert backend.get_random_open_room(GameType.ONLINE) == "room_a"
+    assert backend.get_random_open_room(GameType.SINGLE_PLAYER) is None
+
+    backend.close_room("room_a")
+    assert backend.get_random_open_room(GameType.ONLINE) is None
+    assert backend.get_room_shard("room_a") == "1"  # closed rooms keep their shard
+
+    backend.delete_room("room_a")
+    assert backend.get_room_shard("room_a") is None
+
+
+def test_open_rooms_by_game_type(backend):
+    backend.add_room("room_a", GameType.ONLINE, "0")
+    backend.add_room("room_b", GameType.ONLINE, "1")
+    backend.add_room("room_c", GameType.LOCAL, "0")
+
+    assert {backend.get_random_open_room(GameType.ONLINE) for _ in range(50)} == {"room_a", "room_b"}
+    assert backend.get_random_open_room(GameType.LOCAL) == "room_c"
+
+    backend.delete_room("room_a")
+    assert backend.get_random_open_room(GameType.ONLINE) == "room_b"
+
+
+def test_sid_round_trip(backend):
+    backend.set_sid("sid_a", "room_a", "player_a")
+
+    assert backend.get_sid("sid_a") == ("room_a", "player_a")
+    assert backend.get_sid("sid_b") is None
+
+    backend.delete_sid("sid_a")
+    assert backend.get_sid("sid_a") is None
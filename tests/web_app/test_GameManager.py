@@ -0,0 +1,81 @@
+import pytest
+from concurrent.futures import Future
+
+from competitive_drawing.web_app.GameManager import GameManager
+from competitive_drawing.web_app.game import GameType, base
+from competitive_drawing.web_app.state import InMemoryGameStateBackend, ShardRouter
+
+
+class FakeScalingUpdater:
+    def __init__(self):
+        self.deltas = []
+
+    def record(self, label_pair_str: str, delta: int):
+        self.deltas.append((label_pair_str, delta))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def game_manager():
+    game_manager = GameManager(InMemoryGameStateBackend(), ShardRouter(["0"], "0"))
+    game_manager.scaling_updater = FakeScalingUpdater()
+    return game_manager
+
+
+@pytest.fixture
+def emitted_winners(monkeypatch):
+    emitted_winners = []
+    monkeypatch.setattr(base, "emit_end_game", lambda game, winner_target: emitted_winners.append(winner_target))
+    return emitted_winners
+
+
+def test_end_game_deletes_game_after_final_inference(game_manager, emitted_winners, monkeypatch):
+    inference = Future()
+    monkeypatch.setattr(base, "server_infer_async", lambda *args: inference)
+
+    room_id = game_manager.assign_game_room(GameType.LOCAL)
+    game = game_manager.game_by_room_id[room_id]
+    game_manager.end_game(game, "data:image/png;base64,")
+
+    # game is kept until the winner is announced
+    assert room_id in game_manager.game_by_room_id
+    assert game_manager.scaling_updater.deltas == [(game.label_pair_str, 1)]
+
+    inference.set_result([0.0, 1.0])
+
+    assert emitted_winners == [game.label_pair[1]]
+    assert room_id not in game_manager.game_by_room_id
+    assert game_manager.state_backend.get_room_shard(room_id) is None
+    assert game_manager.scaling_updater.deltas == [(game.label_pair_str, 1), (game.label_pair_str, -1)]
+
+
+def test_end_game_with_forced_loser_deletes_game(game_manager, emitted_winners):
+    room_id = game_manager.assign_game_room(GameType.ONLINE)
+    game = game_manager.game_by_room_id[room_id]
+    loser = game.add_player(None)
+    game.add_player(None)
+
+    game_manager.end_game(game, force_loser=loser)
+
+    assert emitted_winners == [game.label_pair[1]]
+    assert room_id not in game_manager.game_by_room_id
+
+
+def test_game_is_deleted_once(game_manager, emitted_winners, monkeypatch):
+    inference = Future()
+    monkeypatch.setattr(base, "server_infer_async", lambda *args: inference)
+
+    room_id = game_manager.assign_game_room(GameType.ONLINE)
+    game = game_manager.game_by_room_id[room_id]
+    loser = game.add_player(None)
+    game.add_player(None)
+
+    # a player disconnects while the final inference runs
+    game_manager.end_game(game, "data:image/png;base64,")
+    game_manager.end_game(game, force_loser=loser)
+    inference.set_result([1.0, 0.0])
+
+    assert room_id not in game_manager.game_by_room_id
+    assert game_manager.scaling_updater.deltas.count((game.label_pair_str, -1)) == 1
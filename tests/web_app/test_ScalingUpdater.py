@@ -0,0 +1,25 @@
+from competitive_drawing.web_app import ScalingUpdater as scaling_updater_module
+from competitive_drawing.web_app.ScalingUpdater import ScalingUpdater
+
+
+def test_thread_starts_on_first_record(monkeypatch):
+    sent_snapshots = []
+    monkeypatch.setattr(scaling_updater_module, "server_update", lambda snapshot: sent_snapshots.append(snapshot) or "a")
+
+    updater = ScalingUpdater(period=0.01)
+    assert updater._thread is None
+
+    updater.record("cat-dog", 1)
+    assert updater._thread is not None and updater._thread.is_alive()
+
+    updater.close(timeout=5)
+    assert not updater._thread.is_alive()
+    assert sent_snapshots[0] == {"cat-dog": 1}
+
+
+def test_closed_updater_does_not_start():
+    updater = ScalingUpdater()
+    updater.close()
+    updater.start()
+
+    assert updater._thread is None